@@ -1,10 +1,14 @@
 from django.contrib import admin
 
+from src.app.admin.fulfillment import FulfillmentBatchAdmin
 from src.app.admin.issue import LetterIssueAdmin, PersonIssueAdmin
+from src.app.admin.job import JobAdmin
 from src.app.admin.letter import LetterAdmin
 from src.app.admin.person import PersonAdmin
 from src.app.admin.prison import PrisonAdmin
+from src.app.models.fulfillment import FulfillmentBatch
 from src.app.models.issue import LetterIssue, PersonIssue
+from src.app.models.job import Job
 from src.app.models.letter import Letter
 from src.app.models.person import Person
 from src.app.models.prison import Prison
@@ -14,3 +18,5 @@ admin.site.register(Person, PersonAdmin)
 admin.site.register(Prison, PrisonAdmin)
 admin.site.register(LetterIssue, LetterIssueAdmin)
 admin.site.register(PersonIssue, PersonIssueAdmin)
+admin.site.register(Job, JobAdmin)
+admin.site.register(FulfillmentBatch, FulfillmentBatchAdmin)
@@ -0,0 +1,65 @@
+from django.contrib import admin
+from django.db.models import Count
+
+from src.app.utils import cached_facet_counts
+
+
+def with_count(label, count: int) -> str:
+    return f"{label} ({count:,})"
+
+
+def grouped_counts(model, field_path: str) -> dict:
+    """Rows per value of field_path across the whole table, cached."""
+
+    def compute():
+        return dict(
+            model._default_manager.order_by()
+            .values(field_path)
+            .annotate(count=Count("pk"))
+            .values_list(field_path, "count")
+        )
+
+    return cached_facet_counts(f"{model._meta.label_lower}.{field_path}", compute)
+
+
+class CountedFieldListFilterMixin:
+    field_path: str
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        # Set before super().__init__, which builds the choices
+        self.counted_model = model
+        super().__init__(field, request, params, model, model_admin, field_path)  # type: ignore
+
+    def counts(self) -> dict:
+        return grouped_counts(self.counted_model, self.field_path)
+
+
+class CountedChoicesFieldListFilter(CountedFieldListFilterMixin, admin.ChoicesFieldListFilter):
+    """ChoicesFieldListFilter showing how many rows have each choice."""
+
+    def choices(self, changelist):
+        counts = self.counts()
+        displays = {
+            str(title): with_count(title, counts.get(value, 0))
+            for value, title in self.field.flatchoices
+        }
+        for choice in super().choices(changelist):
+            choice["display"] = displays.get(str(choice["display"]), choice["display"])
+            yield choice
+
+
+class CountedRelatedFieldListFilter(CountedFieldListFilterMixin, admin.RelatedFieldListFilter):
+    """RelatedFieldListFilter showing how many rows point at each object."""
+
+    def field_choices(self, field, request, model_admin):
+        counts = self.counts()
+        return [
+            (pk, with_count(label, counts.get(pk, 0)))
+            for pk, label in super().field_choices(field, request, model_admin)
+        ]
+
+    def choices(self, changelist):
+        for choice in super().choices(changelist):
+            if self.include_empty_choice and choice["display"] == self.empty_value_display:
+                choice["display"] = with_count(choice["display"], self.counts().get(None, 0))
+            yield choice
@@ -0,0 +1,145 @@
+from html import escape
+
+from django.contrib import admin, messages
+from django.template.defaultfilters import pluralize
+from django.urls import reverse
+from django.utils.html import format_html_join
+from django.utils.safestring import mark_safe
+
+from src.app.labels import format_mailing_address, load_letters
+from src.app.models.fulfillment import FulfillmentBatch
+from src.app.models.letter import Letter
+from src.app.utils import WorkflowStage
+
+_LETTER_TABLE_HTML = (
+    "<table><thead><tr><th>Letter</th><th>Inmate number</th><th>Name</th><th>Prison</th>"
+    "<th>Restrictions</th><th>Address</th><th>Stage</th></tr></thead><tbody>{rows}</tbody></table>"
+)
+_LETTER_ROW_HTML = (
+    '<tr><td><a href="{url}">{letter_id}</a></td><td>{inmate_number}</td><td>{name}</td>'
+    "<td>{prison}</td><td>{restrictions}</td><td>{address}</td><td>{stage}</td></tr>"
+)
+
+
+class FulfillmentBatchAdmin(admin.ModelAdmin):
+    """
+    Batches are created from the letter changelist ("Add selected letters to a
+    new fulfillment batch") and moved along by the actions here.
+    """
+
+    list_display = (
+        "__str__",
+        "status",
+        *FulfillmentBatch.TOTAL_FIELDS,
+        "claimed_by",
+        "shipped_date",
+        "created_by",
+        "created_date",
+    )
+    list_filter = ("status",)
+    list_select_related = ("claimed_by", "created_by")
+    ordering = ("-mail_date", "-id")
+    fields = (
+        "mail_date",
+        "notes",
+        "status",
+        "claimed_by",
+        "claimed_date",
+        "packed_date",
+        "shipped_date",
+        "returned_date",
+        *FulfillmentBatch.TOTAL_FIELDS,
+        "print_links",
+        "letter_table",
+    )
+    readonly_fields = fields[2:]
+    actions = ("claim", "mark_packed", "mark_shipped", "mark_returned")
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("claimed_by")
+
+    def print_links(self, batch: FulfillmentBatch) -> str:
+        return format_html_join(
+            " | ",
+            "<a href={}?batch={} target='_blank'>{}</a>",
+            (
+                (reverse("admin:app_letter_print", args=[document]), batch.pk, label)
+                for document, label in (("labels", "Labels"), ("slips", "Packing slips"))
+            ),
+        )
+
+    setattr(print_links, "short_description", "Print")
+
+    def letter_table(self, batch: FulfillmentBatch) -> str:
+        """
+        Every letter with its person and current prison, loaded in two queries
+        and formatted without Django's per-value (lazy-aware) escaping.
+        """
+        letters = Letter.objects.filter(batch=batch).only(
+            "workflow_stage",
+            "person__inmate_number",
+            "person__first_name",
+            "person__middle_name",
+            "person__last_name",
+            "person__name_suffix",
+        )
+        change_url = reverse("admin:app_letter_changelist") + "{}/change/"
+        stages = {value: str(label) for value, label in WorkflowStage.choices}
+        rows = []
+        for letter in load_letters(letters):
+            person = letter.person
+            prison = person.current_prison if person else None
+            rows.append(
+                _LETTER_ROW_HTML.format(
+                    url=change_url.format(letter.pk),
+                    letter_id=letter.pk,
+                    inmate_number=escape(person.inmate_number or "") if person else "",
+                    name=escape(person.get_name_str()) if person else "NO PERSON",
+                    prison=escape(prison.name) if prison else "",
+                    restrictions=escape(prison.restrictions) if prison else "",
+                    # already escaped
+                    address=format_mailing_address(person) or "",
+                    stage=escape(stages.get(letter.workflow_stage, letter.workflow_stage)),
+                )
+            )
+        if not rows:
+            return "No letters"
+        return mark_safe(_LETTER_TABLE_HTML.format(rows="".join(rows)))
+
+    setattr(letter_table, "short_description", "Letters")
+
+    def transition(self, request, queryset, status: str) -> None:
+        moved = changed = 0
+        for batch in queryset:
+            try:
+                changed += batch.transition(status, request.user)
+                moved += 1
+            except ValueError as e:
+                self.message_user(request, str(e), messages.ERROR)
+        if not moved:
+            return
+        label = FulfillmentBatch.Statuses(status).label
+        message = f"{moved} batch{pluralize(moved, 'es')} marked {label}."
+        if status in (FulfillmentBatch.Statuses.SHIPPED, FulfillmentBatch.Statuses.RETURNED):
+            stage = "Fulfilled" if status == FulfillmentBatch.Statuses.SHIPPED else "Problem"
+            message = f"{message} {changed} letter{pluralize(changed)} moved to {stage}."
+        self.message_user(request, message, messages.SUCCESS)
+
+    @admin.action(description="Claim selected batches")
+    def claim(self, request, queryset):
+        self.transition(request, queryset, FulfillmentBatch.Statuses.CLAIMED)
+
+    @admin.action(description="Mark selected batches as Packed")
+    def mark_packed(self, request, queryset):
+        self.transition(request, queryset, FulfillmentBatch.Statuses.PACKED)
+
+    @admin.action(description="Mark selected batches as Shipped (letters Fulfilled)")
+    def mark_shipped(self, request, queryset):
+        self.transition(request, queryset, FulfillmentBatch.Statuses.SHIPPED)
+
+    @admin.action(description="Mark selected batches as Returned (letters to Problem)")
+    def mark_returned(self, request, queryset):
+        self.transition(request, queryset, FulfillmentBatch.Statuses.RETURNED)
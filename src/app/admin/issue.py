@@ -3,11 +3,14 @@ from typing import TYPE_CHECKING
 
 from ajax_select import make_ajax_field
 from django.contrib import admin
+from django.db import transaction
 from django.forms import ModelForm
 from django.urls import reverse
 from django.utils.html import format_html
 
+from src.app.admin.job import background_action
 from src.app.models.issue import LetterIssue, PersonIssue
+from src.app.signals import refresh_person_stats
 
 if TYPE_CHECKING:
     pass
@@ -52,6 +55,7 @@ class IssueAdmin(admin.ModelAdmin):
     )
     list_display_links = ("issue",)
     list_filter = ("issue", "resolved")
+    list_select_related = ("resolved_by", "created_by", "modified_by")
     actions = ("mark_issue_resolved",)
 
     def last_updated_date(self, issue: PersonIssue):
@@ -71,13 +75,18 @@ class IssueAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
     @admin.action(description="Mark issue resolved")
+    @background_action
     def mark_issue_resolved(self, request, queryset):
+        self.resolve_issues(queryset)
+
+    def resolve_issues(self, queryset):
         queryset.update(resolved=True)
 
 
 class PersonIssueAdmin(IssueAdmin):
     form = PersonIssueAdminForm
     list_display = ["person_list_display", *IssueAdmin.base_list_display]
+    list_select_related = ("person", *IssueAdmin.list_select_related)
     search_fields = (
         "person__last_name",
         "person__first_name",
@@ -91,10 +100,17 @@ class PersonIssueAdmin(IssueAdmin):
 
     setattr(person_list_display, "short_description", "Person")
 
+    @transaction.atomic
+    def resolve_issues(self, queryset):
+        person_ids = set(queryset.values_list("person_id", flat=True))
+        super().resolve_issues(queryset)
+        refresh_person_stats(*person_ids)
+
 
 class LetterIssueAdmin(IssueAdmin):
     form = LetterIssueAdminForm
     list_display = ["letter_list_display", *IssueAdmin.base_list_display]
+    list_select_related = ("letter__person", *IssueAdmin.list_select_related)
     search_fields = (
         "letter__id",
         "letter__person__first_name",
@@ -0,0 +1,287 @@
+from functools import wraps
+from io import BytesIO
+from typing import Callable, Iterator
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.exceptions import NotRegistered
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.template.defaultfilters import pluralize
+from django.urls import path, reverse
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+from import_export.formats.base_formats import CSV, XLSX
+from import_export.signals import post_export
+
+from src.app.admin.export import EXPORT_CHUNK_SIZE, export_rows, write_csv, write_xlsx
+from src.app.jobs import JobRequest, enqueue, job, job_name
+from src.app.models.job import Job
+
+# Selected rows a queued action handles at a time, recording progress after each
+ACTION_BATCH_SIZE = 500
+
+
+def queued_message(model_admin, request, queued: Job):
+    link = reverse("admin:app_job_change", args=[queued.pk])
+    model_admin.message_user(
+        request,
+        format_html("Queued <a href={}>{}</a>; it will run in the background.", link, queued),
+        messages.SUCCESS,
+    )
+
+
+def background_action(action: Callable) -> Callable:
+    """
+    Runs the wrapped ModelAdmin action as a job when settings.BACKGROUND_JOBS
+    is on and at least BACKGROUND_ACTION_THRESHOLD rows are selected. The
+    worker calls the action again on the same rows, ACTION_BATCH_SIZE at a
+    time, with a JobRequest. An action can use JobRequest.started for one
+    timestamp across batches, and add to JobRequest.collected instead of
+    messaging per batch; the ModelAdmin's `<action>_summary(request)` then
+    sends one message at the end.
+    """
+
+    @wraps(action)
+    def wrapper(model_admin, request, queryset):
+        if (
+            isinstance(request, JobRequest)
+            or not settings.BACKGROUND_JOBS
+            or queryset.count() < settings.BACKGROUND_ACTION_THRESHOLD
+        ):
+            return action(model_admin, request, queryset)
+        ids = list(queryset.values_list("pk", flat=True))
+        description = getattr(wrapper, "short_description", action.__name__)
+        queued = enqueue(
+            run_admin_action,
+            f"{description} ({len(ids)} {model_admin.opts.verbose_name_plural})",
+            request.user,
+            model=model_admin.opts.label,
+            action=action.__name__,
+            ids=ids,
+        )
+        queued_message(model_admin, request, queued)
+
+    return wrapper
+
+
+@job
+def run_admin_action(job: Job, model: str, action: str, ids: list):
+    model_admin = admin.site.get_model_admin(apps.get_model(model))
+    request = JobRequest(job)
+    job.set_progress(0, len(ids))
+    for start in range(0, len(ids), ACTION_BATCH_SIZE):
+        batch = ids[start : start + ACTION_BATCH_SIZE]
+        getattr(model_admin, action)(
+            request, model_admin.get_queryset(request).filter(pk__in=batch)
+        )
+        job.set_progress(start + len(batch))
+    # an action that collects its results on the request sends one message for all batches
+    if summary := getattr(model_admin, f"{action}_summary", None):
+        summary(request)
+
+
+class BackgroundExportMixin:
+    """
+    With settings.BACKGROUND_JOBS on, an export is queued as a job with the
+    changelist's filters and search, and downloaded from the job's page.
+    Mixed into ImportExportModelAdmin subclasses.
+    """
+
+    def export_action(self, request, *args, **kwargs):
+        if not settings.BACKGROUND_JOBS or request.method != "POST":
+            return super().export_action(request, *args, **kwargs)  # type: ignore
+        if not self.has_export_permission(request):  # type: ignore
+            raise PermissionDenied
+        form = self.get_export_form()(self.get_export_formats(), request.POST)  # type: ignore
+        if not form.is_valid():
+            return super().export_action(request, *args, **kwargs)  # type: ignore
+        opts = self.opts  # type: ignore
+        queued = enqueue(
+            run_export,
+            f"Export {opts.verbose_name_plural}",
+            request.user,
+            model=opts.label,
+            file_format=int(form.cleaned_data["file_format"]),
+            query=request.GET.urlencode(),
+        )
+        queued_message(self, request, queued)
+        return redirect(
+            reverse(f"admin:{opts.app_label}_{opts.model_name}_changelist", query=request.GET)
+        )
+
+
+@job
+def run_export(job: Job, model: str, file_format: int, query: str):
+    """
+    CSV and XLSX exports are written row by row to a temporary file (see
+    src.app.admin.export), counting progress as rows are read; other formats
+    are built by import-export in memory. The file is stored a chunk at a time.
+    """
+    model_admin = admin.site.get_model_admin(apps.get_model(model))
+    request = JobRequest(job, query)
+    export_format = model_admin.get_export_formats()[file_format]()
+    queryset = model_admin.get_export_queryset(request)
+    job.set_progress(0, queryset.count())
+    if isinstance(export_format, (CSV, XLSX)):
+        chunk_size = getattr(model_admin, "export_chunk_size", EXPORT_CHUNK_SIZE)
+        rows = counted_rows(
+            job, export_rows(model_admin, request, queryset, chunk_size), chunk_size
+        )
+        if isinstance(export_format, CSV):
+            output = write_csv(rows, model_admin.to_encoding or "utf-8")
+        else:
+            output = write_xlsx(rows, model_admin.opts.verbose_name_plural.title())
+    else:
+        data = model_admin.get_export_data(
+            export_format, queryset, request=request, encoding=model_admin.to_encoding
+        )
+        output = BytesIO(data.encode() if isinstance(data, str) else data)
+    with output:
+        job.write_output(
+            output,
+            model_admin.get_export_filename(request, queryset, export_format),
+            export_format.get_content_type(),
+        )
+    job.set_progress(job.total or 0)
+    post_export.send(sender=None, model=model_admin.model)
+
+
+def counted_rows(job: Job, rows: Iterator[list], every: int) -> Iterator[list]:
+    """Pass on the headers and rows, recording progress every `every` rows."""
+    yield next(rows)
+    count = 0
+    for count, row in enumerate(rows, 1):
+        if count % every == 0:
+            job.set_progress(count)
+        yield row
+    job.set_progress(count)
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "description",
+        "status",
+        "progress_display",
+        "created_by",
+        "created_date",
+        "started_date",
+        "finished_date",
+    )
+    list_filter = ("status",)
+    list_select_related = ("created_by",)
+    ordering = ("-id",)
+    fields = (
+        "description",
+        "status",
+        "progress_display",
+        "messages_display",
+        "download",
+        "error",
+        "created_by",
+        "created_date",
+        "started_date",
+        "finished_date",
+        "worker",
+    )
+    readonly_fields = fields
+    actions = ("run_again",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def progress_display(self, job: Job) -> str:
+        if not job.total:
+            return str(job.progress) if job.progress else ""
+        return f"{job.progress} / {job.total} ({job.progress * 100 // job.total}%)"
+
+    setattr(progress_display, "short_description", "Progress")
+
+    def messages_display(self, job: Job) -> str:
+        # stored escaped by JobMessages
+        return format_html_join(
+            "", "<p class='{}'>{}</p>", ((tag, mark_safe(html)) for tag, html in job.messages)
+        )
+
+    setattr(messages_display, "short_description", "Messages")
+
+    def download(self, job: Job) -> str:
+        if not job.output_name:
+            return ""
+        link = reverse("admin:app_job_download", args=[job.pk])
+        return format_html("<a href={}>{}</a>", link, job.output_name)
+
+    def get_urls(self):
+        return [
+            path(
+                "<int:job_id>/download/",
+                self.admin_site.admin_view(self.download_view),
+                name="app_job_download",
+            ),
+            *super().get_urls(),
+        ]
+
+    def download_view(self, request, job_id: int):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        job = get_object_or_404(Job, pk=job_id)
+        # exports can hold anything their model's admin shows
+        if not (request.user.is_superuser or job.created_by_id == request.user.pk):
+            raise PermissionDenied
+        if not job.output_name:
+            raise Http404
+        response = StreamingHttpResponse(job.iter_output(), content_type=job.output_content_type)
+        response["Content-Disposition"] = f'attachment; filename="{job.output_name}"'
+        return response
+
+    def can_run_again(self, request, job: Job) -> bool:
+        """
+        Whether the user could have queued `job` themselves: view and export
+        permission on the model for an export, the action on the model's
+        changelist for an action. Other jobs are run again by superusers only.
+        """
+        if request.user.is_superuser:
+            return True
+        if job.name not in (job_name(run_export), job_name(run_admin_action)):
+            return False
+        try:
+            model_admin = admin.site.get_model_admin(apps.get_model(job.kwargs["model"]))
+        except (KeyError, LookupError, NotRegistered):
+            return False
+        if not model_admin.has_view_or_change_permission(request):
+            return False
+        if job.name == job_name(run_export):
+            return model_admin.has_export_permission(request)
+        return job.kwargs.get("action") in model_admin.get_actions(request)
+
+    @admin.action(description="Run selected jobs again")
+    def run_again(self, request, queryset):
+        jobs = list(queryset.order_by("pk"))
+        allowed = [job for job in jobs if self.can_run_again(request, job)]
+        if denied := len(jobs) - len(allowed):
+            self.message_user(
+                request,
+                f"{denied} job{pluralize(denied)} not queued: you don't have permission to run "
+                f"{pluralize(denied, 'it,them')}.",
+                messages.ERROR,
+            )
+        if not allowed:
+            return
+        queued = Job.objects.bulk_create(
+            Job(
+                name=job.name,
+                kwargs=job.kwargs,
+                description=job.description,
+                created_by=request.user,
+            )
+            for job in allowed
+        )
+        self.message_user(
+            request, f"Queued {len(queued)} job{pluralize(queued)}.", messages.SUCCESS
+        )
@@ -2,17 +2,30 @@ from datetime import datetime
 
 from ajax_select import make_ajax_field
 from ajax_select.admin import AjaxSelectAdmin
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.core.exceptions import BadRequest, PermissionDenied
+from django.db import transaction
 from django.forms import ModelForm, ValidationError
-from django.urls import reverse
-from django.utils.html import format_html
+from django.http import Http404, StreamingHttpResponse
+from django.template.defaultfilters import pluralize
+from django.urls import path, reverse
+from django.utils.html import format_html, format_html_join
+from django.utils.timezone import now
 from import_export.admin import ImportExportModelAdmin
 
+from src.app.admin.filters import CountedChoicesFieldListFilter, CountedRelatedFieldListFilter
 from src.app.admin.issue import LetterIssueInline
+from src.app.admin.job import BackgroundExportMixin, background_action
+from src.app.admin.pagination import KeysetPaginationMixin
+from src.app.admin.search import PersonSearchMixin
+from src.app.jobs import JobRequest
+from src.app.labels import DOCUMENTS, format_mailing_address, load_letters
+from src.app.models.fulfillment import FulfillmentBatch
 from src.app.models.letter import Letter
-from src.app.models.person import WorkflowStage
+from src.app.models.person import WorkflowStage, prefetch_current_prison
 from src.app.models.prison import Prison
-from src.app.utils import render_address_template
+from src.app.signals import refresh_person_stats
 
 
 class LetterAdminForm(ModelForm):
@@ -40,8 +53,15 @@ class LetterAdminForm(ModelForm):
         raise ValidationError("You must add a person to create or update a letter.")
 
 
-class LetterAdmin(ImportExportModelAdmin, AjaxSelectAdmin):  # type: ignore
+class LetterAdmin(  # type: ignore
+    KeysetPaginationMixin,
+    PersonSearchMixin,
+    BackgroundExportMixin,
+    ImportExportModelAdmin,
+    AjaxSelectAdmin,
+):
     form = LetterAdminForm
+    change_list_template = "admin/app/letter/change_list.html"
     list_display = (
         "letter_name",
         "workflow_stage",
@@ -54,17 +74,20 @@ class LetterAdmin(ImportExportModelAdmin, AjaxSelectAdmin):  # type: ignore
         "fulfilled_date",
         "prison_sent_to_list_display",
         "prison_mailing_address",
+        "batch",
         "person_list_display",
         "created_by",
         "created_date",
         "modified_date",
     )
     list_filter = (
-        "workflow_stage",
-        "prison_sent_to",
+        ("workflow_stage", CountedChoicesFieldListFilter),
+        ("prison_sent_to", CountedRelatedFieldListFilter),
         "fulfilled_date",
     )
     list_display_links = ("letter_name",)
+    person_search_prefix = "person__"
+    # Shows the search box; PersonSearchMixin does the matching
     search_fields = (
         "person__last_name",
         "person__first_name",
@@ -83,11 +106,38 @@ class LetterAdmin(ImportExportModelAdmin, AjaxSelectAdmin):  # type: ignore
         "counts_against_last_served",
         "notes",
     )
-    actions = ("move_to_fulfilled", "move_to_stage1_complete", "move_to_discarded")
+    actions = (
+        "move_to_fulfilled",
+        "move_to_stage1_complete",
+        "move_to_discarded",
+        "print_labels",
+        "print_packing_slips",
+        "add_to_new_batch",
+    )
     inlines = [LetterIssueInline]
 
     list_per_page = 25
 
+    def get_queryset(self, request):
+        """
+        Everything list_display needs in two queries (letters, and the people's
+        current prisons), however many rows are on the page.
+        """
+        return (
+            super()
+            .get_queryset(request)
+            # the person's stats row carries the eligibility inputs
+            .select_related("person__stats", "prison_sent_to", "batch", "created_by")
+            .prefetch_related(prefetch_current_prison("person"))
+            .with_open_issue_count()
+        )
+
+    def open_issues(self, letter: Letter) -> str:
+        return letter.open_issues
+
+    # most open issues first on the first click
+    setattr(open_issues, "admin_order_field", "-open_issue_count")
+
     def eligibility(self, letter: Letter) -> str:
         if not letter.person:
             return ""
@@ -122,41 +172,73 @@ class LetterAdmin(ImportExportModelAdmin, AjaxSelectAdmin):  # type: ignore
         return format_html("<a href={}>{}</a>", link, letter.prison_sent_to)
 
     @admin.action(description="Mark selected letters as Stage 1 Complete")
+    @transaction.atomic
     def move_to_stage1_complete(self, request, queryset):
+        person_ids = set(queryset.values_list("person_id", flat=True))
         queryset.update(
             fulfilled_date=None,
             workflow_stage=WorkflowStage.STAGE1_COMPLETE,
         )
+        refresh_person_stats(*person_ids)
 
     @admin.action(description="Mark selected letters as Fulfilled")
+    @background_action
+    @transaction.atomic
     def move_to_fulfilled(self, request, queryset):
         """
         WorkflowStage.FULFILLED turned off in form, only available via this admin action.
+        Every letter with a person is updated in one statement, sent to wherever
+        that person was in custody at fulfillment.
         """
-        change = []
-        for letter in queryset:
-            if not letter.person:
-                link = reverse("admin:app_letter_change", query=[("id", letter.id)])
-                self.message_user(
-                    request,
-                    format_html(
-                        "Letter <a href={} data-popup='yes'>{} - {}</a> not changed. There needs to be a person assigned to the letter for this operation.",
-                        link,
-                        letter.id,
-                        self.letter_name(letter),
-                    ),
+        # one fulfillment time for every batch of a queued run
+        fulfilled_date = request.started if isinstance(request, JobRequest) else now()
+        without_person = list(queryset.filter(person__isnull=True).order_by("pk"))
+        letters = queryset.filter(person__isnull=False)
+        person_ids = set(letters.values_list("person_id", flat=True))
+        fulfilled = letters.fulfill(fulfilled_date)
+        refresh_person_stats(*person_ids)
+        if isinstance(request, JobRequest):
+            request.collected["fulfilled"].append(fulfilled)
+            request.collected["without_person"] += without_person
+            return
+        self.fulfilled_message(request, fulfilled, without_person)
+
+    def move_to_fulfilled_summary(self, request: JobRequest):
+        collected = request.collected
+        self.fulfilled_message(request, sum(collected["fulfilled"]), collected["without_person"])
+
+    def fulfilled_message(self, request, fulfilled: int, without_person: list[Letter]):
+        message = f"{fulfilled} letter{pluralize(fulfilled)} marked as Fulfilled."
+        if not without_person:
+            self.message_user(request, message, messages.SUCCESS)
+            return
+        links = format_html_join(
+            ", ",
+            "<a href={} data-popup='yes'>{} - {}</a>",
+            (
+                (
+                    reverse("admin:app_letter_change", args=[letter.id]),
+                    letter.id,
+                    self.letter_name(letter),
                 )
-                continue
-            else:
-                change.append(letter.id)
-                letter.prison_sent_to = letter.person.current_prison
-                letter.save()
-        # TODO: make things tz aware
-        queryset.filter(id__in=change).update(
-            fulfilled_date=datetime.now(), workflow_stage=WorkflowStage.FULFILLED
+                for letter in without_person
+            ),
+        )
+        self.message_user(
+            request,
+            format_html(
+                "{} {} not changed. There needs to be a person assigned to the letter for "
+                "this operation: {}",
+                message,
+                f"{len(without_person)} letter{pluralize(without_person)}",
+                links,
+            ),
+            messages.WARNING,
         )
 
     @admin.action(description="Mark selected letters as Discarded")
+    @background_action
+    @transaction.atomic
     def move_to_discarded(self, request, queryset):
         change = []
         for letter in queryset:
@@ -174,35 +256,79 @@ class LetterAdmin(ImportExportModelAdmin, AjaxSelectAdmin):  # type: ignore
             else:
                 change.append(letter.id)
         queryset.filter(id__in=change).update(workflow_stage=WorkflowStage.DISCARDED)
+        refresh_person_stats(*queryset.filter(id__in=change).values_list("person_id", flat=True))
 
     def prison_mailing_address(self, letter: Letter):
-        if not letter.person or not letter.person.current_prison:
-            return
-        if letter.person.current_prison.prison_type == Prison.Types.SCI:
+        return format_mailing_address(letter.person)
+
+    def print_response(self, document: str, queryset) -> StreamingHttpResponse:
+        return StreamingHttpResponse(
+            DOCUMENTS[document](load_letters(queryset)), content_type="text/html; charset=utf-8"
+        )
+
+    @admin.action(description="Print mailing labels for selected letters")
+    def print_labels(self, request, queryset):
+        return self.print_response("labels", queryset)
+
+    @admin.action(description="Print packing slips for selected letters")
+    def print_packing_slips(self, request, queryset):
+        return self.print_response("slips", queryset)
+
+    @admin.action(description="Add selected letters to a new fulfillment batch")
+    @transaction.atomic
+    def add_to_new_batch(self, request, queryset):
+        batch = FulfillmentBatch.objects.create(created_by=request.user)
+        added = batch.add_letters(queryset)
+        skipped = queryset.count() - added
+        if not added:
+            batch.delete()
+            self.message_user(
+                request,
+                "No batch created: none of the selected letters are Stage 1 Complete "
+                "and outside other unshipped batches.",
+                messages.WARNING,
+            )
             return
-        curr_prison = letter.person.current_prison
-        # this suppresses county/city ID numbers (which may be incorrect)
-        # unhandled case: some county prisoners do have correct IDs
-        if curr_prison.prison_type in (Prison.Types.COUNTY, Prison.Types.CITY):
-            inmate_number = None
-        else:
-            inmate_number = letter.person.inmate_number
-
-        headers = [
-            letter.person.get_name_str(),
-            inmate_number,
-            curr_prison.name,
-        ]
-        if curr_prison.additional_mailing_headers:
-            headers.append(curr_prison.additional_mailing_headers)
-        return render_address_template(
-            headers,
-            curr_prison.mailing_address,
-            curr_prison.mailing_city,
-            curr_prison.mailing_state,
-            curr_prison.mailing_zipcode,
+        self.message_user(
+            request,
+            format_html(
+                "{} letter{} added to <a href={}>{}</a>.{}",
+                added,
+                pluralize(added),
+                reverse("admin:app_fulfillmentbatch_change", args=[batch.pk]),
+                batch,
+                f" {skipped} not added (not Stage 1 Complete, or already in a batch)."
+                if skipped
+                else "",
+            ),
+            messages.SUCCESS,
         )
 
+    def get_urls(self):
+        return [
+            path(
+                "print/<str:document>/",
+                self.admin_site.admin_view(self.print_view),
+                name="app_letter_print",
+            ),
+            *super().get_urls(),
+        ]
+
+    def print_view(self, request, document: str):
+        """
+        Labels or packing slips for every letter the changelist shows with the
+        same query string (filters and search).
+        """
+        if document not in DOCUMENTS:
+            raise Http404
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        try:
+            changelist = self.get_changelist_instance(request)
+        except IncorrectLookupParameters as e:
+            raise BadRequest(str(e))
+        return self.print_response(document, changelist.queryset)
+
     def save_model(self, request, obj, form, change):
         if not obj.pk:
             obj.created_by = request.user
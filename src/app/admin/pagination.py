@@ -0,0 +1,190 @@
+import json
+
+from django.conf import settings
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.db.models import F, OrderBy, Q, QuerySet
+from django.utils.functional import cached_property
+
+AFTER_VAR = "after"
+BEFORE_VAR = "before"
+CURSOR_PARAMS = (AFTER_VAR, BEFORE_VAR)
+
+
+def planner_estimate(queryset: QuerySet) -> int | None:
+    """
+    Row count the PostgreSQL planner expects for the queryset, without running it.
+    None on other databases.
+    """
+    if connections[queryset.db].vendor != "postgresql":
+        return None
+    plan = json.loads(queryset.order_by().select_related(None).explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Uses the planner's estimate instead of COUNT(*) once it passes
+    settings.ADMIN_ESTIMATED_COUNT_THRESHOLD.
+    """
+
+    estimated = False
+
+    @cached_property
+    def count(self):
+        estimate = planner_estimate(self.object_list)
+        if estimate is not None and estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+            self.estimated = True
+            return estimate
+        return super().count
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Pages by the last row seen (?after=<pk> / ?before=<pk>) instead of OFFSET,
+    so deep pages cost the same as the first. Falls back to numbered pages when
+    the ordering can't be used as a cursor (related or nullable sort fields).
+    """
+
+    keyset = True
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        for param in CURSOR_PARAMS:
+            lookup_params.pop(param, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Sorting and filtering start again from the first page
+        return super().get_query_string(new_params, [*(remove or []), *CURSOR_PARAMS])
+
+    def get_keyset(self) -> list[tuple[str, bool]] | None:
+        """
+        The ordering as (field name, descending) pairs ending with the primary
+        key, or None if it can't be paged by cursor.
+        """
+        if self.list_editable:
+            return None
+        keys = []
+        for item in self.queryset.query.order_by:
+            if isinstance(item, OrderBy) and isinstance(item.expression, F):
+                name, descending = item.expression.name, item.descending
+            elif isinstance(item, str):
+                name, descending = item.lstrip("-"), item.startswith("-")
+            else:
+                return None
+            if name in ("pk", self.opts.pk.name):
+                keys.append(("pk", descending))
+                return keys
+            if name in self.queryset.query.annotations:
+                return None
+            try:
+                field = self.opts.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            if not field.concrete or field.is_relation or field.null:
+                return None
+            keys.append((name, descending))
+        return None
+
+    def get_cursor(self, request, keys: list[tuple[str, bool]]) -> tuple[bool, list] | None:
+        """
+        (forward, sort key values of the cursor row) from the query string, or
+        None for the first page.
+        """
+        for param, forward in ((AFTER_VAR, True), (BEFORE_VAR, False)):
+            if param not in request.GET:
+                continue
+            try:
+                pk = self.opts.pk.to_python(request.GET[param])
+            except ValidationError:
+                return None
+            names = [name for name, _ in keys]
+            if names == ["pk"]:
+                return forward, [pk]
+            row = self.model._base_manager.filter(pk=pk).values_list(*names).first()
+            # The cursor row is gone; start over
+            return (forward, list(row)) if row else None
+        return None
+
+    @staticmethod
+    def keyset_filter(keys: list[tuple[str, bool]], values: list, forward: bool) -> Q:
+        """Rows after (or before) the given sort key values in this ordering."""
+        condition = Q()
+        equal = {}
+        for (name, descending), value in zip(keys, values):
+            lookup = "lt" if descending == forward else "gt"
+            term = Q(**equal, **{f"{name}__{lookup}": value})
+            condition = term if not condition else condition | term
+            equal[name] = value
+        return condition
+
+    def get_results(self, request):
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.paginator = paginator
+        self.result_count = paginator.count
+        self.result_count_estimated = getattr(paginator, "estimated", False)
+        # The unfiltered total would be a second full count
+        self.show_full_result_count = False
+        self.full_result_count = None
+        self.show_admin_actions = True
+        self.can_show_all = self.result_count <= self.list_max_show_all
+        self.multi_page = self.result_count > self.list_per_page
+        self.keyset_first_url = self.keyset_previous_url = self.keyset_next_url = None
+
+        keys = self.get_keyset()
+        if (self.show_all and self.can_show_all) or not self.multi_page:
+            self.result_list = self.queryset._clone()
+            return
+        if keys is None:
+            self.keyset = False
+            try:
+                self.result_list = paginator.page(self.page_num).object_list
+            except InvalidPage:
+                raise IncorrectLookupParameters
+            return
+
+        self.multi_page = False
+        cursor = self.get_cursor(request, keys)
+        queryset = self.queryset
+        forward = True
+        if cursor:
+            forward, values = cursor
+            queryset = queryset.filter(self.keyset_filter(keys, values, forward))
+        if not forward:
+            queryset = queryset.reverse()
+        rows = list(queryset[: self.list_per_page + 1])
+        more = len(rows) > self.list_per_page
+        rows = rows[: self.list_per_page]
+        if not forward:
+            rows.reverse()
+        self.result_list = rows
+
+        has_previous = more if not forward else cursor is not None
+        has_next = more if forward else True
+        if has_previous:
+            self.keyset_first_url = self.get_query_string()
+            if rows:
+                self.keyset_previous_url = self.get_query_string({BEFORE_VAR: rows[0].pk})
+        if has_next and rows:
+            self.keyset_next_url = self.get_query_string({AFTER_VAR: rows[-1].pk})
+
+
+class KeysetPaginationMixin:
+    """
+    Opt-in (settings.ADMIN_KEYSET_PAGINATION) cursor paging and estimated
+    counts for changelists of large tables.
+    """
+
+    def get_changelist(self, request, **kwargs):
+        if settings.ADMIN_KEYSET_PAGINATION:
+            return KeysetChangeList
+        return super().get_changelist(request, **kwargs)  # type: ignore
+
+    def get_paginator(self, request, queryset, per_page, *args, **kwargs):
+        if settings.ADMIN_KEYSET_PAGINATION:
+            return EstimatedCountPaginator(queryset, per_page, *args, **kwargs)
+        return super().get_paginator(request, queryset, per_page, *args, **kwargs)  # type: ignore
@@ -1,23 +1,45 @@
+import csv
+from datetime import timedelta
+import re
+
+from ajax_select import make_ajax_field
+from ajax_select.fields import AutoCompleteSelectWidget
 from django.contrib import admin
-from django.forms import ModelForm, ValidationError, fields
-from django.urls import reverse
-from django.utils.html import format_html
+from django.core.exceptions import PermissionDenied
+from django.db.models import Count, Exists, OuterRef
+from django.forms import BaseInlineFormSet, Form, ModelForm, Textarea, ValidationError, fields
+from django.http import HttpResponse, JsonResponse
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.html import format_html, format_html_join
+from django.utils.timezone import now
 from import_export import resources
 from import_export.admin import ImportExportModelAdmin
 from import_export.fields import Field
 
+from src.app.admin.export import StreamingExportMixin
+from src.app.admin.filters import with_count
+from src.app.admin.fingerprint import FingerprintImportMixin
 from src.app.admin.issue import PersonIssueInline
+from src.app.admin.job import BackgroundExportMixin
+from src.app.admin.pagination import KeysetPaginationMixin
+from src.app.admin.search import PersonSearchMixin
 from src.app.models.person import Person
-from src.app.models.prison import PersonPrison, Prison
-from src.app.utils import NO_PRISON_STR, WorkflowStage
-
-
-class PersonResource(resources.ModelResource):
-    current_prison = Field(attribute="current_prison")
-    last_served = Field(attribute="last_served")
-    eligible = Field(attribute="eligible")
-    package_count = Field(attribute="package_count")
-    letter_count = Field(attribute="letter_count")
+from src.app.models.prison import PersonPrison, prison_choices
+from src.app.utils import (
+    NO_PRISON_STR,
+    WorkflowStage,
+    cached_facet_counts,
+    normalize_inmate_number,
+)
+
+
+class PersonResource(FingerprintImportMixin, resources.ModelResource):
+    current_prison = Field(attribute="current_prison", readonly=True)
+    last_served = Field(attribute="last_served", readonly=True)
+    eligible = Field(attribute="eligible", readonly=True)
+    package_count = Field(attribute="package_count", readonly=True)
+    letter_count = Field(attribute="letter_count", readonly=True)
 
     class Meta:
         model = Person
@@ -53,6 +75,9 @@ class PersonResource(resources.ModelResource):
             "package_count",
         )
 
+    def get_queryset(self):
+        return super().get_queryset().with_stats().with_current_prison()
+
 
 class PersonAdminForm(ModelForm):
     allow_empty_inmate = False
@@ -73,8 +98,7 @@ class PersonAdminForm(ModelForm):
         inmate_number = self.cleaned_data.get("inmate_number", "")
         if not self.allow_empty_inmate and not inmate_number:
             raise ValidationError("Inmate ID is required")
-        inmate_number = "".join(list(filter(str.isalnum, inmate_number)))
-        return inmate_number.upper()
+        return normalize_inmate_number(inmate_number)
 
     def clean_first_name(self):
         return self.cleaned_data["first_name"].upper()
@@ -129,51 +153,188 @@ class PersonCreateForm(PersonAdminForm):
         return cleaned_data
 
 
+class PersonPrisonFormSet(BaseInlineFormSet):
+    """
+    Changing the prison closes the current custody row and opens a new one
+    instead of overwriting it, so the custody history is kept.
+    """
+
+    user = None
+
+    def save_existing(self, form, obj, commit=True):
+        if "prison" not in form.changed_data:
+            return super().save_existing(form, obj, commit)
+        return self.instance.move_to_prison(form.cleaned_data["prison"], created_by=self.user)
+
+
+class PersonPrisonInlineForm(ModelForm):
+    class Meta:
+        model = PersonPrison
+        fields = ("prison",)
+
+    prison = make_ajax_field(
+        PersonPrison,
+        "prison",
+        "prison_channel",
+        required=False,
+        help_text=f"Leave empty for {NO_PRISON_STR}.",
+        show_help_text=True,
+    )
+
+
 class PersonPrisonInline(admin.TabularInline):
     model = PersonPrison
+    form = PersonPrisonInlineForm
+    formset = PersonPrisonFormSet
     max_num = 1
     verbose_name = "Prison"
     verbose_name_plural = "Prisons"
     can_delete = False
     fields = ("prison",)
 
-    def formfield_for_foreignkey(self, db_field, request, **kwargs):
-        if db_field.name == "prison":
-            kwargs["queryset"] = Prison.objects.all().order_by("name")
-            kwargs["empty_label"] = NO_PRISON_STR
-        return super().formfield_for_foreignkey(db_field, request, **kwargs)
-
     def get_formset(self, request, obj=None, **kwargs):
-        """
-        Override the formset function in order to remove the add and
-        change buttons beside the foreign key pull-down menus in the inline.
-        From: https://stackoverflow.com/a/37558444
-        """
         formset = super().get_formset(request, obj, **kwargs)
-        form = formset.form
-        widget = form.base_fields["prison"].widget
-        widget.can_add_related = False
-        widget.can_change_related = False
+        formset.user = request.user
         return formset
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).current()
+
+
+class EligibilityCheckForm(Form):
+    max_inmate_numbers = 1000
+
+    inmate_numbers = fields.CharField(
+        required=False,
+        widget=Textarea(attrs={"rows": 15, "cols": 40}),
+        help_text="One inmate number per line (commas also work).",
+    )
+    upload = fields.FileField(
+        required=False, help_text="Or upload a .txt/.csv file with one inmate number per line."
+    )
+    output = fields.ChoiceField(
+        choices=[("html", "Show on page"), ("csv", "Download CSV"), ("json", "JSON")],
+        initial="html",
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        assert cleaned_data  # make pyright happy
+        text = cleaned_data.get("inmate_numbers", "")
+        if upload := cleaned_data.get("upload"):
+            text += "\n" + upload.read().decode("utf-8-sig", errors="replace")
+        inmate_numbers = [
+            inmate_number
+            for value in re.split(r"[\r\n,;\t]+", text)
+            if (inmate_number := normalize_inmate_number(value))
+        ]
+        # drop duplicates, keep the order of the stack of letters
+        inmate_numbers = list(dict.fromkeys(inmate_numbers))
+        if not inmate_numbers:
+            raise ValidationError("Enter or upload at least one inmate number.")
+        if len(inmate_numbers) > self.max_inmate_numbers:
+            raise ValidationError(
+                f"Check at most {self.max_inmate_numbers} inmate numbers at a time "
+                f"({len(inmate_numbers)} entered)."
+            )
+        cleaned_data["inmate_number_list"] = inmate_numbers
+        return cleaned_data
+
+
+ELIGIBILITY_CHECK_FIELDS = (
+    "inmate_number",
+    "found",
+    "name",
+    "current_prison",
+    "restrictions",
+    "last_served",
+    "pending_letter_count",
+    "eligible",
+    "eligibility",
+)
+
+
+def check_eligibility(inmate_numbers: list[str]) -> list[dict]:
+    """
+    Eligibility details for each inmate number, in the order given. Always two
+    queries: people with their stats annotations, and their current prisons.
+    """
+    people = {
+        person.inmate_number: person
+        for person in Person.objects.filter(inmate_number__in=inmate_numbers)
+        .with_stats()
+        .with_current_prison()
+    }
+    results = []
+    for inmate_number in inmate_numbers:
+        if not (person := people.get(inmate_number)):
+            results.append({"inmate_number": inmate_number, "found": False})
+            continue
+        prison = person.current_prison
+        last_served = person.last_served
+        results.append(
+            {
+                "inmate_number": inmate_number,
+                "found": True,
+                "person_id": person.id,
+                "name": person.get_name_str(),
+                "current_prison": prison.name if prison else NO_PRISON_STR,
+                "restrictions": prison.restrictions if prison else "",
+                "last_served": last_served.strftime("%Y-%m-%d") if last_served else None,
+                "pending_letter_count": person.pending_letter_count,
+                "eligible": person.eligible,
+                "eligibility": str(person.get_eligibility_str(links=False)),
+            }
+        )
+    return results
+
+
+def current_custody_counts() -> dict[int | str, int]:
+    """People currently held per prison, and under "no_prison" everyone else."""
+    counts = dict(
+        PersonPrison.objects.current()
+        .filter(prison__isnull=False)
+        .order_by()
+        .values("prison")
+        .annotate(count=Count("pk"))
+        .values_list("prison", "count")
+    )
+    counts["no_prison"] = Person.objects.count() - sum(counts.values())
+    return counts
+
 
 class PrisonListFilter(admin.SimpleListFilter):
+    """
+    Prisons are picked with a search box rather than listed; only the
+    selected prison and "not in custody" are shown as links.
+    """
+
     title = "prisons"
     parameter_name = "personprison"
+    template = "admin/app/person/prison_filter.html"
 
     def lookups(self, request, model_admin):
+        counts = cached_facet_counts("person.current_prison", current_custody_counts)
         prisons = []
-        for prison in Prison.objects.all():
-            prisons.append((prison.id, prison.name))
-        prisons.append(("no_prison", NO_PRISON_STR))
+        if (value := self.value()) and value.isdigit():
+            names = dict(prison_choices())
+            if (prison_id := int(value)) in names:
+                prisons.append((prison_id, with_count(names[prison_id], counts.get(prison_id, 0))))
+        prisons.append(("no_prison", with_count(NO_PRISON_STR, counts["no_prison"])))
         return prisons
 
+    def search_widget(self):
+        widget = AutoCompleteSelectWidget("prison_channel")
+        html = widget.render(self.parameter_name, None, attrs={"id": "prison_filter"})
+        return format_html("{}{}", widget.media, html)
+
     def queryset(self, request, queryset):
         if not self.value():
             return queryset.all()
+        current = PersonPrison.objects.current().filter(person=OuterRef("pk"))
         if self.value() == "no_prison":
-            return queryset.filter(prisons__prison__id=None)
-        return queryset.filter(prisons__prison__id=self.value())
+            return queryset.exclude(Exists(current.filter(prison__isnull=False)))
+        return queryset.filter(Exists(current.filter(prison_id=self.value())))
 
 
 class EligibilityListFilter(admin.SimpleListFilter):
@@ -181,10 +342,11 @@ class EligibilityListFilter(admin.SimpleListFilter):
     parameter_name = "eligibility"
 
     def lookups(self, request, model_admin):
+        counts = cached_facet_counts("person.eligibility", Person.objects.eligibility_counts)
         return [
-            ("true", "Eligible"),
-            ("false", "Not eligible"),
-            ("pending", "Eligible, letters pending"),
+            ("true", with_count("Eligible", counts["eligible"])),
+            ("false", with_count("Not eligible", counts["not_eligible"])),
+            ("pending", with_count("Eligible, letters pending", counts["pending"])),
         ]
 
     def queryset(self, request, queryset):
@@ -197,13 +359,52 @@ class EligibilityListFilter(admin.SimpleListFilter):
         return queryset.all()
 
 
-class PersonAdmin(ImportExportModelAdmin):
+class NextEligibleListFilter(admin.SimpleListFilter):
+    title = "Becomes eligible"
+    parameter_name = "next_eligible"
+
+    def lookups(self, request, model_admin):
+        return [
+            ("7", "Within 7 days"),
+            ("30", "Within 30 days"),
+            ("90", "Within 90 days"),
+        ]
+
+    def queryset(self, request, queryset):
+        if self.value() not in ("7", "30", "90"):
+            return queryset.all()
+        start = now()
+        return queryset.eligible_between(start, start + timedelta(days=int(self.value())))
+
+
+class PersonAdmin(
+    KeysetPaginationMixin,
+    PersonSearchMixin,
+    BackgroundExportMixin,
+    StreamingExportMixin,
+    ImportExportModelAdmin,
+):
     resource_class = PersonResource
+    change_list_template = "admin/app/person/change_list.html"
 
     def last_served_date(self, obj: Person) -> str | None:
         if obj.last_served:
             return obj.last_served.strftime("%Y-%m-%d")
 
+    setattr(last_served_date, "admin_order_field", "stat_last_served")
+
+    def next_eligible(self, obj: Person) -> str | None:
+        if obj.next_eligible_date:
+            return obj.next_eligible_date.strftime("%Y-%m-%d")
+
+    setattr(next_eligible, "admin_order_field", "next_eligible_date")
+
+    def open_issues(self, obj: Person) -> str:
+        return obj.open_issues
+
+    # most open issues first on the first click
+    setattr(open_issues, "admin_order_field", "-stat_open_issue_count")
+
     list_display = (
         "inmate_number",
         "last_name",
@@ -212,6 +413,7 @@ class PersonAdmin(ImportExportModelAdmin):
         "open_issues",
         "status",
         "last_served_date",
+        "next_eligible",
         "current_prison",
         "package_count",
         "pending_letter_count",
@@ -221,6 +423,7 @@ class PersonAdmin(ImportExportModelAdmin):
     )
     readonly_fields = (
         "current_prison",
+        "custody_history",
         "created_by",
         "created_date",
         "modified_date",
@@ -232,7 +435,9 @@ class PersonAdmin(ImportExportModelAdmin):
     list_filter = (
         PrisonListFilter,
         EligibilityListFilter,
+        NextEligibleListFilter,
     )
+    # Shows the search box; PersonSearchMixin does the matching
     search_fields = (
         "inmate_number",
         "last_name",
@@ -245,6 +450,51 @@ class PersonAdmin(ImportExportModelAdmin):
     list_per_page = 25
     inlines = [PersonPrisonInline, PersonIssueInline]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_stats().with_current_prison()
+
+    def get_urls(self):
+        return [
+            path(
+                "eligibility-check/",
+                self.admin_site.admin_view(self.eligibility_check_view),
+                name="app_person_eligibility_check",
+            ),
+            *super().get_urls(),
+        ]
+
+    def eligibility_check_view(self, request):
+        """
+        Mail-day intake: check a whole stack of inmate numbers at once.
+        """
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        form = EligibilityCheckForm(request.POST or None, request.FILES or None)
+        results = None
+        if request.method == "POST" and form.is_valid():
+            results = check_eligibility(form.cleaned_data["inmate_number_list"])
+            if form.cleaned_data["output"] == "json":
+                return JsonResponse({"results": results})
+            if form.cleaned_data["output"] == "csv":
+                response = HttpResponse(
+                    content_type="text/csv",
+                    headers={"Content-Disposition": 'attachment; filename="eligibility.csv"'},
+                )
+                writer = csv.DictWriter(
+                    response, fieldnames=ELIGIBILITY_CHECK_FIELDS, extrasaction="ignore"
+                )
+                writer.writeheader()
+                writer.writerows(results)
+                return response
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Batch eligibility check",
+            "form": form,
+            "results": results,
+        }
+        return TemplateResponse(request, "admin/app/person/eligibility_check.html", context)
+
     def get_form(self, request, obj=None, **kwargs):
         if not obj:
             return PersonCreateForm
@@ -252,7 +502,7 @@ class PersonAdmin(ImportExportModelAdmin):
 
     def get_fields(self, request, obj=None):
         if obj:
-            return PersonAdminForm.Meta.fields
+            return [*PersonAdminForm.Meta.fields, "custody_history"]
         else:
             return PersonCreateForm.Meta.fields
 
@@ -262,6 +512,23 @@ class PersonAdmin(ImportExportModelAdmin):
         link = reverse("admin:app_prison_change", kwargs={"object_id": person.current_prison.id})
         return format_html("<a href={}>{}</a>", link, person.current_prison.name)
 
+    def custody_history(self, person: Person):
+        past = (
+            person.prisons.exclude(valid_to=None).select_related("prison").order_by("-valid_from")
+        )
+        return format_html_join(
+            "",
+            "<div>{} ({} to {})</div>",
+            (
+                (
+                    person_prison.prison or NO_PRISON_STR,
+                    person_prison.valid_from.strftime("%Y-%m-%d"),
+                    person_prison.valid_to.strftime("%Y-%m-%d"),
+                )
+                for person_prison in past
+            ),
+        )
+
     def pending_letter_count(self, person):
         if not person.pending_letter_count:
             return
@@ -273,6 +540,8 @@ class PersonAdmin(ImportExportModelAdmin):
             person.pending_letter_count,
         )
 
+    setattr(pending_letter_count, "admin_order_field", "stat_pending_count")
+
     def letter_count(self, person):
         if not person.letter_count:
             return
@@ -283,6 +552,8 @@ class PersonAdmin(ImportExportModelAdmin):
             person.letter_count,
         )
 
+    setattr(letter_count, "admin_order_field", "stat_letter_count")
+
     def package_count(self, person):
         if not person.package_count:
             return
@@ -294,6 +565,8 @@ class PersonAdmin(ImportExportModelAdmin):
             person.package_count,
         )
 
+    setattr(package_count, "admin_order_field", "stat_package_count")
+
     def save_model(self, request, obj, form, change):
         if not obj.pk:
             obj.created_by = request.user
@@ -1,11 +1,13 @@
 from import_export import resources
 from import_export.admin import ImportExportModelAdmin
 
+from src.app.admin.fingerprint import FingerprintImportMixin
+from src.app.admin.job import BackgroundExportMixin
 from src.app.models.prison import Prison
-from src.app.utils import render_address_template
+from src.app.utils import format_address
 
 
-class PrisonResource(resources.ModelResource):
+class PrisonResource(FingerprintImportMixin, resources.ModelResource):
     class Meta:
         model = Prison
         skip_unchanged = True
@@ -26,7 +28,7 @@ class PrisonResource(resources.ModelResource):
         )
 
 
-class PrisonAdmin(ImportExportModelAdmin):
+class PrisonAdmin(BackgroundExportMixin, ImportExportModelAdmin):
     resource_class = PrisonResource
 
     list_display = (
@@ -42,6 +44,7 @@ class PrisonAdmin(ImportExportModelAdmin):
         "modified_date",
     )
     list_display_links = ("name",)
+    list_select_related = ("created_by", "modified_by")
     list_filter = ("prison_type",)
     search_fields = (
         "name",
@@ -65,7 +68,7 @@ class PrisonAdmin(ImportExportModelAdmin):
         headers = [prison.name]
         if prison.additional_mailing_headers:
             headers.append(prison.additional_mailing_headers)
-        return render_address_template(
+        return format_address(
             headers,
             prison.mailing_address,
             prison.mailing_city,
@@ -0,0 +1,32 @@
+from django.contrib import messages
+from django.contrib.admin.views.main import ORDER_VAR
+
+from src.app.search import TRIGRAM_MIN_LENGTH, search_people
+
+
+class PersonSearchMixin:
+    """
+    Search box backed by search_people() instead of search_fields. Results are
+    ranked best first unless a column is sorted.
+    """
+
+    # Path from the admin's model to Person fields
+    person_search_prefix = ""
+
+    def get_search_results(self, request, queryset, search_term):
+        queryset, indexed = search_people(
+            queryset,
+            search_term,
+            self.person_search_prefix,
+            # a sorted column takes precedence over rank
+            ranked=ORDER_VAR not in request.GET,
+        )
+        if not indexed:
+            self.message_user(  # type: ignore
+                request,
+                f"Substring search: “{search_term}” was matched without the search "
+                f"index, so results are unranked. Words of {TRIGRAM_MIN_LENGTH} or more "
+                "characters are searched by index on PostgreSQL.",
+                messages.WARNING,
+            )
+        return queryset, False
@@ -7,6 +7,9 @@ class AppConfig(DjAppConfig):
     name = "src.app"
     verbose_name = "Letter Processing"
 
+    def ready(self):
+        from src.app import signals  # noqa: F401
+
 
 class AdminConfig(DjAdminConfig):
     default_site = "src.app.admin_site.AdminSite"
@@ -0,0 +1,302 @@
+"""
+Bulk import of legacy person CSVs (`./manage.py bulk_import`).
+
+Columns: inmate_number (required), first_name, middle_name, last_name,
+name_suffix, legacy_last_served_date and legacy_prison_id (Prison.legacy_id).
+Rows are read as a stream and handled in batches, one transaction each: the
+people, current custody and last served dates a batch needs are read with one
+query apiece and written back with bulk_create/bulk_update, bypassing the
+per-row save() and signals of the import-export resources.
+
+A legacy last served date becomes a fulfilled letter (which is what
+Person.last_served is derived from) when it is later than any the person has.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils.timezone import make_aware, now
+
+from src.app.models.fulfillment import FulfillmentBatch
+from src.app.models.letter import Letter
+from src.app.models.person import Person, PersonStats, get_next_eligible_date
+from src.app.models.prison import PersonPrison, Prison
+from src.app.utils import (
+    WorkflowStage,
+    invalidate_facet_counts,
+    invalidate_lookups,
+    normalize_inmate_number,
+)
+
+NAME_FIELDS = ("first_name", "middle_name", "last_name", "name_suffix")
+DATE_FORMATS = ("%m/%d/%Y", "%Y-%m-%d", "%m/%d/%y")
+SERVED_NOTE = "Legacy last served date (bulk import)"
+
+
+@dataclass
+class ImportRow:
+    line: int
+    inmate_number: str
+    # only the name columns the row fills in
+    names: dict[str, str]
+    last_served: datetime | None
+    prison_id: int | None
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    moved: int = 0
+    served: int = 0
+    # (line, message)
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (
+            f"{self.rows} rows: {self.created} people created, {self.updated} updated, "
+            f"{self.unchanged} unchanged, {self.moved} custody changes, "
+            f"{self.served} last served dates, {len(self.errors)} errors."
+        )
+
+
+def parse_date(value: str) -> datetime:
+    for date_format in DATE_FORMATS:
+        try:
+            return make_aware(datetime.strptime(value, date_format))
+        except ValueError:
+            pass
+    raise ValueError(f"Unrecognized date {value!r}")
+
+
+class BulkImport:
+    """
+    One import run. `on_change` receives a line describing each change, as it
+    is made (or, with dry_run, would be).
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 5000,
+        dry_run: bool = False,
+        on_change: Callable[[str], None] | None = None,
+    ):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.on_change = on_change or (lambda change: None)
+        self.report = ImportReport()
+        self.prison_ids = dict(Prison.objects.exclude(legacy_id="").values_list("legacy_id", "pk"))
+        # inmate number -> first line it was seen on
+        self.seen: dict[str, int] = {}
+
+    def run(
+        self,
+        rows: Iterable[tuple[int, dict]],
+        on_batch: Callable[[int], None] | None = None,
+    ) -> ImportReport:
+        """
+        Import (line, row) pairs. `on_batch` is called with the last line of
+        each batch once it is committed.
+        """
+        rows = iter(rows)
+        while batch := list(islice(rows, self.batch_size)):
+            valid = [row for row in map(self.clean, batch) if row]
+            with transaction.atomic():
+                self.import_batch(valid)
+            if on_batch and not self.dry_run:
+                on_batch(batch[-1][0])
+        if not self.dry_run:
+            invalidate_facet_counts()
+            invalidate_lookups("people", "letters")
+        return self.report
+
+    def error(self, line: int, message: str) -> None:
+        self.report.errors.append((line, message))
+
+    def clean(self, numbered_row: tuple[int, dict]) -> ImportRow | None:
+        line, row = numbered_row
+        self.report.rows += 1
+        values = {key: (value or "").strip() for key, value in row.items() if key}
+        inmate_number = normalize_inmate_number(values.get("inmate_number", ""))
+        if not inmate_number:
+            return self.error(line, "Missing inmate_number")
+        if (first_line := self.seen.setdefault(inmate_number, line)) != line:
+            return self.error(line, f"{inmate_number} is a duplicate of line {first_line}")
+        last_served = None
+        if value := values.get("legacy_last_served_date"):
+            try:
+                last_served = parse_date(value)
+            except ValueError as e:
+                return self.error(line, str(e))
+        prison_id = None
+        if legacy_id := values.get("legacy_prison_id"):
+            if (prison_id := self.prison_ids.get(legacy_id)) is None:
+                return self.error(line, f"No prison with legacy ID {legacy_id}")
+        return ImportRow(
+            line=line,
+            inmate_number=inmate_number,
+            names={name: values[name].upper() for name in NAME_FIELDS if values.get(name)},
+            last_served=last_served,
+            prison_id=prison_id,
+        )
+
+    def import_batch(self, rows: list[ImportRow]) -> None:
+        existing = {
+            person["inmate_number"]: person
+            for person in Person.objects.filter(
+                inmate_number__in=[row.inmate_number for row in rows]
+            ).values("pk", "inmate_number", "status", *NAME_FIELDS)
+        }
+        accepted, created, updated = [], [], []
+        for row in rows:
+            if person := existing.get(row.inmate_number):
+                accepted.append(row)
+                changes = {
+                    name: value for name, value in row.names.items() if person[name] != value
+                }
+                if not changes:
+                    self.report.unchanged += 1
+                    continue
+                self.report.updated += 1
+                names = {name: person[name] for name in NAME_FIELDS} | changes
+                updated.append(
+                    Person(
+                        pk=person["pk"],
+                        inmate_number=row.inmate_number,
+                        status=person["status"],
+                        modified_date=now(),
+                        **names,
+                    )
+                )
+                self.on_change(
+                    f"line {row.line}: update {row.inmate_number} "
+                    + ", ".join(
+                        f"{name} {person[name]!r} -> {value!r}" for name, value in changes.items()
+                    )
+                )
+            elif "first_name" in row.names and "last_name" in row.names:
+                accepted.append(row)
+                self.report.created += 1
+                created.append(
+                    Person(
+                        inmate_number=row.inmate_number,
+                        next_eligible_date=get_next_eligible_date(row.last_served),
+                        **row.names,
+                    )
+                )
+                self.on_change(f"line {row.line}: create {row.inmate_number}")
+            else:
+                self.error(row.line, f"New person {row.inmate_number} needs first and last names")
+
+        existing_ids = {inmate_number: person["pk"] for inmate_number, person in existing.items()}
+        person_ids = dict(existing_ids)
+        if not self.dry_run:
+            # bulk_create/bulk_update skip Person.save(), which keeps row_hash
+            for person in (*created, *updated):
+                person.row_hash = person.fingerprint()
+            Person.objects.bulk_create(created)
+            person_ids.update((person.inmate_number, person.pk) for person in created)
+            Person.objects.bulk_update(
+                updated, [*NAME_FIELDS, "row_hash", "modified_date"], batch_size=1000
+            )
+        self.update_custody(accepted, person_ids, existing_ids)
+        served_ids = self.add_last_served(accepted, person_ids, existing_ids)
+        if self.dry_run:
+            return
+        # New people's stats are known: at most the one served letter added above
+        PersonStats.objects.bulk_create(
+            PersonStats(
+                person_id=person_ids[row.inmate_number],
+                last_served=row.last_served,
+                package_count=int(row.last_served is not None),
+                letter_count=int(row.last_served is not None),
+            )
+            for row in accepted
+            if row.inmate_number not in existing_ids
+        )
+        PersonStats.refresh(served_ids)
+
+    def update_custody(
+        self, rows: list[ImportRow], person_ids: dict[str, int], existing_ids: dict[str, int]
+    ) -> None:
+        current = dict(
+            PersonPrison.objects.current()
+            .filter(person_id__in=existing_ids.values())
+            .values_list("person_id", "prison_id")
+        )
+        moves = {}
+        for row in rows:
+            if row.prison_id is None:
+                continue
+            if current.get(existing_ids.get(row.inmate_number), -1) == row.prison_id:
+                continue
+            moves[row.inmate_number] = row.prison_id
+            self.on_change(f"line {row.line}: move {row.inmate_number} to prison {row.prison_id}")
+        self.report.moved += len(moves)
+        if self.dry_run or not moves:
+            return
+        moved_at = now()
+        if moved_ids := [existing_ids[number] for number in moves if number in existing_ids]:
+            PersonPrison.objects.current().filter(person_id__in=moved_ids).update(valid_to=moved_at)
+        PersonPrison.objects.bulk_create(
+            PersonPrison(
+                person_id=person_ids[inmate_number], prison_id=prison_id, valid_from=moved_at
+            )
+            for inmate_number, prison_id in moves.items()
+        )
+        # bulk_create skips the custody signals
+        FulfillmentBatch.refresh_totals_for_people(moved_ids)
+
+    def add_last_served(
+        self, rows: list[ImportRow], person_ids: dict[str, int], existing_ids: dict[str, int]
+    ) -> set[int]:
+        """Add the served letters; returns the existing people who got one."""
+        last_served = dict(
+            Letter.objects.filter(
+                person_id__in=existing_ids.values(),
+                workflow_stage=WorkflowStage.FULFILLED,
+                counts_against_last_served=True,
+            )
+            .order_by()
+            .values("person_id")
+            .annotate(last_served=Max("fulfilled_date"))
+            .values_list("person_id", "last_served")
+        )
+        served = []
+        for row in rows:
+            if row.last_served is None:
+                continue
+            person_id = person_ids.get(row.inmate_number)
+            if (current := last_served.get(person_id)) and current >= row.last_served:
+                continue
+            self.on_change(
+                f"line {row.line}: {row.inmate_number} last served {row.last_served.date()}"
+            )
+            served.append(
+                Letter(
+                    person_id=person_id,
+                    workflow_stage=WorkflowStage.FULFILLED,
+                    postmark_date=None,
+                    stage1_complete_date=None,
+                    fulfilled_date=row.last_served,
+                    prison_sent_to_id=row.prison_id,
+                    notes=SERVED_NOTE,
+                )
+            )
+        self.report.served += len(served)
+        if not self.dry_run:
+            Letter.objects.bulk_create(served)
+        return {letter.person_id for letter in served} & set(existing_ids.values())
+
+
+def numbered(reader, start_after: int = 0) -> Iterator[tuple[int, dict]]:
+    """(line number, row) from a csv.DictReader, skipping lines up to `start_after`."""
+    for row in reader:
+        if reader.line_num > start_after:
+            yield reader.line_num, row
@@ -16,7 +16,7 @@ from src.app.admin.person import PersonAdminForm
 from src.app.models.issue import LetterIssue, PersonIssue
 from src.app.models.letter import Letter
 from src.app.models.person import Person
-from src.app.models.prison import PersonPrison, Prison
+from src.app.models.prison import PersonPrison
 from src.auth.models import User
 
 # TODO: split into different files
@@ -91,7 +91,7 @@ class ContribPersonForm(PersonAdminForm):
             ),
         }
 
-    prison = forms.ModelChoiceField(queryset=Prison.objects.all().order_by("name"))
+    prison = make_ajax_field(PersonPrison, "prison", "prison_channel", required=True)
     issue = forms.ChoiceField(
         choices=[("", "-----"), *PersonIssue.IssueTypes.choices], required=False
     )
@@ -0,0 +1,92 @@
+"""
+Background jobs without a broker: enqueue() adds a Job row, and
+`manage.py run_workers` claims and runs it. Admin actions and exports are
+routed here by src.app.admin.job.
+"""
+
+from collections import defaultdict
+import logging
+import traceback
+from typing import Callable
+
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages import constants
+from django.http import HttpRequest, QueryDict
+from django.utils.html import conditional_escape
+from django.utils.timezone import now
+
+from src.app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+_registry: dict[str, Callable] = {}
+
+
+def job_name(func: Callable) -> str:
+    """The Job.name a job function is registered and queued under."""
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def job(func: Callable) -> Callable:
+    """Register `func(job, **kwargs)` to be run by workers."""
+    _registry[job_name(func)] = func
+    return func
+
+
+def enqueue(func: Callable, description: str, user=None, **kwargs) -> Job:
+    """Queue a registered job function; kwargs must be JSON serializable."""
+    name = job_name(func)
+    if name not in _registry:
+        raise ValueError(f"{name} is not a registered job")
+    return Job.objects.create(name=name, description=description, created_by=user, kwargs=kwargs)
+
+
+def run_job(job: Job):
+    """Run a claimed job, recording how it finished."""
+    try:
+        _registry[job.name](job, **job.kwargs)
+    except Exception:
+        logger.exception("%s failed", job)
+        job.status = Job.Statuses.FAILED
+        job.error = traceback.format_exc()
+    else:
+        job.status = Job.Statuses.DONE
+    job.finished_date = now()
+    job.save(
+        update_fields=[
+            "status",
+            "error",
+            "messages",
+            "output_name",
+            "output_content_type",
+            "finished_date",
+        ]
+    )
+
+
+class JobMessages:
+    """Message storage collecting ModelAdmin.message_user calls into the job."""
+
+    def __init__(self, job: Job):
+        self.job = job
+
+    def add(self, level, message, extra_tags=""):
+        self.job.messages.append(
+            [constants.DEFAULT_TAGS.get(level, ""), conditional_escape(message)]
+        )
+
+
+class JobRequest(HttpRequest):
+    """Stands in for the request that queued the job, for admin code run by it."""
+
+    def __init__(self, job: Job, query: str = ""):
+        super().__init__()
+        self.job = job
+        self.method = "GET"
+        self.GET = QueryDict(query)
+        self.user = job.created_by or AnonymousUser()
+        self._messages = JobMessages(job)
+        # One time for every batch of a queued action, and what the batches
+        # collected for its summary (see src.app.admin.job.run_admin_action)
+        self.started = job.started_date or now()
+        self.collected: defaultdict[str, list] = defaultdict(list)
@@ -0,0 +1,199 @@
+"""
+Printable mailing labels and packing slips for letters (the Letters "Print"
+actions and /admin/app/letter/print/<document>/).
+
+Both are HTML pages laid out for printing, and for the browser's Save as
+PDF: labels on 30-up US Letter sheets (Avery 5160), packing slips one per
+page. Letters are read in print order from the database CHUNK_SIZE at a time,
+with their people and current prisons (two queries a chunk), rendered from
+format strings and streamed as they are read.
+"""
+
+from itertools import islice
+from typing import Iterable, Iterator
+
+from django.db.models import F, OuterRef, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.template.defaultfilters import pluralize
+from django.template.loader import render_to_string
+from django.utils.html import conditional_escape, format_html, format_html_join
+
+from src.app.models.letter import Letter
+from src.app.models.person import Person, prefetch_current_prison
+from src.app.models.prison import PersonPrison, Prison
+from src.app.utils import format_address, format_address_text
+
+LABELS_PER_SHEET = 30
+# letters read, and slips per chunk of streamed output
+CHUNK_SIZE = 100
+ROWS_MARKER = "<!-- rows -->"
+
+_LABEL_HTML = '<div class="label">{address}</div>'
+_SLIP_HTML = (
+    '<section class="slip">\n'
+    "  <h1>Packing slip</h1>\n"
+    "  <p>Letter {letter_id}, postmarked {postmark_date}</p>\n"
+    '  <div class="address">{address}</div>\n'
+    "  <dl>\n"
+    "    <dt>Name</dt><dd>{name}</dd>\n"
+    "    <dt>Inmate number</dt><dd>{inmate_number}</dd>\n"
+    "    <dt>Prison</dt><dd>{prison}</dd>\n"
+    "    <dt>Restrictions</dt><dd>{restrictions}</dd>\n"
+    "    <dt>Notes</dt><dd>{notes}</dd>\n"
+    "  </dl>\n"
+    '  <p class="books">Books:</p>\n'
+    "</section>\n"
+)
+
+
+def mailing_address(person: Person | None) -> tuple[list[str | None], Prison] | None:
+    """
+    Recipient header lines and current prison for mail to `person`, or None
+    if there is nothing to address: no person or prison, or an SCI.
+    """
+    if not person or not (prison := person.current_prison):
+        return None
+    if prison.prison_type == Prison.Types.SCI:
+        return None
+    # this suppresses county/city ID numbers (which may be incorrect)
+    # unhandled case: some county prisoners do have correct IDs
+    if prison.prison_type in (Prison.Types.COUNTY, Prison.Types.CITY):
+        inmate_number = None
+    else:
+        inmate_number = person.inmate_number
+    headers = [person.get_name_str(), inmate_number, prison.name]
+    if prison.additional_mailing_headers:
+        headers.append(prison.additional_mailing_headers)
+    return headers, prison
+
+
+def format_mailing_address(person: Person | None, text: bool = False) -> str | None:
+    """mailing_address() as an HTML block, or with `text`, escaped plain lines."""
+    if not (address := mailing_address(person)):
+        return None
+    headers, prison = address
+    lines = (
+        prison.mailing_address,
+        prison.mailing_city,
+        prison.mailing_state,
+        prison.mailing_zipcode,
+    )
+    if text:
+        return conditional_escape(format_address_text(headers, *lines))
+    return format_address(headers, *lines)
+
+
+def load_letters(queryset: QuerySet[Letter]) -> Iterator[Letter]:
+    """
+    The letters with their people and current prisons, ordered by prison and
+    name so labels and slips come out in the same order, read CHUNK_SIZE at a
+    time (two queries each).
+    """
+    current_prison_name = (
+        PersonPrison.objects.current().filter(person=OuterRef("person")).values("prison__name")[:1]
+    )
+    return (
+        queryset.select_related("person")
+        # replacing any prefetches the changelist queryset already has
+        .prefetch_related(None)
+        .prefetch_related(prefetch_current_prison("person"))
+        .alias(print_prison_name=Coalesce(Subquery(current_prison_name), Value("")))
+        .order_by(
+            "print_prison_name",
+            F("person__last_name").asc(nulls_first=True),
+            F("person__first_name").asc(nulls_first=True),
+            "pk",
+        )
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def _chunks(rows: Iterable[str], size: int) -> Iterator[str]:
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield "".join(chunk)
+
+
+def _page(
+    title: str, document: str, rows: Iterable[str], skipped: list[Letter], reason: str
+) -> Iterator[str]:
+    """
+    The page around `rows`, then the letters left out of them, which are
+    only known once the rows have been read.
+    """
+    page = render_to_string(
+        "admin/app/letter/print.html", {"title": title, "document": document, "rows": ROWS_MARKER}
+    )
+    head, tail = page.split(ROWS_MARKER)
+    yield head
+    yield from rows
+    if skipped:
+        yield format_html(
+            '<div class="toolbar"><p>{} letter{} left out ({}): {}</p></div>\n',
+            len(skipped),
+            pluralize(len(skipped)),
+            reason,
+            format_html_join(
+                ", ",
+                "{}{}",
+                (
+                    (letter.pk, f" ({letter.person.inmate_number})" if letter.person else "")
+                    for letter in skipped
+                ),
+            ),
+        )
+    yield tail
+
+
+def iter_label_sheets(letters: Iterable[Letter]) -> Iterator[str]:
+    """Label sheet HTML, a sheet at a time. Letters with no address are listed below."""
+    skipped: list[Letter] = []
+
+    def labels() -> Iterator[str]:
+        for letter in letters:
+            if address := format_mailing_address(letter.person, text=True):
+                yield _LABEL_HTML.format(address=address)
+            else:
+                skipped.append(letter)
+
+    sheets = (
+        f'<div class="sheet">{sheet}</div>\n' for sheet in _chunks(labels(), LABELS_PER_SHEET)
+    )
+    return _page(
+        "Mailing labels", "labels", sheets, skipped, "no person, no current prison, or an SCI"
+    )
+
+
+def packing_slip(letter: Letter) -> str:
+    person = letter.person
+    prison = person.current_prison if person else None
+    return _SLIP_HTML.format(
+        letter_id=letter.pk,
+        postmark_date=letter.postmark_date or "",
+        address=format_mailing_address(person, text=True) or "",
+        name=conditional_escape(person.get_name_str()) if person else "",
+        inmate_number=conditional_escape(person.inmate_number or "") if person else "",
+        prison=conditional_escape(prison.name) if prison else "",
+        restrictions=conditional_escape(prison.restrictions) if prison else "",
+        notes=conditional_escape(letter.notes),
+    )
+
+
+def iter_packing_slips(letters: Iterable[Letter]) -> Iterator[str]:
+    """Packing slip HTML, CHUNK_SIZE slips at a time, one slip per printed page."""
+    skipped: list[Letter] = []
+
+    def slips() -> Iterator[str]:
+        for letter in letters:
+            if letter.person:
+                yield packing_slip(letter)
+            else:
+                skipped.append(letter)
+
+    return _page("Packing slips", "slips", _chunks(slips(), CHUNK_SIZE), skipped, "no person")
+
+
+DOCUMENTS = {
+    "labels": iter_label_sheets,
+    "slips": iter_packing_slips,
+}
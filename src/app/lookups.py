@@ -1,23 +1,120 @@
+from hashlib import md5
+
 from ajax_select import LookupChannel, register
-from django.db.models import Q
+from django.core.cache import cache
+from django.db.models import F, prefetch_related_objects
 from django.urls import reverse
 from django.utils.html import format_html
 
 from src.app.models.letter import Letter
-from src.app.models.person import Person
+from src.app.models.person import Person, prefetch_current_prison
+from src.app.models.prison import Prison, prison_choices
+from src.app.search import lookup_people, match_words, parse_letter_query, person_document
+from src.app.utils import (
+    LOOKUP_CACHE_TIMEOUT,
+    count_lookup,
+    lookup_cache_version,
+    normalize_inmate_number,
+)
 
 
-@register("person_channel")
-class PersonLookup(LookupChannel):
-    model = Person
+class CachedLookupMixin:
+    """
+    Caches the matches for each query for LOOKUP_CACHE_TIMEOUT, or until
+    invalidate_lookups(cache_group). A query extending a cached one whose
+    candidates were all the matches there were (say "SMIT" after "SMI") is
+    answered by filtering those candidates in memory.
+
+    Subclasses implement find(), candidate() and matches().
+    """
+
+    cache_group: str
+    max_results: int
+    # Matches kept per query; fewer than this means the cached list is complete
+    candidate_limit = 50
+
+    def find(self, q: str, limit: int) -> list:
+        """Up to `limit` matches for the normalized query, best first."""
+        raise NotImplementedError
+
+    def candidate(self, obj) -> tuple:
+        """What matches() needs to know about `obj`."""
+        raise NotImplementedError
+
+    def matches(self, candidate: tuple, q: str) -> bool:
+        """Whether find(q) would return the object `candidate` describes."""
+        raise NotImplementedError
+
+    def refines(self, q: str, shorter: str) -> bool:
+        """Whether every match for `q` is also a match for `shorter`, which it extends."""
+        return True
+
+    def cache_key(self, q: str) -> str:
+        return f"lookup:{self.cache_group}:{md5(q.encode()).hexdigest()}"
 
     def get_query(self, q, request):
         del request
-        return self.model.objects.filter(
-            Q(inmate_number__icontains=q) | Q(first_name__icontains=q) | Q(last_name__icontains=q)
-        ).order_by("inmate_number")[:10]
+        if not (q := " ".join(q.upper().split())):
+            return []
+        version = lookup_cache_version(self.cache_group)
+        # This query and every shorter one it extends, longest first
+        queries = {self.cache_key(q[:end]): q[:end] for end in range(len(q), 0, -1)}
+        keys = list(queries)
+        cached = cache.get_many(keys, version=version)
 
-    def format_match(self, obj):
+        if (entry := cached.get(keys[0])) is not None:
+            outcome, candidates = "hit", entry[1]
+        elif shorter := next(
+            (
+                cached[key]
+                for key in keys[1:]
+                if key in cached and cached[key][0] and self.refines(q, queries[key])
+            ),
+            None,
+        ):
+            outcome = "refined"
+            candidates = [c for c in shorter[1] if self.matches(c[1:], q)]
+            cache.set(keys[0], (True, candidates), LOOKUP_CACHE_TIMEOUT, version=version)
+        else:
+            count_lookup(self.cache_group, "miss")
+            found = self.find(q, self.candidate_limit)
+            candidates = [(obj.pk, *self.candidate(obj)) for obj in found]
+            complete = len(found) < self.candidate_limit
+            cache.set(keys[0], (complete, candidates), LOOKUP_CACHE_TIMEOUT, version=version)
+            return found[: self.max_results]
+
+        count_lookup(self.cache_group, outcome)
+        return self.get_objects([c[0] for c in candidates[: self.max_results]])  # type: ignore
+
+
+class PersonLookupBase(CachedLookupMixin, LookupChannel):
+    """Shared by the admin and contributor person channels."""
+
+    model = Person
+    max_results = 10
+    cache_group = "people"
+
+    def find(self, q, limit):
+        people = lookup_people(self.model.objects.with_stats(), q, limit)
+        prefetch_related_objects(people[: self.max_results], prefetch_current_prison())
+        return people
+
+    def candidate(self, obj: Person):
+        return obj.inmate_number or "", person_document(obj)
+
+    def matches(self, candidate, q):
+        # lookup_people's inmate number and name stages
+        inmate_number, document = candidate
+        if (number := normalize_inmate_number(q)) and inmate_number.startswith(number):
+            return True
+        return all(word in document for word in q.split())
+
+    def get_objects(self, ids):
+        ids = [int(pk) for pk in ids]
+        things = self.model.objects.with_stats().with_current_prison().in_bulk(ids)
+        return [things[pk] for pk in ids if pk in things]
+
+    def format_match(self, obj: Person):
         return format_html(
             "<span class='person'>{} - {}, {}</span>",
             obj.inmate_number,
@@ -25,6 +122,9 @@ class PersonLookup(LookupChannel):
             obj.first_name,
         )
 
+
+@register("person_channel")
+class PersonLookup(PersonLookupBase):
     def format_item_display(self, obj: Person):
 
         link = reverse("admin:app_person_change", kwargs={"object_id": obj.id})
@@ -63,28 +163,12 @@ class PersonLookup(LookupChannel):
 
 
 @register("person_contrib_channel")
-class PersonLookupContrib(LookupChannel):
-    model = Person
-
+class PersonLookupContrib(PersonLookupBase):
     def check_auth(self, request):
         return request.user.is_authenticated and (
             request.user.is_staff or request.user.is_contributor
         )
 
-    def get_query(self, q, request):
-        del request
-        return self.model.objects.filter(
-            Q(inmate_number__icontains=q) | Q(first_name__icontains=q) | Q(last_name__icontains=q)
-        ).order_by("inmate_number")[:10]
-
-    def format_match(self, obj: Person):
-        return format_html(
-            "<span class='person'>{} - {}, {}</span>",
-            obj.inmate_number,
-            obj.last_name,
-            obj.first_name,
-        )
-
     def format_item_display(self, obj: Person):
         body = format_html(
             """
@@ -109,14 +193,46 @@ class PersonLookupContrib(LookupChannel):
 
 
 @register("letter_channel")
-class LetterLookup(LookupChannel):
+class LetterLookup(CachedLookupMixin, LookupChannel):
     model = Letter
+    max_results = 20
+    cache_group = "letters"
 
-    def get_query(self, q, request):
-        del request
-        return self.model.objects.filter(
-            Q(person__last_name__icontains=q) | Q(postmark_date__icontains=q)
-        ).order_by("-created_date")[:20]
+    def find(self, q, limit):
+        """
+        Letters by person name words and postmark date, year, month or day
+        ("smith 2024-03", "03/2024"), most recently postmarked first.
+        """
+        words, date_range = parse_letter_query(q)
+        # format_match and format_item_display need the person
+        letters = self.model.objects.filter(person__isnull=False).select_related("person")
+        if date_range:
+            start, end = date_range
+            letters = letters.filter(postmark_date__gte=start, postmark_date__lt=end)
+        if words:
+            letters, _ = match_words(letters, words, "person__")
+        return list(
+            letters.order_by(F("postmark_date").desc(nulls_last=True), "-created_date")[:limit]
+        )
+
+    def candidate(self, obj: Letter):
+        return (person_document(obj.person) if obj.person else ""), obj.postmark_date
+
+    def matches(self, candidate, q):
+        document, postmark_date = candidate
+        words, date_range = parse_letter_query(q)
+        if date_range and not (postmark_date and date_range[0] <= postmark_date < date_range[1]):
+            return False
+        return all(word in document for word in words)
+
+    def refines(self, q, shorter):
+        # Typing more of a date changes which words are dates
+        return parse_letter_query(q)[1] == parse_letter_query(shorter)[1]
+
+    def get_objects(self, ids):
+        ids = [int(pk) for pk in ids]
+        things = self.model.objects.select_related("person").in_bulk(ids)
+        return [things[pk] for pk in ids if pk in things]
 
     def format_match(self, obj):
         return format_html(
@@ -129,3 +245,37 @@ class LetterLookup(LookupChannel):
         return format_html(
             "<span class='letter'>{} - {}</span>", obj.person.get_name_str(), obj.postmark_date
         )
+
+
+@register("prison_channel")
+class PrisonLookup(LookupChannel):
+    model = Prison
+    max_results = 20
+
+    def check_auth(self, request):
+        return request.user.is_authenticated and (
+            request.user.is_staff or request.user.is_contributor
+        )
+
+    def get_query(self, q, request):
+        del request
+        # Searched in the cached name list; names starting with the term first
+        q = q.strip().casefold()
+        matches = [(pk, name.casefold()) for pk, name in prison_choices() if q in name.casefold()]
+        matches.sort(key=lambda match: not match[1].startswith(q))
+        return self.get_objects([pk for pk, _ in matches[: self.max_results]])
+
+    def get_objects(self, ids):
+        ids = [int(pk) for pk in ids]
+        things = self.model.objects.in_bulk(ids)
+        return [things[pk] for pk in ids if pk in things]
+
+    def format_match(self, obj: Prison):
+        return format_html("<span class='prison'>{}</span>", obj.name)
+
+    def format_item_display(self, obj: Prison):
+        if obj.restrictions:
+            return format_html(
+                "<div>{}</div><div>RESTRICTIONS: {}</div>", obj.name, obj.restrictions
+            )
+        return format_html("<div>{}</div>", obj.name)
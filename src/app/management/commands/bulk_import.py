@@ -0,0 +1,73 @@
+import csv
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from src.app.bulk_import import BulkImport, numbered
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a legacy person CSV (inmate_number, names, legacy_last_served_date, "
+        "legacy_prison_id) in batches. See src.app.bulk_import."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file to import.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of rows to import per transaction (default 5000).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would change without writing anything.",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help=(
+                "File recording the last committed line. An interrupted import run "
+                "again with the same checkpoint resumes after it; it is removed on success."
+            ),
+        )
+
+    def handle(self, *args, path, batch_size, dry_run, checkpoint, verbosity, **options):
+        source = Path(path).resolve()
+        checkpoint_path = Path(checkpoint) if checkpoint and not dry_run else None
+        start_after = self.read_checkpoint(checkpoint_path, source)
+        if start_after:
+            self.stdout.write(f"Resuming after line {start_after}.")
+
+        def save_checkpoint(line: int):
+            if checkpoint_path:
+                checkpoint_path.write_text(json.dumps({"path": str(source), "line": line}))
+            if verbosity >= 1:
+                self.stdout.write(f"Imported through line {line}.")
+
+        # a dry run always lists the changes; an import only at -v 2
+        show_changes = dry_run or verbosity >= 2
+        bulk_import = BulkImport(
+            batch_size=batch_size,
+            dry_run=dry_run,
+            on_change=self.stdout.write if show_changes else None,
+        )
+        with source.open(newline="", encoding="utf-8-sig") as f:
+            report = bulk_import.run(numbered(csv.DictReader(f), start_after), save_checkpoint)
+        if checkpoint_path and checkpoint_path.exists():
+            checkpoint_path.unlink()
+
+        for line, message in report.errors:
+            self.stderr.write(f"line {line}: {message}")
+        summary = f"{'Dry run, nothing written. ' if dry_run else ''}{report.summary()}"
+        self.stdout.write(self.style.SUCCESS(summary))
+
+    def read_checkpoint(self, checkpoint_path: Path | None, source: Path) -> int:
+        if not checkpoint_path or not checkpoint_path.exists():
+            return 0
+        saved = json.loads(checkpoint_path.read_text())
+        if saved["path"] != str(source):
+            raise CommandError(f"{checkpoint_path} is a checkpoint for {saved['path']}")
+        return saved["line"]
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from src.app.models.person import Person, PersonStats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized PersonStats table from letters and person issues."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Number of people to recompute per transaction (default 2000).",
+        )
+
+    def handle(self, *args, batch_size, **options):
+        person_ids = list(Person.objects.order_by("pk").values_list("pk", flat=True))
+        for start in range(0, len(person_ids), batch_size):
+            with transaction.atomic():
+                PersonStats.refresh(person_ids[start : start + batch_size])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {len(person_ids)} people."))
@@ -0,0 +1,122 @@
+from datetime import timedelta
+import os
+import signal
+import socket
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.utils.timezone import now
+
+from src.app.jobs import run_job
+from src.app.models.job import Job
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (see src.app.jobs) until stopped."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1,
+            help="Number of jobs to run at once, one thread and connection each (default 1).",
+        )
+        parser.add_argument(
+            "--poll",
+            type=float,
+            default=2.0,
+            help="Seconds to wait before checking an empty queue again (default 2).",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once the queue is empty instead of waiting for more jobs.",
+        )
+
+    def handle(self, *args, concurrency, poll, burst, **options):
+        self.stopping = threading.Event()
+        handlers = {
+            signum: signal.signal(signum, lambda *_: self.stopping.set())
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+        try:
+            ran = self.run_workers(concurrency, poll, burst)
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+        self.stdout.write(self.style.SUCCESS(f"Ran {ran} jobs."))
+
+    def run_workers(self, concurrency: int, poll: float, burst: bool) -> int:
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self.requeue_stale()
+        if concurrency == 1:
+            ran = [self.work(prefix, poll, burst)]
+        else:
+            ran = []
+            threads = [
+                threading.Thread(
+                    target=lambda name: ran.append(self.work(name, poll, burst)),
+                    args=[f"{prefix}:{n}"],
+                )
+                for n in range(concurrency)
+            ]
+            for thread in threads:
+                thread.start()
+            # join with a timeout so signals still reach the main thread
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=1)
+        return sum(ran)
+
+    def requeue_stale(self) -> int:
+        """
+        Queue again the jobs of workers that died mid-job: on this host, those
+        whose process is gone; elsewhere, those running past BACKGROUND_JOB_TIMEOUT.
+        """
+        started_before = now() - timedelta(seconds=settings.BACKGROUND_JOB_TIMEOUT)
+        requeued = Job.requeue_stale(worker_alive, started_before)
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} jobs of stopped workers.")
+        return requeued
+
+    def work(self, worker: str, poll: float, burst: bool) -> int:
+        """Claim and run jobs until stopped (or, in burst mode, the queue is empty)."""
+        ran = 0
+        try:
+            while not self.stopping.is_set():
+                job = Job.claim(worker)
+                if job is None:
+                    if self.requeue_stale():
+                        continue
+                    if burst:
+                        break
+                    # like the end of a request: drop broken or expired connections
+                    close_old_connections()
+                    self.stopping.wait(poll)
+                    continue
+                self.stdout.write(f"{worker}: running {job}")
+                run_job(job)
+                self.stdout.write(f"{worker}: {job} {job.status}")
+                ran += 1
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connection.close()
+        return ran
+
+
+def worker_alive(worker: str) -> bool | None:
+    """Whether a worker ("host:pid[:thread]") is running, or None for other hosts."""
+    host, _, rest = worker.partition(":")
+    pid = rest.split(":")[0]
+    if host != socket.gethostname() or not pid.isdigit():
+        return None
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # another user's process
+        return True
+    return True
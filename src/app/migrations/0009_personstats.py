@@ -0,0 +1,71 @@
+# Generated by Django 5.2.12 on 2026-10-17 20:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+
+
+def build_person_stats(apps, schema_editor):
+    Person = apps.get_model("app", "Person")
+    PersonStats = apps.get_model("app", "PersonStats")
+    letter_stats = {
+        row.pop("person_id"): row
+        for row in apps.get_model("app", "Letter")
+        .objects.filter(person__isnull=False)
+        .order_by()
+        .values("person_id")
+        .annotate(
+            last_served=Max(
+                "fulfilled_date",
+                filter=Q(workflow_stage="fulfilled", counts_against_last_served=True),
+            ),
+            package_count=Count("pk", filter=Q(workflow_stage="fulfilled")),
+            pending_count=Count("pk", filter=Q(workflow_stage="stage1_complete")),
+            letter_count=Count("pk"),
+        )
+    }
+    issue_counts = dict(
+        apps.get_model("app", "PersonIssue")
+        .objects.filter(resolved=False)
+        .order_by()
+        .values("person_id")
+        .annotate(count=Count("pk"))
+        .values_list("person_id", "count")
+    )
+    PersonStats.objects.bulk_create(
+        (
+            PersonStats(
+                person_id=person_id,
+                open_issue_count=issue_counts.get(person_id, 0),
+                **letter_stats.get(person_id, {}),
+            )
+            for person_id in Person.objects.values_list("pk", flat=True).iterator()
+        ),
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_alter_letterissue_issue_alter_personissue_issue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersonStats',
+            fields=[
+                ('person', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='app.person')),
+                ('last_served', models.DateTimeField(blank=True, null=True)),
+                ('package_count', models.PositiveIntegerField(default=0)),
+                ('pending_count', models.PositiveIntegerField(default=0)),
+                ('letter_count', models.PositiveIntegerField(default=0)),
+                ('open_issue_count', models.PositiveIntegerField(default=0)),
+                ('modified_date', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'person stats',
+            },
+        ),
+        migrations.RunPython(build_person_stats, migrations.RunPython.noop),
+    ]
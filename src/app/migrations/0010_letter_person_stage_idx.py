@@ -0,0 +1,19 @@
+# Generated by Django 5.2.12 on 2026-10-17 20:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_personstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='letter',
+            index=models.Index(fields=['person', 'workflow_stage', 'fulfilled_date'], name='letter_person_stage_idx'),
+        ),
+    ]
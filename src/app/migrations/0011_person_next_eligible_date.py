@@ -0,0 +1,49 @@
+# Generated by Django 5.2.12 on 2026-10-17 20:32
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Max
+
+ELIGIBILITY_INTERVAL_DAYS = 90
+
+
+def set_next_eligible_date(apps, schema_editor):
+    Person = apps.get_model("app", "Person")
+    last_served = (
+        apps.get_model("app", "Letter")
+        .objects.filter(
+            person__isnull=False,
+            workflow_stage="fulfilled",
+            counts_against_last_served=True,
+            fulfilled_date__isnull=False,
+        )
+        .order_by()
+        .values("person_id")
+        .annotate(last_served=Max("fulfilled_date"))
+        .values_list("person_id", "last_served")
+    )
+    Person.objects.bulk_update(
+        [
+            Person(pk=person_id, next_eligible_date=date + timedelta(days=ELIGIBILITY_INTERVAL_DAYS))
+            for person_id, date in last_served
+        ],
+        ["next_eligible_date"],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_letter_person_stage_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='person',
+            name='next_eligible_date',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(set_next_eligible_date, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.12 on 2026-10-17 20:34
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F
+
+
+def build_custody_history(apps, schema_editor):
+    """
+    Existing rows start when they were created. Where a person has several
+    rows, the newest stays current and each older one ends when the next began.
+    """
+    PersonPrison = apps.get_model("app", "PersonPrison")
+    PersonPrison.objects.update(valid_from=F("created_date"))
+    person_ids = (
+        PersonPrison.objects.order_by()
+        .values("person_id")
+        .annotate(count=Count("pk"))
+        .filter(count__gt=1)
+        .values_list("person_id", flat=True)
+    )
+    closed = []
+    for person_id in person_ids:
+        rows = list(PersonPrison.objects.filter(person_id=person_id).order_by("valid_from", "pk"))
+        for row, next_row in zip(rows, rows[1:]):
+            row.valid_to = next_row.valid_from
+            closed.append(row)
+    PersonPrison.objects.bulk_update(closed, ["valid_to"], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_person_next_eligible_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='personprison',
+            name='valid_from',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='personprison',
+            name='valid_to',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(build_custody_history, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='personprison',
+            index=models.Index(fields=['person', 'valid_from'], name='personprison_person_from_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='personprison',
+            constraint=models.UniqueConstraint(condition=models.Q(('valid_to__isnull', True)), fields=('person',), name='personprison_one_current_per_person'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.12 on 2026-10-17 20:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0012_personprison_custody_history'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='prison',
+            name='name',
+            field=models.CharField(db_index=True, max_length=200),
+        ),
+    ]
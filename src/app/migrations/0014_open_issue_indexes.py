@@ -0,0 +1,23 @@
+# Generated by Django 5.2.12 on 2026-10-17 20:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0013_prison_name_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='letterissue',
+            index=models.Index(condition=models.Q(('resolved', False)), fields=['letter'], name='letterissue_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='personissue',
+            index=models.Index(condition=models.Q(('resolved', False)), fields=['person'], name='personissue_open_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.12 on 2026-10-17 21:05
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+from django.db.models.functions import Concat, Upper
+
+
+def search_index():
+    # Must match src.app.search.search_document() or the planner won't use it
+    parts = []
+    for field in ("last_name", "first_name", "middle_name", "inmate_number"):
+        parts += [models.F(field), models.Value(" ")]
+    document = Upper(Concat(*parts[:-1], output_field=models.TextField()))
+    return GinIndex(OpClass(document, name="gin_trgm_ops"), name="person_search_trgm_idx")
+
+
+def add_search_index(apps, schema_editor):
+    # GIN and pg_trgm are PostgreSQL-only; other databases search unindexed
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.add_index(apps.get_model("app", "Person"), search_index())
+
+
+def remove_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.remove_index(apps.get_model("app", "Person"), search_index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0014_open_issue_indexes'),
+    ]
+
+    operations = [
+        # Skipped if the extension exists; otherwise needs CREATE on the
+        # database (see README, Set up database)
+        TrigramExtension(),
+        migrations.RunPython(add_search_index, remove_search_index),
+    ]
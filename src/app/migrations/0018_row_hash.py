@@ -0,0 +1,69 @@
+# Generated by Django 5.2.12 on 2026-10-17 21:24
+
+import hashlib
+
+from django.db import migrations, models
+
+FINGERPRINT_FIELDS = {
+    "Person": (
+        "inmate_number",
+        "last_name",
+        "middle_name",
+        "first_name",
+        "name_suffix",
+        "status",
+    ),
+    "Prison": (
+        "name",
+        "prison_type",
+        "legacy_id",
+        "legacy_address",
+        "mailing_address",
+        "additional_mailing_headers",
+        "mailing_city",
+        "mailing_state",
+        "mailing_zipcode",
+        "restrictions",
+        "notes",
+    ),
+}
+
+
+def row_fingerprint(values):
+    # src.app.utils.row_fingerprint as of this migration
+    text = "\x1f".join("" if value is None else str(value) for value in values)
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def set_row_hash(apps, schema_editor):
+    for model_name, fields in FINGERPRINT_FIELDS.items():
+        model = apps.get_model("app", model_name)
+        model.objects.bulk_update(
+            [
+                model(pk=row[0], row_hash=row_fingerprint(row[1:]))
+                for row in model.objects.values_list("pk", *fields).iterator(chunk_size=2000)
+            ],
+            ["row_hash"],
+            batch_size=2000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0017_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='person',
+            name='row_hash',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='prison',
+            name='row_hash',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+        migrations.RunPython(set_row_hash, migrations.RunPython.noop),
+    ]
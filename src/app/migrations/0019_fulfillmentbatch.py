@@ -0,0 +1,47 @@
+# Generated by Django 5.2.12 on 2026-10-17 21:33
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0018_row_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FulfillmentBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mail_date', models.DateField(default=django.utils.timezone.localdate)),
+                ('status', models.CharField(choices=[('open', 'Open'), ('claimed', 'Claimed'), ('packed', 'Packed'), ('shipped', 'Shipped'), ('returned', 'Returned')], default='open', max_length=20)),
+                ('notes', models.TextField(blank=True)),
+                ('claimed_date', models.DateTimeField(blank=True, null=True)),
+                ('packed_date', models.DateTimeField(blank=True, null=True)),
+                ('shipped_date', models.DateTimeField(blank=True, null=True)),
+                ('returned_date', models.DateTimeField(blank=True, null=True)),
+                ('letter_count', models.PositiveIntegerField(default=0)),
+                ('person_count', models.PositiveIntegerField(default=0)),
+                ('prison_count', models.PositiveIntegerField(default=0)),
+                ('restricted_count', models.PositiveIntegerField(default=0)),
+                ('unaddressed_count', models.PositiveIntegerField(default=0)),
+                ('created_date', models.DateTimeField(auto_now_add=True)),
+                ('modified_date', models.DateTimeField(auto_now=True)),
+                ('claimed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='fulfillmentbatch_claimed_by_user', to=settings.AUTH_USER_MODEL)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='fulfillmentbatch_created_by_user', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'fulfillment batches',
+            },
+        ),
+        migrations.AddField(
+            model_name='letter',
+            name='batch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='letters', to='app.fulfillmentbatch'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.12 on 2026-10-17 21:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_output(apps, schema_editor):
+    Job = apps.get_model("app", "Job")
+    JobOutputChunk = apps.get_model("app", "JobOutputChunk")
+    for pk in Job.objects.filter(output__isnull=False).values_list("pk", flat=True):
+        output = Job.objects.values_list("output", flat=True).get(pk=pk)
+        JobOutputChunk.objects.create(job_id=pk, data=output)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0019_fulfillmentbatch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobOutputChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.BinaryField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='output_chunks', to='app.job')),
+            ],
+        ),
+        migrations.RunPython(copy_output, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='job',
+            name='output',
+        ),
+    ]
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+from django.db import models, transaction
+from django.db.models import Count, Q
+from django.db.models.query import QuerySet
+from django.utils.timezone import localdate, now
+
+from src.app.models.letter import Letter
+from src.app.models.person import PersonStats
+from src.app.utils import WorkflowStage, invalidate_facet_counts
+from src.auth.models import User
+
+
+class FulfillmentBatch(models.Model):
+    """
+    A mail day's letters, packed and shipped together. Letters are added in
+    bulk (add_letters) and each transition (transition) updates the batch and
+    all of its letters in a fixed number of statements. The totals are
+    recounted with one aggregate whenever either changes.
+    """
+
+    class Statuses(models.TextChoices):
+        OPEN = "open", "Open"
+        CLAIMED = "claimed", "Claimed"
+        PACKED = "packed", "Packed"
+        SHIPPED = "shipped", "Shipped"
+        RETURNED = "returned", "Returned"
+
+    # status -> the statuses a batch can move to it from
+    TRANSITIONS = {
+        Statuses.CLAIMED: (Statuses.OPEN,),
+        Statuses.PACKED: (Statuses.OPEN, Statuses.CLAIMED),
+        Statuses.SHIPPED: (Statuses.OPEN, Statuses.CLAIMED, Statuses.PACKED),
+        Statuses.RETURNED: (Statuses.SHIPPED,),
+    }
+    # Letters can be added, and belong to only one batch, until it ships
+    ACTIVE_STATUSES = (Statuses.OPEN, Statuses.CLAIMED, Statuses.PACKED)
+
+    mail_date = models.DateField(default=localdate)
+    status = models.CharField(max_length=20, choices=Statuses, default=Statuses.OPEN)
+    notes = models.TextField(blank=True)
+    claimed_by = models.ForeignKey(
+        User,
+        null=True,
+        blank=True,
+        related_name="fulfillmentbatch_claimed_by_user",
+        on_delete=models.SET_NULL,
+    )
+    claimed_date = models.DateTimeField(null=True, blank=True)
+    packed_date = models.DateTimeField(null=True, blank=True)
+    shipped_date = models.DateTimeField(null=True, blank=True)
+    returned_date = models.DateTimeField(null=True, blank=True)
+
+    # Totals, kept by refresh_totals
+    letter_count = models.PositiveIntegerField(default=0)
+    person_count = models.PositiveIntegerField(default=0)
+    prison_count = models.PositiveIntegerField(default=0)
+    # letters to prisons with restrictions
+    restricted_count = models.PositiveIntegerField(default=0)
+    # letters without a person or current prison to send them to
+    unaddressed_count = models.PositiveIntegerField(default=0)
+
+    created_date = models.DateTimeField(auto_now_add=True)
+    created_by = models.ForeignKey(
+        User,
+        null=True,
+        related_name="fulfillmentbatch_created_by_user",
+        on_delete=models.SET_NULL,
+    )
+    modified_date = models.DateTimeField(auto_now=True)
+
+    letters: QuerySet[Letter]
+
+    TOTAL_FIELDS = (
+        "letter_count",
+        "person_count",
+        "prison_count",
+        "restricted_count",
+        "unaddressed_count",
+    )
+
+    class Meta:
+        verbose_name_plural = "fulfillment batches"
+
+    def __str__(self):
+        return f"Batch {self.pk} ({self.mail_date})"
+
+    def refresh_totals(self) -> None:
+        """Recount the totals in one aggregate query and save them."""
+        current = Q(person__prisons__valid_to__isnull=True, person__prisons__prison__isnull=False)
+        totals = Letter.objects.filter(batch=self).aggregate(
+            letter_count=Count("pk", distinct=True),
+            person_count=Count("person", distinct=True),
+            prison_count=Count("person__prisons__prison", filter=current, distinct=True),
+            addressed_count=Count("pk", filter=current, distinct=True),
+            restricted_count=Count(
+                "pk", filter=current & ~Q(person__prisons__prison__restrictions=""), distinct=True
+            ),
+        )
+        totals["unaddressed_count"] = totals["letter_count"] - totals.pop("addressed_count")
+        for field, value in totals.items():
+            setattr(self, field, value)
+        FulfillmentBatch.objects.filter(pk=self.pk).update(modified_date=now(), **totals)
+
+    @classmethod
+    def refresh_totals_of(cls, batch_ids: Iterable[int | None]) -> None:
+        """refresh_totals() for each of the batches, for changes made to their letters."""
+        for batch in cls.objects.filter(pk__in={pk for pk in batch_ids if pk is not None}):
+            batch.refresh_totals()
+
+    @classmethod
+    def refresh_totals_for_people(cls, person_ids: Iterable[int | None]) -> None:
+        """
+        refresh_totals() for the unshipped batches with letters to these people,
+        whose custody changed. Shipped batches keep the totals they shipped with.
+        """
+        cls.refresh_totals_of(
+            Letter.objects.filter(
+                person_id__in=[pk for pk in person_ids if pk is not None],
+                batch__status__in=cls.ACTIVE_STATUSES,
+            )
+            .order_by()
+            .values_list("batch_id", flat=True)
+            .distinct()
+        )
+
+    @transaction.atomic
+    def add_letters(self, letters: QuerySet[Letter]) -> int:
+        """
+        Move the pending letters among `letters` that aren't in another
+        unshipped batch into this one, in one UPDATE. Returns how many moved.
+        """
+        if self.status not in self.ACTIVE_STATUSES:
+            raise ValueError(f"{self} is {self.get_status_display()}; letters can't be added.")
+        added = (
+            letters.filter(workflow_stage=WorkflowStage.STAGE1_COMPLETE)
+            .exclude(batch__status__in=self.ACTIVE_STATUSES)
+            .update(batch=self)
+        )
+        self.refresh_totals()
+        return added
+
+    @transaction.atomic
+    def transition(self, status: str, user: User | None = None) -> int:
+        """
+        Move the batch to `status` and apply it to its letters: shipping marks
+        its pending letters fulfilled (Letter.objects.fulfill), a return moves
+        its fulfilled letters to Problem. The status check is part of the
+        UPDATE, so two volunteers can't both claim a batch. Returns the number
+        of letters changed.
+        """
+        when = now()
+        changes: dict = {"status": status, f"{status}_date": when, "modified_date": when}
+        if status == self.Statuses.CLAIMED:
+            changes["claimed_by"] = user
+        if not FulfillmentBatch.objects.filter(
+            pk=self.pk, status__in=self.TRANSITIONS[status]
+        ).update(**changes):
+            self.refresh_from_db(fields=["status"])
+            raise ValueError(
+                f"{self} is {self.get_status_display()}; it can't be marked "
+                f"{self.Statuses(status).label}."
+            )
+        for field, value in changes.items():
+            setattr(self, field, value)
+
+        letters = Letter.objects.filter(batch=self)
+        person_ids: set[int | None] = set()
+        changed = 0
+        if status == self.Statuses.SHIPPED:
+            letters = letters.filter(
+                workflow_stage=WorkflowStage.STAGE1_COMPLETE, person__isnull=False
+            )
+            person_ids = set(letters.values_list("person_id", flat=True))
+            changed = letters.fulfill(when)
+        elif status == self.Statuses.RETURNED:
+            letters = letters.filter(workflow_stage=WorkflowStage.FULFILLED)
+            person_ids = set(letters.values_list("person_id", flat=True))
+            changed = letters.update(workflow_stage=WorkflowStage.PROBLEM, modified_date=when)
+        if changed:
+            # bulk updates bypass the letter signals
+            PersonStats.refresh(person_ids)
+            invalidate_facet_counts()
+        self.refresh_totals()
+        return changed
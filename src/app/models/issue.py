@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from django.db import models
+from django.db.models import Q
 from django.forms import ValidationError
 
 from src.auth.models import User
@@ -55,6 +56,14 @@ class PersonIssue(Issue):
         on_delete=models.SET_NULL,
     )
 
+    class Meta:
+        indexes = [
+            # Backs PersonQuerySet.with_open_issue_count
+            models.Index(
+                fields=["person"], condition=Q(resolved=False), name="personissue_open_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"Person issue {self.created_date.date()}: {self.person.get_name_str()}"
 
@@ -96,6 +105,14 @@ class LetterIssue(Issue):
         on_delete=models.SET_NULL,
     )
 
+    class Meta:
+        indexes = [
+            # Backs LetterQuerySet.with_open_issue_count
+            models.Index(
+                fields=["letter"], condition=Q(resolved=False), name="letterissue_open_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"Letter issue {self.created_date.date()}: {self.letter.__str__()}"
 
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import IO, Callable, Iterator
+
+from django.db import models, transaction
+from django.db.models import Q
+from django.db.models.query import QuerySet
+from django.utils.timezone import now
+
+from src.auth.models import User
+
+# Bytes per JobOutputChunk row
+OUTPUT_CHUNK_SIZE = 1024 * 1024
+
+
+class Job(models.Model):
+    """
+    A unit of background work, run by `manage.py run_workers` (see src.app.jobs).
+    """
+
+    class Statuses(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    # Registered job function, see src.app.jobs.job
+    name = models.CharField(max_length=200)
+    kwargs = models.JSONField(default=dict, blank=True)
+    description = models.CharField(max_length=200)
+    status = models.CharField(max_length=20, choices=Statuses, default=Statuses.QUEUED)
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    # Admin messages the job sent, as [level tag, HTML] pairs
+    messages = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True)
+    # A file the job produced (an export), stored in JobOutputChunks
+    output_name = models.CharField(max_length=200, blank=True)
+    output_content_type = models.CharField(max_length=200, blank=True)
+    worker = models.CharField(max_length=200, blank=True)
+    created_by = models.ForeignKey(
+        User, null=True, related_name="job_created_by_user", on_delete=models.SET_NULL
+    )
+    created_date = models.DateTimeField(auto_now_add=True)
+    started_date = models.DateTimeField(null=True, blank=True)
+    finished_date = models.DateTimeField(null=True, blank=True)
+
+    output_chunks: QuerySet[JobOutputChunk]
+
+    class Meta:
+        indexes = [
+            # The queue: claim() takes the oldest queued job
+            models.Index(fields=["id"], condition=Q(status="queued"), name="job_queue_idx"),
+        ]
+
+    def __str__(self):
+        return f"Job {self.pk}: {self.description}"
+
+    @classmethod
+    def claim(cls, worker: str) -> Job | None:
+        """
+        Mark the oldest queued job as running on `worker` and return it. Rows
+        other workers hold are skipped rather than waited for; the status
+        check in the UPDATE covers databases without row locks (SQLite).
+        """
+        with transaction.atomic():
+            job = (
+                cls.objects.select_for_update(skip_locked=True)
+                .filter(status=cls.Statuses.QUEUED)
+                .order_by("pk")
+                .first()
+            )
+            if job is None:
+                return None
+            started = now()
+            claimed = cls.objects.filter(pk=job.pk, status=cls.Statuses.QUEUED).update(
+                status=cls.Statuses.RUNNING, started_date=started, worker=worker
+            )
+        if not claimed:
+            return None
+        job.status, job.started_date, job.worker = cls.Statuses.RUNNING, started, worker
+        return job
+
+    @classmethod
+    def requeue_stale(cls, is_alive: Callable[[str], bool | None], started_before: datetime) -> int:
+        """
+        Put running jobs whose worker has died back on the queue. `is_alive`
+        says whether a worker is still running, or None if it can't tell (a
+        worker on another host); those jobs are requeued once they started
+        before `started_before`. Returns how many were requeued.
+        """
+        requeued = 0
+        running = cls.objects.filter(status=cls.Statuses.RUNNING)
+        for pk, worker, started in running.values_list("pk", "worker", "started_date"):
+            alive = is_alive(worker)
+            if alive or (alive is None and started and started >= started_before):
+                continue
+            # unless another worker requeued (and maybe reclaimed) it first
+            requeued += cls.objects.filter(
+                pk=pk, status=cls.Statuses.RUNNING, worker=worker, started_date=started
+            ).update(
+                status=cls.Statuses.QUEUED,
+                worker="",
+                started_date=None,
+                progress=0,
+                total=None,
+                messages=[],
+            )
+        return requeued
+
+    def write_output(self, file: IO[bytes], name: str, content_type: str):
+        """
+        Store `file`, from its current position, as the job's output, an
+        OUTPUT_CHUNK_SIZE row at a time. run_job saves the name and type.
+        """
+        self.output_chunks.all().delete()
+        while data := file.read(OUTPUT_CHUNK_SIZE):
+            JobOutputChunk.objects.create(job=self, data=data)
+        self.output_name, self.output_content_type = name, content_type
+
+    def iter_output(self) -> Iterator[bytes]:
+        """The job's output, loading one chunk at a time."""
+        for pk in self.output_chunks.order_by("pk").values_list("pk", flat=True):
+            yield bytes(JobOutputChunk.objects.values_list("data", flat=True).get(pk=pk))
+
+    def set_progress(self, progress: int, total: int | None = None):
+        """Record progress without touching the rest of the row."""
+        self.progress = progress
+        self.total = total if total is not None else self.total
+        Job.objects.filter(pk=self.pk).update(progress=self.progress, total=self.total)
+
+
+class JobOutputChunk(models.Model):
+    """A piece of a job's output, in id order (see Job.write_output)."""
+
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="output_chunks")
+    data = models.BinaryField()
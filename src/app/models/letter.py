@@ -1,21 +1,59 @@
 from __future__ import annotations
 
+from datetime import datetime
 from typing import TYPE_CHECKING
 
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.db.models.query import QuerySet
 from django.urls import reverse
 from django.utils.html import format_html
 from django.utils.timezone import now
 
 from src.app.models.issue import LetterIssue
+from src.app.models.prison import PersonPrison
 from src.app.utils import WorkflowStage
 from src.auth.models import User
 
 if TYPE_CHECKING:
+    from src.app.models.fulfillment import FulfillmentBatch
     from src.app.models.person import Person
 
 
+class LetterQuerySet(models.QuerySet):
+    def with_open_issue_count(self):
+        """Annotate open_issue_count, the number of unresolved LetterIssues."""
+        open_issues = (
+            LetterIssue.objects.filter(letter=OuterRef("pk"), resolved=False)
+            .order_by()
+            .values("letter")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        return self.annotate(open_issue_count=Coalesce(Subquery(open_issues), 0))
+
+    def fulfill(self, fulfilled_date: datetime) -> int:
+        """
+        Mark these letters fulfilled in one UPDATE, each sent to wherever its
+        person was in custody at `fulfilled_date`. Bypasses signals: refresh the
+        people's stats afterwards. Returns the number of letters updated.
+        """
+        prison_at_fulfillment = (
+            PersonPrison.objects.at(fulfilled_date)
+            .filter(person=OuterRef("person"))
+            .order_by("-valid_from")
+            .values("prison")[:1]
+        )
+        return self.update(
+            prison_sent_to=Subquery(prison_at_fulfillment),
+            fulfilled_date=fulfilled_date,
+            workflow_stage=WorkflowStage.FULFILLED,
+            # update() skips auto_now
+            modified_date=fulfilled_date,
+        )
+
+
 class Letter(models.Model):
     person: models.ForeignKey[Person | None] = models.ForeignKey(
         "Person", on_delete=models.SET_NULL, null=True, blank=False
@@ -45,12 +83,35 @@ class Letter(models.Model):
         default=WorkflowStage.STAGE1_COMPLETE,
     )
     notes = models.TextField(blank=True)
+    batch: models.ForeignKey[FulfillmentBatch | None] = models.ForeignKey(
+        "FulfillmentBatch",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="letters",
+    )
+
+    class Meta:
+        indexes = [
+            # Backs the per-person Exists/aggregate subqueries in PersonQuerySet
+            models.Index(
+                fields=["person", "workflow_stage", "fulfilled_date"],
+                name="letter_person_stage_idx",
+            ),
+            # Date ranges in LetterLookup
+            models.Index(fields=["postmark_date"], name="letter_postmark_idx"),
+        ]
+
+    objects = LetterQuerySet.as_manager()
 
-    issue_set: QuerySet[LetterIssue]
+    letterissue_set: QuerySet[LetterIssue]
 
     @property
     def open_issues(self):
-        if not (issue_count := self.issue_set.filter(resolved=False).count()):
+        # Set by LetterQuerySet.with_open_issue_count
+        if (issue_count := getattr(self, "open_issue_count", None)) is None:
+            issue_count = self.letterissue_set.filter(resolved=False).count()
+        if not issue_count:
             return ""
         return format_html(
             "<a href={}?letter={}&resolved=False>{}</a>",
@@ -2,43 +2,163 @@ from __future__ import annotations
 
 from datetime import datetime, timedelta
 from functools import cached_property
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, Exists, Max, OuterRef, Prefetch, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.db.models.query import QuerySet
 from django.urls import reverse
 from django.utils.html import format_html
 from django.utils.timezone import make_aware
 
 from src.app.models.issue import PersonIssue
-from src.app.utils import WorkflowStage
+from src.app.models.letter import Letter
+from src.app.models.prison import PersonPrison
+from src.app.utils import WorkflowStage, row_fingerprint
 from src.auth.models import User
 
 if TYPE_CHECKING:
-    from src.app.models.letter import Letter
-    from src.app.models.prison import PersonPrison, Prison
+    from src.app.models.prison import Prison
 
 ELIGIBILITY_INTERVAL_DAYS = 90
 
 
+def eligibility_cutoff() -> datetime:
+    """
+    A person served after this moment is not yet eligible again.
+    """
+    return make_aware(datetime.now() - timedelta(days=ELIGIBILITY_INTERVAL_DAYS))
+
+
+def get_next_eligible_date(last_served: datetime | None) -> datetime | None:
+    if not last_served:
+        return None
+    return last_served + timedelta(days=ELIGIBILITY_INTERVAL_DAYS)
+
+
+# Returned by Person.get_stat when neither annotations nor a stats row are loaded
+NOT_LOADED = object()
+
+
+def _aggregate_per_person(queryset: QuerySet, aggregate, default=None):
+    """
+    Correlated subquery computing `aggregate` over the rows of `queryset` that
+    belong to the outer Person. Keeps annotations from multiplying each other
+    (and any letter filters) the way joined aggregates would.
+    """
+    subquery = Subquery(
+        queryset.filter(person=OuterRef("pk"))
+        .order_by()
+        .values("person")
+        .annotate(value=aggregate)
+        .values("value")
+    )
+    if default is None:
+        return subquery
+    return Coalesce(subquery, default)
+
+
+def prefetch_current_prison(person_path: str = "") -> Prefetch:
+    """
+    Prefetch each person's current custody row, with its prison, into
+    Person.current_person_prisons. `person_path` is the path to the person
+    from another model, e.g. "person" for a Letter queryset.
+    """
+    return Prefetch(
+        f"{person_path}__prisons" if person_path else "prisons",
+        queryset=PersonPrison.objects.current().select_related("prison"),
+        to_attr="current_person_prisons",
+    )
+
+
 class PersonQuerySet(models.QuerySet):
+    def with_stats(self):
+        """
+        Annotate the inputs of last_served, the letter counts, eligibility and
+        open_issues in the same SQL statement as the people themselves. Person
+        properties prefer these `stat_*` annotations when present.
+        """
+        fulfilled = Letter.objects.filter(workflow_stage=WorkflowStage.FULFILLED)
+        return self.annotate(
+            stat_last_served=_aggregate_per_person(
+                fulfilled.filter(counts_against_last_served=True), Max("fulfilled_date")
+            ),
+            stat_package_count=_aggregate_per_person(fulfilled, Count("pk"), 0),
+            stat_pending_count=_aggregate_per_person(
+                Letter.objects.filter(workflow_stage=WorkflowStage.STAGE1_COMPLETE),
+                Count("pk"),
+                0,
+            ),
+            stat_letter_count=_aggregate_per_person(Letter.objects.all(), Count("pk"), 0),
+        ).with_open_issue_count()
+
+    def with_open_issue_count(self):
+        """
+        Annotate the number of unresolved PersonIssues, which
+        Person.open_issue_count prefers to the stats row.
+        """
+        return self.annotate(
+            stat_open_issue_count=_aggregate_per_person(
+                PersonIssue.objects.filter(resolved=False), Count("pk"), 0
+            )
+        )
+
+    def with_current_prison(self):
+        """
+        Load each person's current custody row and prison in one extra query;
+        Person.current_prison uses it when present.
+        """
+        return self.prefetch_related(prefetch_current_prison())
+
     def has_letters(self):
-        return self.filter(letter__isnull=False)
+        return self.filter(Exists(Letter.objects.filter(person=OuterRef("pk"))))
+
+    def _has_pending_letters(self) -> Exists:
+        # Same letters as Person.pending_letters
+        return Exists(
+            Letter.objects.filter(
+                person=OuterRef("pk"), workflow_stage=WorkflowStage.STAGE1_COMPLETE
+            )
+        )
 
     def with_pending_letters(self):
-        # People with letters with null fulfilled_date values (so, unfulfilled)
-        return self.has_letters().filter(letter__fulfilled_date__isnull=True)
+        return self.filter(self._has_pending_letters())
 
-    def eligible(self):
-        # Exclude people with letters with fulfilled_date within ELIGIBILITY_INTERVAL_DAYS
-        return self.exclude(
-            letter__fulfilled_date__gt=datetime.now() - timedelta(days=ELIGIBILITY_INTERVAL_DAYS)
+    def _served_since_cutoff(self) -> Exists:
+        # A letter that would make Person.last_served later than eligibility_cutoff()
+        return Exists(
+            Letter.objects.filter(
+                person=OuterRef("pk"),
+                workflow_stage=WorkflowStage.FULFILLED,
+                counts_against_last_served=True,
+                fulfilled_date__gt=eligibility_cutoff(),
+            )
         )
 
+    def eligible(self):
+        return self.filter(~self._served_since_cutoff())
+
+    def eligible_between(self, start: datetime, end: datetime):
+        """
+        People who become eligible again in [start, end), going by the stored
+        next_eligible_date. People who have never been served are not included.
+        """
+        return self.filter(next_eligible_date__gte=start, next_eligible_date__lt=end)
+
     def not_eligible(self):
-        # People with letters with fulfilled_date within ELIGIBILITY_INTERVAL_DAYS
-        return self.filter(
-            letter__fulfilled_date__gt=datetime.now() - timedelta(days=ELIGIBILITY_INTERVAL_DAYS)
+        return self.filter(self._served_since_cutoff())
+
+    def eligibility_counts(self) -> dict[str, int]:
+        """
+        Sizes of eligible(), not_eligible() and eligible().with_pending_letters()
+        in one query.
+        """
+        served = Q(self._served_since_cutoff())
+        return self.aggregate(
+            eligible=Count("pk", filter=~served),
+            not_eligible=Count("pk", filter=served),
+            pending=Count("pk", filter=~served & Q(self._has_pending_letters())),
         )
 
 
@@ -62,10 +182,25 @@ class Person(models.Model):
         on_delete=models.SET_NULL,
     )
     modified_date = models.DateTimeField(auto_now=True)
+    # last_served + ELIGIBILITY_INTERVAL_DAYS, maintained by PersonStats.refresh
+    next_eligible_date = models.DateTimeField(null=True, blank=True, db_index=True, editable=False)
+    # row_fingerprint() of FINGERPRINT_FIELDS, maintained by save(); lets imports
+    # skip unchanged rows without loading them (FingerprintImportMixin)
+    row_hash = models.CharField(max_length=32, blank=True, editable=False)
+
+    # The fields PersonResource imports
+    FINGERPRINT_FIELDS = (
+        "inmate_number",
+        "last_name",
+        "middle_name",
+        "first_name",
+        "name_suffix",
+        "status",
+    )
 
     prisons: QuerySet[PersonPrison]
     letter_set: QuerySet[Letter]
-    issue_set: QuerySet[PersonIssue]
+    personissue_set: QuerySet[PersonIssue]
     objects = PersonQuerySet.as_manager()
 
     class Meta:
@@ -77,15 +212,86 @@ class Person(models.Model):
     def save(self, *args, **kwargs):
         if self.inmate_number == "":
             self.inmate_number = None
+        self.row_hash = self.fingerprint()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and not set(self.FINGERPRINT_FIELDS).isdisjoint(update_fields):
+            kwargs["update_fields"] = {*update_fields, "row_hash"}
         super().save(*args, **kwargs)
 
-    @property
+    def fingerprint(self) -> str:
+        return row_fingerprint(getattr(self, field) for field in self.FINGERPRINT_FIELDS)
+
+    current_person_prisons: list[PersonPrison]
+
+    @cached_property
     def current_prison(self) -> Prison | None:
-        if person_prison := self.prisons.first():
+        """
+        Resolved once per instance, from prefetch_current_prison() data if loaded.
+        """
+        if hasattr(self, "current_person_prisons"):
+            current = self.current_person_prisons
+            return current[0].prison if current else None
+        if person_prison := self.prisons.current().select_related("prison").first():
             return person_prison.prison
 
+    def prison_at(self, when: datetime) -> Prison | None:
+        """
+        Where this person was in custody at `when`, from the custody history.
+        """
+        person_prison = (
+            self.prisons.at(when).select_related("prison").order_by("-valid_from").first()
+        )
+        return person_prison.prison if person_prison else None
+
+    @transaction.atomic
+    def move_to_prison(
+        self, prison: Prison | None, created_by: User | None = None, when: datetime | None = None
+    ) -> PersonPrison:
+        """
+        Close the current custody row and open a new one for `prison`
+        (None meaning not in custody).
+        """
+        when = when or make_aware(datetime.now())
+        self.prisons.current().update(valid_to=when)
+        self.__dict__.pop("current_person_prisons", None)
+        self.__dict__.pop("current_prison", None)
+        return PersonPrison.objects.create(
+            person=self, prison=prison, valid_from=when, created_by=created_by
+        )
+
+    def get_stats(self) -> PersonStats | None:
+        """
+        Stats row for this person, or None if it hasn't been built yet
+        (e.g. people created with bulk_create before a rebuild).
+        """
+        try:
+            return self.stats
+        except PersonStats.DoesNotExist:
+            return None
+
+    def clear_stats_cache(self):
+        if Person.stats.related.is_cached(self):
+            Person.stats.related.delete_cached_value(self)
+        for field in PersonStats.STAT_FIELDS:
+            self.__dict__.pop(f"stat_{field}", None)
+        self.__dict__.pop("last_served", None)
+
+    def get_stat(self, field: str):
+        """
+        Value of a PersonStats field, taken from PersonQuerySet.with_stats()
+        annotations when present, else from the stats row. NOT_LOADED if
+        neither is available and the caller should query letter_set/personissue_set.
+        """
+        if (value := getattr(self, f"stat_{field}", NOT_LOADED)) is not NOT_LOADED:
+            return value
+        if stats := self.get_stats():
+            return getattr(stats, field)
+        return NOT_LOADED
+
     @cached_property
     def last_served(self):
+        if (last_served := self.get_stat("last_served")) is not NOT_LOADED:
+            return last_served
         if fulfilled_letters := self.letter_set.filter(
             workflow_stage=WorkflowStage.FULFILLED,
             counts_against_last_served=True,
@@ -104,6 +310,8 @@ class Person(models.Model):
 
     @property
     def package_count(self):
+        if (count := self.get_stat("package_count")) is not NOT_LOADED:
+            return count
         return self.letter_set.filter(workflow_stage=WorkflowStage.FULFILLED).count()
 
     @property
@@ -116,6 +324,8 @@ class Person(models.Model):
 
     @property
     def pending_letter_count(self):
+        if (count := self.get_stat("pending_count")) is not NOT_LOADED:
+            return count
         return self.pending_letters.count()
 
     @property
@@ -124,6 +334,8 @@ class Person(models.Model):
 
     @property
     def letter_count(self):
+        if (count := self.get_stat("letter_count")) is not NOT_LOADED:
+            return count
         return self.all_letters.count()
 
     def get_name_str(self):
@@ -134,12 +346,17 @@ class Person(models.Model):
         if not self.has_been_served:
             return True
         assert self.last_served
-        cooldown_interval = make_aware((datetime.now() - timedelta(days=ELIGIBILITY_INTERVAL_DAYS)))
-        return self.last_served <= cooldown_interval
+        return self.last_served <= eligibility_cutoff()
+
+    @property
+    def open_issue_count(self) -> int:
+        if (count := self.get_stat("open_issue_count")) is not NOT_LOADED:
+            return count
+        return self.personissue_set.filter(resolved=False).count()
 
     @property
     def open_issues(self):
-        if not (issue_count := self.issue_set.filter(resolved=False).count()):
+        if not (issue_count := self.open_issue_count):
             return ""
         return format_html(
             "<a href={}?person={}&resolved=False>{}</a>",
@@ -179,3 +396,101 @@ class Person(models.Model):
         return format_html("Eligible; {}", pending_letters_string)
 
     setattr(get_eligibility_str, "short_description", "Eligibility")
+
+
+class PersonStats(models.Model):
+    """
+    Denormalized letter/issue counts, one row per Person, so list views don't
+    have to count letter_set/personissue_set for every row.
+
+    Kept current by the Letter/PersonIssue signal handlers in src.app.signals and
+    by the bulk admin actions (which bypass signals). Rebuild everything with
+    `./manage.py rebuild_person_stats`.
+    """
+
+    person = models.OneToOneField(
+        Person, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    last_served = models.DateTimeField(null=True, blank=True)
+    package_count = models.PositiveIntegerField(default=0)
+    pending_count = models.PositiveIntegerField(default=0)
+    letter_count = models.PositiveIntegerField(default=0)
+    open_issue_count = models.PositiveIntegerField(default=0)
+    modified_date = models.DateTimeField(auto_now=True)
+
+    STAT_FIELDS = (
+        "last_served",
+        "package_count",
+        "pending_count",
+        "letter_count",
+        "open_issue_count",
+    )
+
+    class Meta:
+        verbose_name_plural = "person stats"
+
+    def __str__(self):
+        return f"Stats: {self.person_id}"
+
+    @classmethod
+    def refresh(cls, person_ids: Iterable[int | None]) -> dict[int, datetime | None]:
+        """
+        Recompute stats for the given people with one grouped query per source
+        table and write them back with a single upsert, along with each
+        Person.next_eligible_date. Returns the new next_eligible_date by person id.
+        """
+        person_ids = {person_id for person_id in person_ids if person_id is not None}
+        if not person_ids:
+            return {}
+        letter_stats = {
+            row.pop("person_id"): row
+            for row in Letter.objects.filter(person_id__in=person_ids)
+            .order_by()
+            .values("person_id")
+            .annotate(
+                last_served=Max(
+                    "fulfilled_date",
+                    filter=Q(
+                        workflow_stage=WorkflowStage.FULFILLED,
+                        counts_against_last_served=True,
+                    ),
+                ),
+                package_count=Count("pk", filter=Q(workflow_stage=WorkflowStage.FULFILLED)),
+                pending_count=Count("pk", filter=Q(workflow_stage=WorkflowStage.STAGE1_COMPLETE)),
+                letter_count=Count("pk"),
+            )
+        }
+        issue_counts = dict(
+            PersonIssue.objects.filter(person_id__in=person_ids, resolved=False)
+            .order_by()
+            .values("person_id")
+            .annotate(count=Count("pk"))
+            .values_list("person_id", "count")
+        )
+        # people may have been deleted in the same transaction
+        existing_ids = list(Person.objects.filter(id__in=person_ids).values_list("id", flat=True))
+        cls.objects.bulk_create(
+            [
+                cls(
+                    person_id=person_id,
+                    open_issue_count=issue_counts.get(person_id, 0),
+                    **letter_stats.get(person_id, {}),
+                )
+                for person_id in existing_ids
+            ],
+            update_conflicts=True,
+            unique_fields=["person"],
+            update_fields=[*cls.STAT_FIELDS, "modified_date"],
+        )
+        next_eligible_dates = {
+            person_id: get_next_eligible_date(letter_stats.get(person_id, {}).get("last_served"))
+            for person_id in existing_ids
+        }
+        Person.objects.bulk_update(
+            [
+                Person(pk=person_id, next_eligible_date=next_eligible_date)
+                for person_id, next_eligible_date in next_eligible_dates.items()
+            ],
+            ["next_eligible_date"],
+        )
+        return next_eligible_dates
@@ -1,8 +1,16 @@
+from __future__ import annotations
+
+from datetime import datetime
+import time
+
+from django.core.cache import cache
 from django.db import models
+from django.db.models import Q
+from django.utils.timezone import now
 
 from src.auth.models import User
 
-from ..utils import NO_PRISON_STR
+from ..utils import FACET_CACHE_TIMEOUT, NO_PRISON_STR, row_fingerprint
 
 
 class Prison(models.Model):
@@ -20,7 +28,7 @@ class Prison(models.Model):
         BOOT_CAMP = "boot_camp", "Boot Camp"
         REHAB_FACILITY = "rehab_facility", "Rehab Facility"
 
-    name = models.CharField(max_length=200)
+    name = models.CharField(max_length=200, db_index=True)
     prison_type = models.CharField(max_length=200, choices=Types.choices)
     # TODO: STEAL FROM https://github.com/furious-luke/django-address/blob/develop/address/models.py
     legacy_address = models.CharField(max_length=200, blank=True)
@@ -48,19 +56,83 @@ class Prison(models.Model):
         related_name="prison_modified_by_user",
         on_delete=models.SET_NULL,
     )
+    # row_fingerprint() of FINGERPRINT_FIELDS, maintained by save()
+    row_hash = models.CharField(max_length=32, blank=True, editable=False)
+
+    # The fields PrisonResource imports
+    FINGERPRINT_FIELDS = (
+        "name",
+        "prison_type",
+        "legacy_id",
+        "legacy_address",
+        "mailing_address",
+        "additional_mailing_headers",
+        "mailing_city",
+        "mailing_state",
+        "mailing_zipcode",
+        "restrictions",
+        "notes",
+    )
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.row_hash = self.fingerprint()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and not set(self.FINGERPRINT_FIELDS).isdisjoint(update_fields):
+            kwargs["update_fields"] = {*update_fields, "row_hash"}
+        super().save(*args, **kwargs)
+
+    def fingerprint(self) -> str:
+        return row_fingerprint(getattr(self, field) for field in self.FINGERPRINT_FIELDS)
+
     class Meta:
         ordering = ["name"]
 
 
+_PRISON_CHOICES_VERSION_KEY = "prison-choices-version"
+_prison_choices: tuple[int, list[tuple[int, str]]] = (0, [])
+
+
+def prison_choices() -> list[tuple[int, str]]:
+    """
+    (pk, name) of every prison, by name. Kept in process memory and reloaded
+    when invalidate_prison_choices() (on Prison save/delete) bumps the version,
+    or when the version expires after FACET_CACHE_TIMEOUT, for caches that
+    aren't shared between workers.
+    """
+    global _prison_choices
+    version = cache.get_or_set(_PRISON_CHOICES_VERSION_KEY, time.time_ns, FACET_CACHE_TIMEOUT)
+    if _prison_choices[0] != version:
+        _prison_choices = (version, list(Prison.objects.order_by("name").values_list("pk", "name")))
+    return _prison_choices[1]
+
+
+def invalidate_prison_choices():
+    cache.set(_PRISON_CHOICES_VERSION_KEY, time.time_ns(), FACET_CACHE_TIMEOUT)
+
+
+class PersonPrisonQuerySet(models.QuerySet):
+    def current(self):
+        return self.filter(valid_to__isnull=True)
+
+    def at(self, when: datetime):
+        return self.filter(Q(valid_to__isnull=True) | Q(valid_to__gt=when), valid_from__lte=when)
+
+
 class PersonPrison(models.Model):
+    """
+    One row per stay in custody. The current row has no valid_to; moving a
+    person closes it and opens a new one (see Person.move_to_prison).
+    """
+
     person = models.ForeignKey("Person", on_delete=models.CASCADE, related_name="prisons")
     prison = models.ForeignKey(
         "Prison", on_delete=models.CASCADE, related_name="people", null=True, blank=True
     )
+    valid_from = models.DateTimeField(default=now)
+    valid_to = models.DateTimeField(null=True, blank=True)
     created_date = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(
         User,
@@ -70,6 +142,21 @@ class PersonPrison(models.Model):
     )
     modified_date = models.DateTimeField(auto_now=True)
 
+    objects = PersonPrisonQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["person"],
+                condition=Q(valid_to__isnull=True),
+                name="personprison_one_current_per_person",
+            ),
+        ]
+        indexes = [
+            # Backs PersonPrisonQuerySet.at / Person.prison_at
+            models.Index(fields=["person", "valid_from"], name="personprison_person_from_idx"),
+        ]
+
     def __str__(self):
         if not self.prison:
             return f"{NO_PRISON_STR} - {self.person.last_name}"
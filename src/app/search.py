@@ -0,0 +1,156 @@
+"""
+Name and inmate number search over people, and over rows that point at a
+person (letters), backed on PostgreSQL by a pg_trgm index on one normalized
+document per person instead of a LIKE scan per column.
+"""
+
+from datetime import date, timedelta
+import re
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+from django.db.models import F, Q, QuerySet, TextField, Value
+from django.db.models.functions import Concat, Upper
+
+from src.app.utils import normalize_inmate_number
+
+# pg_trgm can only use the index for patterns with at least one trigram
+TRIGRAM_MIN_LENGTH = 3
+
+DOCUMENT_FIELDS = ("last_name", "first_name", "middle_name", "inmate_number")
+
+
+def search_document(prefix: str = ""):
+    """
+    "LAST FIRST MIDDLE INMATE_NUMBER", uppercased. person_search_trgm_idx
+    (migration 0015) indexes this exact expression, so keep the two in step.
+    """
+    parts = []
+    for field in DOCUMENT_FIELDS:
+        parts += [F(prefix + field), Value(" ")]
+    return Upper(Concat(*parts[:-1], output_field=TextField()))
+
+
+def person_document(person) -> str:
+    """search_document() for a loaded person, for matching in memory."""
+    return " ".join(getattr(person, field) or "" for field in DOCUMENT_FIELDS).upper()
+
+
+def search_people(
+    queryset: QuerySet, term: str, prefix: str = "", ranked: bool = True
+) -> tuple[QuerySet, bool]:
+    """
+    Filter `queryset` to rows whose person (reached through `prefix`, e.g.
+    "person__") matches every word of `term`.
+
+    An exact inmate number is looked up through its unique index. Otherwise on
+    PostgreSQL the words are matched against the trigram-indexed search document
+    and, if `ranked`, ordered by `search_rank`, best first, then by the
+    queryset's own ordering. Elsewhere, or when every word is too short for
+    trigrams, it falls back to unranked substring matching and returns False as
+    the second value.
+    """
+    words = term.upper().split()
+    if not words:
+        return queryset, True
+
+    if len(words) == 1 and (inmate_number := normalize_inmate_number(words[0])):
+        exact = queryset.filter(**{prefix + "inmate_number": inmate_number})
+        if exact.exists():
+            return exact, True
+
+    return match_words(queryset, words, prefix, ranked)
+
+
+def match_words(
+    queryset: QuerySet, words: list[str], prefix: str = "", ranked: bool = True
+) -> tuple[QuerySet, bool]:
+    """
+    search_people() without the inmate number shortcut: every (uppercased)
+    word must appear in the search document.
+    """
+    document = search_document(prefix)
+    matches = queryset.alias(search_document=document).filter(
+        *(Q(search_document__contains=word) for word in words)
+    )
+    indexed = connections[queryset.db].vendor == "postgresql" and any(
+        len(word) >= TRIGRAM_MIN_LENGTH for word in words
+    )
+    if not indexed:
+        return matches, False
+    if not ranked:
+        return matches, True
+    rank = sum(
+        (TrigramWordSimilarity(word, document) for word in words[1:]),
+        TrigramWordSimilarity(words[0], document),
+    )
+    # ties keep the queryset's ordering, then pk, so paging over them is stable
+    ordering = queryset.query.order_by or queryset.model._meta.ordering
+    return matches.annotate(search_rank=rank).order_by("-search_rank", *ordering, "-pk"), True
+
+
+def lookup_people(queryset: QuerySet, q: str, limit: int) -> list:
+    """
+    Autocomplete matches for `q`, best first: the exact inmate number, then
+    inmate numbers starting with it (both normalized as PersonAdminForm stores
+    them, read in order from the inmate number index), then people matching
+    every word as in search_people(). Each stage only fills the places the
+    earlier ones left.
+    """
+    people = []
+    if inmate_number := normalize_inmate_number(q):
+        by_number = queryset.filter(inmate_number__startswith=inmate_number)
+        people = list(by_number.order_by("inmate_number")[:limit])
+    if len(people) < limit and (words := q.upper().split()):
+        matches, indexed = match_words(
+            queryset.exclude(pk__in=[person.pk for person in people]), words
+        )
+        if not indexed:
+            matches = matches.order_by("inmate_number")
+        people += matches[: limit - len(people)]
+    return people
+
+
+# "2024", "2024-03", "2024-03-15", "03/2024", "3/15/2024", "3/15/24"
+_YEAR = re.compile(r"(19|20)\d\d")
+_ISO_DATE = re.compile(r"(?P<year>\d{4})[-/](?P<month>\d{1,2})(?:[-/](?P<day>\d{1,2}))?")
+_US_DATE = re.compile(r"(?P<month>\d{1,2})[-/](?:(?P<day>\d{1,2})[-/])?(?P<year>\d{4}|\d\d)")
+
+
+def parse_date_range(token: str) -> tuple[date, date] | None:
+    """
+    The [start, end) dates a year, month or day token covers, or None if it
+    isn't one.
+    """
+    if _YEAR.fullmatch(token):
+        year = int(token)
+        return date(year, 1, 1), date(year + 1, 1, 1)
+    if not (match := _ISO_DATE.fullmatch(token) or _US_DATE.fullmatch(token)):
+        return None
+    year = int(match["year"])
+    year += 2000 if year < 100 else 0
+    try:
+        if match["day"]:
+            start = date(year, int(match["month"]), int(match["day"]))
+            return start, start + timedelta(days=1)
+        start = date(year, int(match["month"]), 1)
+    except ValueError:
+        return None
+    return start, (start + timedelta(days=31)).replace(day=1)
+
+
+def parse_letter_query(q: str) -> tuple[list[str], tuple[date, date] | None]:
+    """
+    Split a letter lookup ("smith 2024-03", "03/2024") into uppercased name
+    words and the postmark date range the date words leave, if any. Several
+    date words narrow each other.
+    """
+    words, date_range = [], None
+    for word in q.upper().split():
+        if (word_range := parse_date_range(word)) is None:
+            words.append(word)
+        elif date_range is None:
+            date_range = word_range
+        else:
+            date_range = max(date_range[0], word_range[0]), min(date_range[1], word_range[1])
+    return words, date_range
@@ -0,0 +1,125 @@
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from src.app.models.fulfillment import FulfillmentBatch
+from src.app.models.issue import PersonIssue
+from src.app.models.letter import Letter
+from src.app.models.person import Person, PersonStats
+from src.app.models.prison import PersonPrison, Prison, invalidate_prison_choices
+from src.app.utils import invalidate_facet_counts, invalidate_lookups
+
+
+def refresh_person_stats(*people: Person | int | None):
+    """
+    Recompute stats for the given people (instances or ids) inside the
+    current transaction, and drop any stats already cached on the instances
+    and the list filter counts.
+    """
+    loaded = [person for person in people if isinstance(person, Person)]
+    person_ids = [person.pk if isinstance(person, Person) else person for person in people]
+    with transaction.atomic():
+        next_eligible_dates = PersonStats.refresh(person_ids)
+    for person in loaded:
+        person.clear_stats_cache()
+        if person.pk in next_eligible_dates:
+            person.next_eligible_date = next_eligible_dates[person.pk]
+    invalidate_facet_counts()
+
+
+def _cached_person(instance: Letter | PersonIssue) -> Person | int | None:
+    # Use the loaded person where there is one so its cached stats are cleared
+    if type(instance).person.is_cached(instance):
+        return instance.person
+    return instance.person_id
+
+
+def _deleting_person(origin) -> bool:
+    # Cascades from a Person delete take the stats row with them
+    if isinstance(origin, QuerySet):
+        return origin.model is Person
+    return isinstance(origin, Person)
+
+
+@receiver(post_save, sender=Person)
+def create_person_stats(sender, instance: Person, created, raw=False, **kwargs):
+    if created and not raw:
+        PersonStats.objects.get_or_create(person=instance)
+        invalidate_facet_counts()
+
+
+@receiver(post_delete, sender=Person)
+@receiver(post_save, sender=PersonPrison)
+@receiver(post_delete, sender=PersonPrison)
+def clear_facet_counts(sender, raw=False, **kwargs):
+    if not raw:
+        invalidate_facet_counts()
+
+
+@receiver(post_save, sender=Person)
+@receiver(post_delete, sender=Person)
+@receiver(post_save, sender=PersonPrison)
+@receiver(post_delete, sender=PersonPrison)
+def clear_person_lookups(sender, raw=False, **kwargs):
+    # Letter lookups match on the person's name too
+    if not raw:
+        invalidate_lookups("people", "letters")
+
+
+@receiver(post_save, sender=Letter)
+@receiver(post_delete, sender=Letter)
+def clear_letter_lookups(sender, raw=False, **kwargs):
+    if not raw:
+        invalidate_lookups("letters")
+
+
+@receiver(pre_save, sender=Letter)
+def remember_previous_letter_person(sender, instance: Letter, raw=False, **kwargs):
+    # A letter moved to a different person changes both people's stats, and
+    # one moved out of a batch that batch's totals
+    instance._previous_person_id = instance._previous_batch_id = None
+    if instance.pk and not raw:
+        instance._previous_person_id, instance._previous_batch_id = Letter.objects.filter(
+            pk=instance.pk
+        ).values_list("person_id", "batch_id").first() or (None, None)
+
+
+@receiver(post_save, sender=Letter)
+@receiver(post_delete, sender=Letter)
+def letter_changed(sender, instance: Letter, raw=False, origin=None, **kwargs):
+    if raw or _deleting_person(origin):
+        return
+    refresh_person_stats(_cached_person(instance), getattr(instance, "_previous_person_id", None))
+
+
+@receiver(post_save, sender=Letter)
+@receiver(post_delete, sender=Letter)
+def refresh_batch_totals(sender, instance: Letter, raw=False, **kwargs):
+    if not raw:
+        FulfillmentBatch.refresh_totals_of(
+            [instance.batch_id, getattr(instance, "_previous_batch_id", None)]
+        )
+
+
+@receiver(post_save, sender=PersonPrison)
+@receiver(post_delete, sender=PersonPrison)
+def custody_changed(sender, instance: PersonPrison, raw=False, **kwargs):
+    # prison, restricted and unaddressed totals follow current custody
+    if not raw:
+        FulfillmentBatch.refresh_totals_for_people([instance.person_id])
+
+
+@receiver(post_save, sender=PersonIssue)
+@receiver(post_delete, sender=PersonIssue)
+def person_issue_changed(sender, instance: PersonIssue, raw=False, origin=None, **kwargs):
+    if raw or _deleting_person(origin):
+        return
+    refresh_person_stats(_cached_person(instance))
+
+
+@receiver(post_save, sender=Prison)
+@receiver(post_delete, sender=Prison)
+def prison_changed(sender, raw=False, **kwargs):
+    if not raw:
+        invalidate_prison_choices()
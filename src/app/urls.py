@@ -7,6 +7,7 @@ from src.app.views import (
     contrib_person_form,
     contrib_person_issue_form,
     contrib_profile,
+    lookup_stats,
     not_contributor,
 )
 
@@ -20,4 +21,5 @@ urlpatterns = [
     path("contrib/logout/", contrib_logout, name="contrib_logout"),
     path("contrib/profile/", contrib_profile, name="contrib_profile"),
     path("contrib/not_contributor/", not_contributor, name="not_contributor"),
+    path("lookup-stats/", lookup_stats, name="lookup_stats"),
 ]
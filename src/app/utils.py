@@ -1,8 +1,26 @@
-from ajax_select.fields import render_to_string
+from functools import lru_cache
+import hashlib
+import time
+from typing import Callable, Iterable
+
+from django.core.cache import cache
 from django.db import models
+from django.utils.html import conditional_escape
+from django.utils.safestring import SafeString, mark_safe
 
 NO_PRISON_STR = "Not in custody"
 
+# Backstop for caches that aren't shared between workers, and for eligibility
+# counts, which change as the cutoff moves
+FACET_CACHE_TIMEOUT = 5 * 60
+_FACET_VERSION_KEY = "facet-counts-version"
+
+# Autocomplete matches are cached briefly per lookup group ("people", "letters"),
+# and dropped early when the rows they search change
+LOOKUP_CACHE_TIMEOUT = 30
+LOOKUP_CACHE_GROUPS = ("people", "letters")
+LOOKUP_OUTCOMES = ("hit", "refined", "miss")
+
 
 class WorkflowStage(models.TextChoices):
     STAGE1_COMPLETE = "stage1_complete", "Stage 1 complete"
@@ -11,18 +29,119 @@ class WorkflowStage(models.TextChoices):
     DISCARDED = "discarded", "Discarded"
 
 
-def render_address_template(
-    headers: list[str | None],
+def normalize_inmate_number(inmate_number: str) -> str:
+    """
+    Inmate numbers are stored uppercased with everything but letters and digits removed.
+    """
+    return "".join(filter(str.isalnum, inmate_number)).upper()
+
+
+def row_fingerprint(values: Iterable) -> str:
+    """
+    Hash of a row's values, None and "" alike, as stored in Person.row_hash and
+    Prison.row_hash and compared against incoming import rows.
+    """
+    text = "\x1f".join("" if value is None else str(value) for value in values)
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def cached_facet_counts(name: str, compute: Callable[[], dict]) -> dict:
+    """
+    List filter counts, cached until invalidate_facet_counts() or FACET_CACHE_TIMEOUT.
+    """
+    version = cache.get_or_set(_FACET_VERSION_KEY, time.time_ns, None)
+    return cache.get_or_set(f"facet-counts:{name}", compute, FACET_CACHE_TIMEOUT, version=version)
+
+
+def invalidate_facet_counts():
+    cache.set(_FACET_VERSION_KEY, time.time_ns(), None)
+
+
+def lookup_cache_version(group: str) -> int:
+    return cache.get_or_set(f"lookup-version:{group}", time.time_ns, None)
+
+
+def invalidate_lookups(*groups: str):
+    cache.set_many({f"lookup-version:{group}": time.time_ns() for group in groups}, None)
+
+
+def count_lookup(group: str, outcome: str):
+    key = f"lookup-stats:{group}:{outcome}"
+    cache.add(key, 0, None)
+    cache.incr(key)
+
+
+def lookup_cache_stats() -> dict[str, dict]:
+    """
+    Per group, how many lookups were served from their own cached query ("hit"),
+    by filtering a shorter cached query ("refined"), or from the database.
+    """
+    counts = cache.get_many(
+        [
+            f"lookup-stats:{group}:{outcome}"
+            for group in LOOKUP_CACHE_GROUPS
+            for outcome in LOOKUP_OUTCOMES
+        ]
+    )
+    stats = {}
+    for group in LOOKUP_CACHE_GROUPS:
+        group_counts = {
+            outcome: counts.get(f"lookup-stats:{group}:{outcome}", 0) for outcome in LOOKUP_OUTCOMES
+        }
+        total = sum(group_counts.values())
+        cached = group_counts["hit"] + group_counts["refined"]
+        stats[group] = {**group_counts, "hit_rate": round(cached / total, 3) if total else None}
+    return stats
+
+
+# Same markup as templates/addresses/address.html, without a template render per row
+_ADDRESS_HTML = (
+    '<div style="display: flex; flex-direction: column; flex-gap: 4px;">\n'
+    "  {headers}\n"
+    "  <span>{address}</span>\n"
+    "  <span>\n"
+    "    <span>{city}, </span>\n"
+    "    <span>{state} </span>\n"
+    "    <span>{zip}</span>\n"
+    "  </span>\n"
+    "</div>\n"
+)
+
+
+@lru_cache(maxsize=4096)
+def _format_address(headers: tuple, address: str, city: str, state: str, zip: str) -> str:
+    return _ADDRESS_HTML.format(
+        headers="".join(
+            f"<span>{conditional_escape(header)}</span>" for header in headers if header
+        ),
+        address=conditional_escape(address),
+        city=conditional_escape(city),
+        state=conditional_escape(state),
+        zip=conditional_escape(zip),
+    )
+
+
+def format_address(
+    headers: Iterable[str | None],
+    address: str,
+    city: str,
+    state: str,
+    zip: str,
+) -> SafeString:
+    """
+    Mailing address block as HTML. Cached on the values themselves, so a
+    prison's block is reused for as long as its address and the recipient
+    headers stay the same.
+    """
+    return mark_safe(_format_address(tuple(headers), address, city, state, zip))
+
+
+def format_address_text(
+    headers: Iterable[str | None],
     address: str,
     city: str,
     state: str,
     zip: str,
-):
-    context = {
-        "headers": headers,
-        "address": address,
-        "city": city,
-        "state": state,
-        "zip": zip,
-    }
-    return render_to_string("addresses/address.html", context=context)
+) -> str:
+    """Mailing address as plain lines, for labels."""
+    return "\n".join([*filter(None, headers), address, f"{city}, {state} {zip}"])
@@ -3,13 +3,15 @@ from __future__ import annotations
 from functools import wraps
 from typing import Callable, Literal
 
+from ajax_select import views as ajax_select_views
 from django.conf import settings
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.views import (
     LoginView as DjLoginView,
     PasswordResetView as DjPasswordResetView,
 )
-from django.http import HttpResponseRedirect
+from django.http import HttpResponseRedirect, JsonResponse
 from django.shortcuts import redirect, render
 from django_registration.backends.activation.views import RegistrationView as Dj_Reg
 
@@ -24,6 +26,7 @@ from src.app.forms import (
 )
 from src.app.models.letter import Letter
 from src.app.models.person import Person
+from src.app.utils import LOOKUP_CACHE_TIMEOUT, lookup_cache_stats
 
 
 def check_auth(func: Callable) -> Callable:
@@ -45,6 +48,23 @@ def check_auth(func: Callable) -> Callable:
     return wrapper
 
 
+def ajax_lookup(request, channel):
+    """
+    ajax_select's lookup view, but letting the browser reuse a response while
+    the server-side lookup cache would (ajax_select forbids caching).
+    """
+    response = ajax_select_views.ajax_lookup(request, channel)
+    if response.status_code == 200:
+        response["Cache-Control"] = f"private, max-age={LOOKUP_CACHE_TIMEOUT}"
+    return response
+
+
+@staff_member_required
+def lookup_stats(request):
+    """Lookup cache hit rates, as JSON."""
+    return JsonResponse(lookup_cache_stats())
+
+
 def redirect_to_admin(request):
     """
     Redirect base URL to admin site.
@@ -141,8 +161,12 @@ def get_blank_form_with_context(form_type, model, record_id, form_class, request
 @check_auth
 def contrib_profile(request):
     context = {
-        "letters": Letter.objects.filter(created_by=request.user).order_by("created_date"),
-        "people": Person.objects.filter(created_by=request.user).order_by("created_date"),
+        "letters": Letter.objects.filter(created_by=request.user)
+        .select_related("person")
+        .order_by("created_date"),
+        "people": Person.objects.filter(created_by=request.user)
+        .with_current_prison()
+        .order_by("created_date"),
     }
     return render(request, "contributors/profile.html", context)
 
@@ -42,6 +42,10 @@ SECRET_KEY = env("SECRET_KEY")
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
 DATABASES = {"default": env.db()}
 
+# Per-process by default; list filter counts are shared between workers only
+# with a shared cache, e.g. CACHE_URL=dbcache://cache_table after createcachetable
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -161,6 +165,19 @@ EMAIL_HOST_USER = "SMTP_Injection"
 EMAIL_HOST_PASSWORD = os.environ.get("SPARKPOST_API_KEY")
 EMAIL_USE_TLS = True
 
+# Cursor paging and planner-estimated counts on the letter/person changelists
+ADMIN_KEYSET_PAGINATION = env.bool("ADMIN_KEYSET_PAGINATION", default=False)
+# Estimated counts (PostgreSQL only) are shown from this many rows up
+ADMIN_ESTIMATED_COUNT_THRESHOLD = env.int("ADMIN_ESTIMATED_COUNT_THRESHOLD", default=100_000)
+
+# Run long admin actions and exports as jobs (`./manage.py run_workers` runs them)
+BACKGROUND_JOBS = env.bool("BACKGROUND_JOBS", default=False)
+# Actions on fewer selected rows than this still run in the request
+BACKGROUND_ACTION_THRESHOLD = env.int("BACKGROUND_ACTION_THRESHOLD", default=500)
+# Seconds after which a running job whose worker can't be checked (another
+# host) is assumed lost and queued again
+BACKGROUND_JOB_TIMEOUT = env.int("BACKGROUND_JOB_TIMEOUT", default=6 * 60 * 60)
+
 APP_ORDER = OrderedDict(
     [
         ("app", ["Letter", "Person", "Prison"]),
@@ -7,6 +7,7 @@ from src.app.views import (
     LoginView,
     PasswordResetView,
     RegistrationView,
+    ajax_lookup,
     contrib_profile,
     redirect_to_admin,
 )
@@ -16,6 +17,8 @@ urlpatterns = [
     path(r"admin/", admin.site.urls, name="admin_base"),
     path("", redirect_to_admin, name="admin_base_redirect"),
     path("viz/", include(urlpatterns)),
+    # Ahead of ajax_select's own view, to send cache headers
+    path("ajax_select/ajax_lookup/<channel>", ajax_lookup, name="ajax_lookup"),
     path(r"ajax_select/", include(ajax_select_urls)),
     path(
         "accounts/register/",
@@ -0,0 +1,46 @@
+"""
+Opt-in performance benchmarks.
+
+These build large datasets in the test database and take minutes, so they are
+skipped unless RUN_BENCHMARKS is set. Dataset sizes can be scaled down with the
+BENCHMARK_* variables each module documents, e.g.
+
+    RUN_BENCHMARKS=1 BENCHMARK_PEOPLE=10000 ./manage.py test -t . src/tests/benchmarks
+"""
+
+from contextlib import contextmanager
+import os
+import time
+from unittest import skipUnless
+
+from django.db import connection
+
+benchmark = skipUnless(os.environ.get("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1 to run")
+
+
+def scale(name: str, default: int) -> int:
+    return int(os.environ.get(f"BENCHMARK_{name}", default))
+
+
+@contextmanager
+def timed(label: str, results: dict[str, float] | None = None):
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    if results is not None:
+        results[label] = elapsed
+    print(f"  {label}: {elapsed * 1000:.1f}ms")
+
+
+@contextmanager
+def counted_queries():
+    """Counts every query (connection.queries keeps only the last 9,000)."""
+    counted = [0]
+
+    def count(execute, *args):
+        counted[0] += 1
+        return execute(*args)
+
+    with connection.execute_wrapper(count):
+        yield counted
+    print(f"  {counted[0]:,} queries")
@@ -0,0 +1,107 @@
+"""
+Bulk generators for benchmark datasets. These use bulk_create, so signal
+handlers (and PersonStats) are bypassed; run PersonStats.refresh if needed.
+"""
+
+from datetime import timedelta
+from itertools import islice
+import random
+from typing import Iterable
+
+from django.utils.timezone import now
+
+from src.app.models.letter import Letter
+from src.app.models.person import Person
+from src.app.models.prison import PersonPrison, Prison
+from src.app.utils import WorkflowStage
+
+BATCH_SIZE = 5000
+
+LAST_NAMES = ["SMITH", "JOHNSON", "WILLIAMS", "BROWN", "JONES", "GARCIA", "MILLER", "DAVIS"]
+FIRST_NAMES = ["JAMES", "MARY", "ROBERT", "PATRICIA", "JOHN", "JENNIFER", "MICHAEL", "LINDA"]
+
+
+def bulk_create(model, objs: Iterable) -> None:
+    # Model.objects.bulk_create materializes the whole iterable first
+    objs = iter(objs)
+    while batch := list(islice(objs, BATCH_SIZE)):
+        model.objects.bulk_create(batch)
+
+
+def with_row_hash(obj):
+    # what Person.save()/Prison.save() would store
+    obj.row_hash = obj.fingerprint()
+    return obj
+
+
+def make_prisons(count: int, seed: int = 0) -> list[int]:
+    rng = random.Random(seed)
+    bulk_create(
+        Prison,
+        (
+            with_row_hash(
+                Prison(
+                    name=f"SCI BENCHMARK {i}",
+                    prison_type=rng.choice(Prison.Types.values),
+                    mailing_address=f"{i} Main St",
+                    mailing_city="Pittsburgh",
+                    mailing_zipcode="15213",
+                    restrictions=rng.choice(["", "No hardcovers"]),
+                )
+            )
+            for i in range(count)
+        ),
+    )
+    return list(Prison.objects.values_list("pk", flat=True))
+
+
+def make_people(count: int, prison_ids: list[int] | None = None, seed: int = 0) -> list[int]:
+    rng = random.Random(seed)
+    bulk_create(
+        Person,
+        (
+            with_row_hash(
+                Person(
+                    inmate_number=f"BM{i:07d}",
+                    last_name=f"{rng.choice(LAST_NAMES)}{i}",
+                    first_name=rng.choice(FIRST_NAMES),
+                )
+            )
+            for i in range(count)
+        ),
+    )
+    person_ids = list(Person.objects.values_list("pk", flat=True))
+    if prison_ids:
+        bulk_create(
+            PersonPrison,
+            (
+                PersonPrison(person_id=person_id, prison_id=rng.choice(prison_ids))
+                for person_id in person_ids
+            ),
+        )
+    return person_ids
+
+
+def make_letters(count: int, person_ids: list[int], seed: int = 0) -> None:
+    """
+    Roughly a third of letters pending, most of the rest fulfilled at some point
+    in the last two years, and a few discarded or not counted against last served.
+    """
+    rng = random.Random(seed)
+    today = now()
+
+    def letter():
+        stage = rng.choices(
+            [WorkflowStage.STAGE1_COMPLETE, WorkflowStage.FULFILLED, WorkflowStage.DISCARDED],
+            weights=[3, 6, 1],
+        )[0]
+        fulfilled = stage == WorkflowStage.FULFILLED
+        return Letter(
+            person_id=rng.choice(person_ids),
+            postmark_date=(today - timedelta(days=rng.randrange(730))).date(),
+            workflow_stage=stage,
+            fulfilled_date=today - timedelta(days=rng.randrange(730)) if fulfilled else None,
+            counts_against_last_served=rng.random() > 0.05,
+        )
+
+    bulk_create(Letter, (letter() for _ in range(count)))
@@ -0,0 +1,41 @@
+"""
+Per-row cost of the mailing address column. BENCHMARK_ROWS (default 1,000)
+sets the number of rows.
+"""
+
+from django.template.loader import render_to_string
+from django.test import SimpleTestCase
+
+from src.app.utils import _format_address, format_address
+from src.tests.benchmarks import benchmark, scale, timed
+
+
+@benchmark
+class AddressBenchmark(SimpleTestCase):
+    def test_per_row(self):
+        # A page of letters to a few dozen prisons
+        rows = [
+            (
+                (f"PERSON {i}", f"AB{i:04d}", f"SCI BENCHMARK {i % 40}"),
+                f"{i % 40} Main St",
+                "Pittsburgh",
+                "PA",
+                "15213",
+            )
+            for i in range(scale("ROWS", 1_000))
+        ]
+        results = {}
+        print(f"\n{len(rows)} rows")
+        with timed("template", results):
+            for headers, *address in rows:
+                context = dict(zip(("address", "city", "state", "zip"), address))
+                render_to_string("addresses/address.html", {"headers": headers, **context})
+        _format_address.cache_clear()
+        with timed("format_address, cold cache", results):
+            for headers, *address in rows:
+                format_address(headers, *address)
+        with timed("format_address, warm cache", results):
+            for headers, *address in rows:
+                format_address(headers, *address)
+        for label, elapsed in results.items():
+            print(f"  {label}: {elapsed / len(rows) * 1e6:.1f}us/row")
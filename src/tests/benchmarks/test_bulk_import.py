@@ -0,0 +1,82 @@
+"""
+`bulk_import` of a generated legacy person CSV, then a re-import of the same
+file (everything unchanged), against PersonResource's row-by-row import.
+BENCHMARK_ROWS (default 1,000,000) sets the CSV size and BENCHMARK_RESOURCE_ROWS
+(default 2,000) how many rows the import-export resource is given.
+"""
+
+import csv
+from io import StringIO
+from pathlib import Path
+import random
+from tempfile import TemporaryDirectory
+
+from django.core.management import call_command
+from django.db.models import CharField
+from django.db.models.functions import Cast
+from django.test import TransactionTestCase
+import tablib
+
+from src.app.admin.person import PersonResource
+from src.app.models.person import Person
+from src.app.models.prison import Prison
+from src.tests.benchmarks import benchmark, counted_queries, scale, timed
+from src.tests.benchmarks.data import FIRST_NAMES, LAST_NAMES, make_prisons
+
+COLUMNS = [
+    "inmate_number",
+    "first_name",
+    "last_name",
+    "legacy_last_served_date",
+    "legacy_prison_id",
+]
+
+
+def write_legacy_csv(path: Path, rows: int, legacy_ids: list[str], seed: int = 0) -> None:
+    rng = random.Random(seed)
+    with path.open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for i in range(rows):
+            writer.writerow(
+                [
+                    f"LG{i:07d}",
+                    rng.choice(FIRST_NAMES),
+                    f"{rng.choice(LAST_NAMES)}{i}",
+                    f"{rng.randint(1, 12)}/{rng.randint(1, 28)}/{rng.randint(2015, 2024)}",
+                    rng.choice(legacy_ids),
+                ]
+            )
+
+
+@benchmark
+class BulkImportBenchmark(TransactionTestCase):
+    def setUp(self):
+        make_prisons(100)
+        Prison.objects.update(legacy_id=Cast("pk", CharField()))
+        self.tmp = TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "legacy.csv"
+        write_legacy_csv(
+            self.path,
+            scale("ROWS", 1_000_000),
+            list(Prison.objects.values_list("legacy_id", flat=True)),
+        )
+
+    def test_bulk_import(self):
+        rows = scale("ROWS", 1_000_000)
+        print(f"\n{rows:,} rows")
+        for label in ("bulk_import", "bulk_import again (unchanged)"):
+            with counted_queries(), timed(label):
+                call_command("bulk_import", str(self.path), verbosity=0, stdout=StringIO())
+        self.assertEqual(Person.objects.count(), rows)
+
+        resource_rows = scale("RESOURCE_ROWS", 2_000)
+        dataset = tablib.Dataset(headers=["id", "inmate_number", "first_name", "last_name"])
+        for i in range(resource_rows):
+            dataset.append(["", f"RS{i:07d}", "MARY", f"JONES{i}"])
+        results = {}
+        with counted_queries(), timed("PersonResource", results):
+            PersonResource().import_data(dataset, raise_errors=True)
+        per_row = results["PersonResource"] / resource_rows
+        print(f"  PersonResource at {rows:,} rows: ~{per_row * rows / 60:.0f} minutes")
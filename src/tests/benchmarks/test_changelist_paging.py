@@ -0,0 +1,55 @@
+"""
+Letter changelist paging at depth. BENCHMARK_LETTERS (default 1,000,000) and
+BENCHMARK_PEOPLE (default 50,000) set the dataset size.
+"""
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from src.app.models.letter import Letter
+from src.auth.models import User
+from src.tests.benchmarks import benchmark, scale, timed
+from src.tests.benchmarks.data import make_letters, make_people, make_prisons
+
+
+@benchmark
+class ChangelistPagingBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        person_ids = make_people(scale("PEOPLE", 50_000), make_prisons(100))
+        make_letters(scale("LETTERS", 1_000_000), person_ids)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(
+            User.objects.create(email="a@b.com", is_staff=True, is_superuser=True)
+        )
+        self.url = reverse("admin:app_letter_changelist")
+
+    def get(self, query: str = ""):
+        response = self.client.get(self.url + query)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_deep_pages(self):
+        per_page = 25
+        depth = (Letter.objects.count() // per_page - 1) * per_page
+        cursor = Letter.objects.order_by("-pk").values_list("pk", flat=True)[depth - 1]
+
+        results = {}
+        print("\noffset paging")
+        with timed("page 1", results):
+            self.get()
+        with timed(f"page {depth // per_page + 1}", results):
+            offset_rows = self.get(f"?p={depth // per_page + 1}").context["cl"].result_list
+
+        print("keyset paging")
+        with override_settings(ADMIN_KEYSET_PAGINATION=True):
+            with timed("first page", results):
+                self.get()
+            with timed(f"after row {depth}", results):
+                keyset_rows = self.get(f"?after={cursor}").context["cl"].result_list
+
+        self.assertEqual(
+            [letter.pk for letter in keyset_rows], [letter.pk for letter in offset_rows]
+        )
@@ -0,0 +1,76 @@
+"""
+EligibilityListFilter at scale. BENCHMARK_PEOPLE (default 100,000) and
+BENCHMARK_LETTERS (default 1,000,000) set the dataset size.
+"""
+
+from datetime import datetime, timedelta
+
+from django.contrib.admin import site
+from django.test import RequestFactory, TestCase
+from django.utils.timezone import make_aware
+
+from src.app.admin.person import EligibilityListFilter
+from src.app.models.person import ELIGIBILITY_INTERVAL_DAYS, Person
+from src.tests.benchmarks import benchmark, scale, timed
+from src.tests.benchmarks.data import make_letters, make_people
+
+
+# The join-based filters these replaced, for comparison
+def legacy_cutoff():
+    return make_aware(datetime.now() - timedelta(days=ELIGIBILITY_INTERVAL_DAYS))
+
+
+def legacy_eligible(queryset):
+    return queryset.exclude(letter__fulfilled_date__gt=legacy_cutoff())
+
+
+def legacy_not_eligible(queryset):
+    return queryset.filter(letter__fulfilled_date__gt=legacy_cutoff())
+
+
+def legacy_pending(queryset):
+    return legacy_eligible(queryset).filter(
+        letter__isnull=False, letter__fulfilled_date__isnull=True
+    )
+
+
+LEGACY = {"true": legacy_eligible, "false": legacy_not_eligible, "pending": legacy_pending}
+
+
+@benchmark
+class EligibilityFilterBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        person_ids = make_people(scale("PEOPLE", 100_000))
+        make_letters(scale("LETTERS", 1_000_000), person_ids)
+
+    def apply_filter(self, value: str):
+        request = RequestFactory().get("/")
+        list_filter = EligibilityListFilter(
+            request, {"eligibility": [value]}, Person, site._registry[Person]
+        )
+        return list_filter.queryset(request, Person.objects.all())
+
+    def test_eligibility_filter(self):
+        # What Person.eligible/has_pending_letters say, person by person
+        expected = {"true": set(), "false": set(), "pending": set()}
+        for person in Person.objects.with_stats().iterator(chunk_size=5000):
+            if person.eligible:
+                expected["true"].add(person.pk)
+                if person.has_pending_letters:
+                    expected["pending"].add(person.pk)
+            else:
+                expected["false"].add(person.pk)
+
+        for value, legacy in LEGACY.items():
+            print(f"\neligibility={value}")
+            with timed("legacy"):
+                legacy_ids = list(legacy(Person.objects.all()).values_list("pk", flat=True))
+            with timed("exists"):
+                ids = list(self.apply_filter(value).values_list("pk", flat=True))
+            print(
+                f"  {len(ids)} rows; legacy returned {len(legacy_ids)} rows "
+                f"({len(set(legacy_ids) ^ expected[value])} disagreeing with Person.eligible)"
+            )
+            self.assertEqual(len(ids), len(set(ids)))
+            self.assertEqual(set(ids), expected[value])
@@ -0,0 +1,64 @@
+"""
+Exporting every person as CSV and XLSX, streamed, against the tablib Dataset
+export it replaced. BENCHMARK_PEOPLE (default 200,000) sets the dataset size.
+
+Peak RSS only ever grows, so each export reports how far it raised the
+process's high-water mark; the streaming exports run first.
+"""
+
+from contextlib import contextmanager
+import resource
+
+from django.contrib import admin
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from src.app.admin.export import StreamingExportMixin
+from src.app.models.person import Person
+from src.auth.models import User
+from src.tests.benchmarks import benchmark, counted_queries, scale, timed
+from src.tests.benchmarks.data import make_people, make_prisons
+
+
+@contextmanager
+def peak_rss():
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    yield
+    grown = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+    print(f"  peak RSS +{grown / 1024:.1f}MB")
+
+
+@benchmark
+class ExportBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make_people(scale("PEOPLE", 200_000), make_prisons(100))
+
+    def setUp(self):
+        self.user = User.objects.create(email="a@b.com", is_staff=True, is_superuser=True)
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.model_admin = admin.site.get_model_admin(Person)
+        self.formats = [f.__name__ for f in self.model_admin.get_export_formats()]
+
+    def export_data(self, format_name: str) -> dict:
+        return {"file_format": self.formats.index(format_name)}
+
+    def test_export(self):
+        print(f"\n{Person.objects.count():,} people")
+        for format_name in ("CSV", "XLSX"):
+            with peak_rss(), counted_queries(), timed(f"streamed {format_name}"):
+                response = self.client.post(
+                    reverse("admin:app_person_export"), self.export_data(format_name)
+                )
+                size = sum(len(chunk) for chunk in response.streaming_content)
+            print(f"  {size / 1024 / 1024:.1f}MB")
+
+        for format_name in ("CSV", "XLSX"):
+            request = RequestFactory().post(
+                reverse("admin:app_person_export"), self.export_data(format_name)
+            )
+            request.user = self.user
+            with peak_rss(), counted_queries(), timed(f"tablib {format_name}"):
+                response = super(StreamingExportMixin, self.model_admin).export_action(request)
+            print(f"  {len(response.content) / 1024 / 1024:.1f}MB")
@@ -0,0 +1,71 @@
+"""
+Marking a mail day's letters fulfilled. BENCHMARK_SELECTED (default 1,000) sets
+how many pending letters are selected, out of BENCHMARK_PEOPLE (default 10,000)
+people with two letters each.
+"""
+
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+
+from src.app.models.letter import Letter
+from src.app.utils import WorkflowStage
+from src.auth.models import User
+from src.tests.benchmarks import benchmark, counted_queries, scale, timed
+from src.tests.benchmarks.data import make_letters, make_people, make_prisons
+
+
+def legacy_move_to_fulfilled(queryset):
+    """The per-letter loop this replaced, without its messages."""
+    fulfilled_date = now()
+    change = []
+    for letter in queryset:
+        if letter.person:
+            change.append(letter.id)
+            letter.prison_sent_to = letter.person.prison_at(fulfilled_date)
+            letter.save()
+    queryset.filter(id__in=change).update(
+        fulfilled_date=fulfilled_date, workflow_stage=WorkflowStage.FULFILLED
+    )
+
+
+@benchmark
+class FulfillmentBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        people = scale("PEOPLE", 10_000)
+        make_letters(people * 2, make_people(people, make_prisons(100)))
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(
+            User.objects.create(email="a@b.com", is_staff=True, is_superuser=True)
+        )
+        pending = Letter.objects.filter(workflow_stage=WorkflowStage.STAGE1_COMPLETE)
+        selected = scale("SELECTED", 1_000)
+        self.legacy_ids = list(pending.order_by("pk").values_list("pk", flat=True)[:selected])
+        self.action_ids = list(pending.order_by("-pk").values_list("pk", flat=True)[:selected])
+
+    def test_move_to_fulfilled(self):
+        print(f"\n{len(self.action_ids)} letters")
+        with counted_queries(), timed("admin action"):
+            # "Select all" across the pages of a filtered changelist
+            response = self.client.post(
+                reverse("admin:app_letter_changelist")
+                + f"?id__in={','.join(map(str, self.action_ids))}",
+                {
+                    "action": "move_to_fulfilled",
+                    "select_across": "1",
+                    "_selected_action": self.action_ids[:1],
+                },
+            )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            Letter.objects.filter(
+                pk__in=self.action_ids, workflow_stage=WorkflowStage.FULFILLED
+            ).count(),
+            len(self.action_ids),
+        )
+
+        with counted_queries(), timed("per-letter loop"):
+            legacy_move_to_fulfilled(Letter.objects.filter(pk__in=self.legacy_ids))
@@ -0,0 +1,47 @@
+"""
+A fulfillment batch of BENCHMARK_LETTERS (default 5,000) pending letters:
+adding them, the batch changelist and detail page, and shipping the batch.
+"""
+
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from src.app.models.fulfillment import FulfillmentBatch
+from src.app.models.letter import Letter
+from src.app.utils import WorkflowStage
+from src.auth.models import User
+from src.tests.benchmarks import benchmark, counted_queries, scale, timed
+from src.tests.benchmarks.data import make_letters, make_people, make_prisons
+
+
+@benchmark
+class FulfillmentBatchBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        letters = scale("LETTERS", 5_000)
+        make_letters(letters, make_people(letters, make_prisons(100)))
+        Letter.objects.update(workflow_stage=WorkflowStage.STAGE1_COMPLETE, fulfilled_date=None)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(
+            User.objects.create(email="a@b.com", is_staff=True, is_superuser=True)
+        )
+
+    def test_batch(self):
+        print(f"\n{Letter.objects.count():,} letters")
+        batch = FulfillmentBatch.objects.create()
+        with counted_queries(), timed("add_letters"):
+            batch.add_letters(Letter.objects.all())
+
+        for label, url in (
+            ("changelist", reverse("admin:app_fulfillmentbatch_changelist")),
+            ("detail", reverse("admin:app_fulfillmentbatch_change", args=[batch.pk])),
+        ):
+            with counted_queries(), timed(label):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+        with counted_queries(), timed("ship"):
+            shipped = batch.transition(FulfillmentBatch.Statuses.SHIPPED)
+        self.assertEqual(shipped, Letter.objects.count())
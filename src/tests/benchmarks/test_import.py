@@ -0,0 +1,42 @@
+"""
+Re-uploading a person export with 1% of rows changed, as the admin import
+preview does (dry run), with and without the row fingerprint fast path.
+BENCHMARK_PEOPLE (default 100,000) sets the dataset size.
+"""
+
+from unittest import mock
+
+from django.test import TestCase
+
+from src.app.admin.fingerprint import FingerprintImportMixin
+from src.app.admin.person import PersonResource
+from src.tests.benchmarks import benchmark, counted_queries, scale, timed
+from src.tests.benchmarks.data import make_people, make_prisons
+
+
+@benchmark
+class FingerprintImportBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make_people(scale("PEOPLE", 100_000), make_prisons(100))
+
+    def test_reimport(self):
+        dataset = PersonResource().export()
+        last_name = dataset.headers.index("last_name")
+        for i in range(0, len(dataset), 100):
+            row = list(dataset[i])
+            row[last_name] += "X"
+            dataset[i] = row
+        print(f"\n{len(dataset):,} rows, {len(dataset[::100]):,} changed")
+
+        with counted_queries(), timed("fingerprints"):
+            result = PersonResource().import_data(dataset, dry_run=True)
+        self.assertEqual(result.totals["update"], len(dataset[::100]))
+
+        with (
+            mock.patch.object(FingerprintImportMixin, "is_unchanged", return_value=False),
+            counted_queries(),
+            timed("skip_unchanged only"),
+        ):
+            result = PersonResource().import_data(dataset, dry_run=True)
+        self.assertEqual(result.totals["update"], len(dataset[::100]))
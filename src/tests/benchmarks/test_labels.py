@@ -0,0 +1,43 @@
+"""
+Printing labels and packing slips for a mail day's letters through the print
+action, all letters selected. BENCHMARK_LETTERS (default 1,000) sets how many.
+"""
+
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from src.app.models.letter import Letter
+from src.auth.models import User
+from src.tests.benchmarks import benchmark, counted_queries, scale, timed
+from src.tests.benchmarks.data import make_letters, make_people, make_prisons
+
+
+@benchmark
+class LabelsBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        letters = scale("LETTERS", 1_000)
+        make_letters(letters, make_people(letters, make_prisons(100)))
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(
+            User.objects.create(email="a@b.com", is_staff=True, is_superuser=True)
+        )
+
+    def test_print(self):
+        print(f"\n{Letter.objects.count():,} letters")
+        for action in ("print_labels", "print_packing_slips"):
+            with counted_queries(), timed(action):
+                response = self.client.post(
+                    reverse("admin:app_letter_changelist"),
+                    # "Select all", as posting 1,000 ids is over DATA_UPLOAD_MAX_NUMBER_FIELDS
+                    {
+                        "action": action,
+                        "select_across": "1",
+                        "index": "0",
+                        "_selected_action": Letter.objects.values_list("pk", flat=True)[:1],
+                    },
+                )
+                size = sum(len(chunk) for chunk in response.streaming_content)
+            print(f"  {size / 1024:.0f}KB")
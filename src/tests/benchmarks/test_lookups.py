@@ -0,0 +1,72 @@
+"""
+Person autocomplete latency, one request per keystroke, against the previous
+OR-of-icontains query. BENCHMARK_PEOPLE (default 500,000) sets the dataset size.
+Name matches are only index-backed on PostgreSQL.
+"""
+
+from statistics import median, quantiles
+import time
+
+from django.db.models import Q
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from src.app.models.person import Person
+from src.auth.models import User
+from src.tests.benchmarks import benchmark, scale
+from src.tests.benchmarks.data import make_people, make_prisons
+
+# What gets typed into the person box, one keystroke at a time
+TYPED = ["BM0012345", "bm-0400", "SMITH12", "linda garcia", "JONES4999"]
+
+
+def keystrokes() -> list[str]:
+    return [term[:end] for term in TYPED for end in range(1, len(term) + 1) if term[:end].strip()]
+
+
+def report(label: str, latencies: list[float]) -> None:
+    p95 = quantiles(latencies, n=20)[18]
+    print(f"  {label}: p50 {median(latencies) * 1000:.1f}ms, p95 {p95 * 1000:.1f}ms")
+
+
+@benchmark
+class LookupBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make_people(scale("PEOPLE", 500_000), make_prisons(100))
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(
+            User.objects.create(
+                email="a@b.com", is_staff=True, is_superuser=True, is_contributor=True
+            )
+        )
+
+    def test_keystrokes(self):
+        print(f"\n{len(keystrokes())} keystrokes")
+        latencies = []
+        for q in keystrokes():
+            start = time.perf_counter()
+            list(
+                Person.objects.with_stats()
+                .with_current_prison()
+                .filter(
+                    Q(inmate_number__icontains=q)
+                    | Q(first_name__icontains=q)
+                    | Q(last_name__icontains=q)
+                )
+                .order_by("inmate_number")[:10]
+            )
+            latencies.append(time.perf_counter() - start)
+        report("previous query", latencies)
+
+        for channel in ("person_channel", "person_contrib_channel"):
+            url = reverse("ajax_lookup", kwargs={"channel": channel})
+            latencies = []
+            for q in keystrokes():
+                start = time.perf_counter()
+                response = self.client.get(url, {"term": q})
+                latencies.append(time.perf_counter() - start)
+                self.assertEqual(response.status_code, 200)
+            report(channel, latencies)
@@ -0,0 +1,54 @@
+"""
+Person search against the admin's previous OR-of-icontains search.
+BENCHMARK_PEOPLE (default 500,000) sets the dataset size. The trigram index
+only exists on PostgreSQL; elsewhere both sides scan.
+"""
+
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from django.test import TestCase
+
+from src.app.models.person import Person
+from src.app.search import search_people
+from src.tests.benchmarks import benchmark, scale, timed
+from src.tests.benchmarks.data import make_people
+
+TERMS = ["BM0123456", "GARCIA12345", "linda miller4", "SMITH9999"]
+
+
+def substring_search(term: str):
+    """What ModelAdmin.search_fields did for PersonAdmin."""
+    queryset = Person.objects.all()
+    for word in term.split():
+        queryset = queryset.filter(
+            reduce(
+                or_,
+                (
+                    Q(**{f"{field}__icontains": word})
+                    for field in ("inmate_number", "last_name", "first_name")
+                ),
+            )
+        )
+    return queryset
+
+
+@benchmark
+class SearchBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make_people(scale("PEOPLE", 500_000))
+
+    def test_search(self):
+        for term in TERMS:
+            print(f"\n{term!r}")
+            with timed("substring"):
+                before = set(substring_search(term)[:25].values_list("pk", flat=True))
+            with timed("search_people"):
+                queryset, indexed = search_people(Person.objects.all(), term)
+                after = set(queryset[:25].values_list("pk", flat=True))
+            print(f"  indexed: {indexed}")
+            # same people, allowing for the different ranking within the first 25
+            if len(before) < 25:
+                self.assertEqual(after, before)
@@ -0,0 +1,29 @@
+from django.template.loader import render_to_string
+from django.test import SimpleTestCase
+
+from src.app.utils import format_address, format_address_text
+
+ADDRESSES = [
+    (["JOHN SMITH", "AB1234", "SCI Albion"], "10745 Route 18", "Albion", "PA", "16475"),
+    (["JANE DOE", None, "Allegheny County Jail", ""], "950 2nd Ave", "Pittsburgh", "PA", "15219"),
+    (["O'Brien & <Sons>"], '1 "Main" St', "Erie", "PA", "16501"),
+    ([], "", "", "", ""),
+]
+
+
+class TestFormatAddress(SimpleTestCase):
+    def test_matches_template(self):
+        for headers, *address in ADDRESSES:
+            with self.subTest(headers=headers):
+                context = dict(zip(("address", "city", "state", "zip"), address))
+                expected = render_to_string(
+                    "addresses/address.html", {"headers": headers, **context}
+                )
+                self.assertEqual(format_address(headers, *address), expected)
+
+    def test_plain_text(self):
+        headers, *address = ADDRESSES[1]
+        self.assertEqual(
+            format_address_text(headers, *address),
+            "JANE DOE\nAllegheny County Jail\n950 2nd Ave\nPittsburgh, PA 15219",
+        )
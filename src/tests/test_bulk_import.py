@@ -0,0 +1,109 @@
+from datetime import datetime
+from io import StringIO
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils.timezone import make_aware
+from model_bakery import baker
+
+from src.app.models.letter import Letter
+from src.app.models.person import Person
+from src.app.models.prison import PersonPrison
+
+FIXTURE = Path(settings.BASE_DIR) / "app" / "fixtures" / "test_db.csv"
+LEGACY_PRISON_IDS = ("1", "3", "11", "39", "41", "59", "65", "68", "84")
+
+
+class TestBulkImport(TestCase):
+    def setUp(self):
+        self.prisons = {
+            legacy_id: baker.make("app.Prison", legacy_id=legacy_id)
+            for legacy_id in LEGACY_PRISON_IDS
+        }
+        self.tmp = TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write_csv(self, content: str) -> str:
+        path = Path(self.tmp.name) / "people.csv"
+        path.write_text(
+            "inmate_number,first_name,last_name,legacy_last_served_date,legacy_prison_id\n"
+            + content
+        )
+        return str(path)
+
+    def bulk_import(self, path, **options) -> tuple[str, str]:
+        stdout, stderr = StringIO(), StringIO()
+        call_command("bulk_import", path, stdout=stdout, stderr=stderr, **options)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import(self):
+        # the prison map, then per batch of new people: a savepoint, one read
+        # and four inserts, however big the batch
+        with self.assertNumQueries(1 + 3 * 7):
+            self.bulk_import(FIXTURE, batch_size=4)
+        self.assertEqual(Person.objects.count(), 10)
+        bates = Person.objects.get(inmate_number="AA1111")
+        self.assertEqual((bates.first_name, bates.last_name), ("NORMAN", "BATES"))
+        self.assertEqual(bates.current_prison, self.prisons["39"])
+        self.assertEqual(bates.last_served, make_aware(datetime(2018, 8, 7)))
+        self.assertEqual(bates.stats.package_count, 1)
+        self.assertIsNotNone(bates.next_eligible_date)
+
+    def test_reimport(self):
+        self.bulk_import(FIXTURE)
+        path = self.write_csv("AA1111,NORMAN,BATES,1/1/2017,41\nBB2222,PAT,BATEMAN,9/9/2019,65\n")
+        out, _ = self.bulk_import(path, verbosity=2)
+        self.assertIn("1 updated, 1 unchanged, 1 custody changes, 0 last served dates", out)
+        self.assertIn("update BB2222 first_name 'PATRICK' -> 'PAT'", out)
+        bateman = Person.objects.get(inmate_number="BB2222")
+        self.assertEqual(bateman.row_hash, bateman.fingerprint())
+        bates = Person.objects.get(inmate_number="AA1111")
+        self.assertEqual(bates.current_prison, self.prisons["41"])
+        self.assertEqual(bates.prisons.count(), 2)
+        # the earlier date doesn't replace the later one
+        self.assertEqual(bates.letter_set.count(), 1)
+
+    def test_dry_run(self):
+        out, _ = self.bulk_import(FIXTURE, dry_run=True)
+        self.assertIn("line 2: create AA1111", out)
+        self.assertIn("10 people created", out)
+        self.assertFalse(Person.objects.exists())
+        self.assertFalse(PersonPrison.objects.exists())
+        self.assertFalse(Letter.objects.exists())
+
+    def test_errors(self):
+        path = self.write_csv(
+            "AA1111,NORMAN,,,\n"
+            "BB2222,PATRICK,BATEMAN,13/45/2019,\n"
+            "CC3333,DAMIEN,THORN,,999\n"
+            ",NO,NUMBER,,\n"
+            "dd-4444,FREDDY,KRUEGER,,\n"
+            "DD4444,FREDDY,KRUEGER,,\n"
+        )
+        _, err = self.bulk_import(path)
+        self.assertEqual(
+            err.splitlines(),
+            [
+                "line 3: Unrecognized date '13/45/2019'",
+                "line 4: No prison with legacy ID 999",
+                "line 5: Missing inmate_number",
+                "line 7: DD4444 is a duplicate of line 6",
+                "line 2: New person AA1111 needs first and last names",
+            ],
+        )
+        self.assertEqual(list(Person.objects.values_list("inmate_number", flat=True)), ["DD4444"])
+
+    def test_resume_from_checkpoint(self):
+        checkpoint = Path(self.tmp.name) / "checkpoint.json"
+        checkpoint.write_text(json.dumps({"path": str(FIXTURE.resolve()), "line": 6}))
+        out, _ = self.bulk_import(FIXTURE, checkpoint=str(checkpoint))
+        self.assertIn("Resuming after line 6.", out)
+        self.assertEqual(
+            sorted(Person.objects.values_list("inmate_number", flat=True)),
+            ["FF6666", "GG7777", "HH8888", "II9999", "JJ0000"],
+        )
+        self.assertFalse(checkpoint.exists())
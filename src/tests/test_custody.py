@@ -0,0 +1,123 @@
+from datetime import timedelta
+
+from django.db import IntegrityError
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+from model_bakery import baker
+
+from src.app.models.letter import Letter
+from src.app.models.person import Person
+from src.app.models.prison import PersonPrison
+from src.app.utils import WorkflowStage
+from src.auth.models import User
+
+
+class TestCustodyHistory(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="a@b.com", is_staff=True, is_superuser=True)
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.person = baker.make("app.Person")
+        self.old_prison, self.new_prison = baker.make("app.Prison", _quantity=2)
+        self.started = now() - timedelta(days=30)
+        PersonPrison.objects.create(
+            person=self.person, prison=self.old_prison, valid_from=self.started
+        )
+
+    def test_move_to_prison(self):
+        self.person.move_to_prison(self.new_prison)
+        self.assertEqual(self.person.current_prison, self.new_prison)
+        self.assertEqual(self.person.prisons.count(), 2)
+        self.assertEqual(self.person.prison_at(self.started + timedelta(days=1)), self.old_prison)
+        self.assertIsNone(self.person.prison_at(self.started - timedelta(days=1)))
+
+    def test_one_current_row_per_person(self):
+        with self.assertRaises(IntegrityError):
+            PersonPrison.objects.create(person=self.person, prison=self.new_prison)
+
+    def test_with_current_prison(self):
+        self.person.move_to_prison(self.new_prison)
+        baker.make("app.Person", _quantity=5)
+        with self.assertNumQueries(2):
+            current = {
+                person.pk: person.current_prison for person in Person.objects.with_current_prison()
+            }
+        self.assertEqual(current[self.person.pk], self.new_prison)
+
+    def test_inline_change_keeps_history(self):
+        person_prison = self.person.prisons.get()
+        response = self.client.post(
+            reverse("admin:app_person_change", args=[self.person.id]),
+            {
+                "inmate_number": self.person.inmate_number,
+                "last_name": "LAST",
+                "first_name": "FIRST",
+                "prisons-TOTAL_FORMS": 1,
+                "prisons-INITIAL_FORMS": 1,
+                "prisons-MIN_NUM_FORMS": 0,
+                "prisons-MAX_NUM_FORMS": 1,
+                "prisons-0-id": person_prison.id,
+                "prisons-0-person": self.person.id,
+                "prisons-0-prison": self.new_prison.id,
+                "personissue_set-TOTAL_FORMS": 0,
+                "personissue_set-INITIAL_FORMS": 0,
+                "personissue_set-MIN_NUM_FORMS": 0,
+                "personissue_set-MAX_NUM_FORMS": 1000,
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        person_prison.refresh_from_db()
+        self.assertEqual(person_prison.prison, self.old_prison)
+        self.assertIsNotNone(person_prison.valid_to)
+        self.assertEqual(self.person.current_prison, self.new_prison)
+
+        response = self.client.get(reverse("admin:app_person_change", args=[self.person.id]))
+        self.assertContains(response, self.old_prison.name)
+
+    def test_prison_filter_uses_current_row(self):
+        self.person.move_to_prison(self.new_prison)
+        changelist = reverse("admin:app_person_changelist")
+        response = self.client.get(changelist, {"personprison": self.old_prison.id})
+        self.assertNotContains(response, self.person.inmate_number)
+        response = self.client.get(changelist, {"personprison": self.new_prison.id})
+        self.assertContains(response, self.person.inmate_number)
+
+    def test_fulfillment_sets_prison_sent_to(self):
+        self.person.move_to_prison(self.new_prison)
+        letter = baker.make("app.Letter", person=self.person)
+        self.client.post(
+            reverse("admin:app_letter_changelist"),
+            {"action": "move_to_fulfilled", "_selected_action": [letter.id]},
+        )
+        self.assertEqual(Letter.objects.get(pk=letter.pk).prison_sent_to, self.new_prison)
+
+    def test_bulk_fulfillment(self):
+        other = baker.make("app.Person")
+        letters = [
+            baker.make("app.Letter", person=self.person),
+            baker.make("app.Letter", person=other),
+            baker.make("app.Letter", person=self.person, _quantity=10),
+        ]
+        orphan = baker.make("app.Letter", person=None)
+        selected = [letters[0].id, letters[1].id, *[letter.id for letter in letters[2]]]
+        response = self.client.post(
+            reverse("admin:app_letter_changelist"),
+            {"action": "move_to_fulfilled", "_selected_action": [*selected, orphan.id]},
+            follow=True,
+        )
+        message = str(list(response.context["messages"])[0])
+        self.assertIn("12 letters marked as Fulfilled. 1 letter not changed.", message)
+        self.assertIn(reverse("admin:app_letter_change", args=[orphan.id]), message)
+
+        fulfilled = Letter.objects.filter(workflow_stage=WorkflowStage.FULFILLED)
+        self.assertEqual(set(fulfilled.values_list("pk", flat=True)), set(selected))
+        self.assertEqual(
+            set(fulfilled.values_list("modified_date", flat=True)),
+            set(fulfilled.values_list("fulfilled_date", flat=True)),
+        )
+        self.assertEqual(Letter.objects.get(pk=letters[0].pk).prison_sent_to, self.old_prison)
+        # never in custody
+        self.assertIsNone(Letter.objects.get(pk=letters[1].pk).prison_sent_to)
+        self.assertEqual(Letter.objects.get(pk=orphan.pk).workflow_stage, orphan.workflow_stage)
+        self.assertEqual(self.person.stats.package_count, 11)
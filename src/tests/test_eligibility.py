@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+from model_bakery import baker
+
+from src.app.models.person import Person
+from src.app.utils import WorkflowStage
+
+
+class TestEligibilityQuerySet(TestCase):
+    def setUp(self):
+        self.never_served = baker.make("app.Person")
+        self.served_long_ago = self.make_served(days_ago=100)
+        self.served_recently = self.make_served(days_ago=10)
+        self.not_counted = self.make_served(days_ago=10, counts_against_last_served=False)
+        self.discarded = self.make_served(days_ago=10, workflow_stage=WorkflowStage.DISCARDED)
+        self.pending = baker.make("app.Person")
+        baker.make("app.Letter", person=self.pending, workflow_stage=WorkflowStage.STAGE1_COMPLETE)
+        baker.make(
+            "app.Letter", person=self.served_recently, workflow_stage=WorkflowStage.STAGE1_COMPLETE
+        )
+
+    def make_served(self, days_ago: int, **letter_kwargs) -> Person:
+        person = baker.make("app.Person")
+        letter_kwargs.setdefault("workflow_stage", WorkflowStage.FULFILLED)
+        baker.make(
+            "app.Letter",
+            person=person,
+            fulfilled_date=now() - timedelta(days=days_ago),
+            **letter_kwargs,
+        )
+        # a second, older letter must not duplicate rows
+        baker.make(
+            "app.Letter",
+            person=person,
+            workflow_stage=WorkflowStage.FULFILLED,
+            fulfilled_date=now() - timedelta(days=days_ago + 200),
+        )
+        return person
+
+    def test_matches_person_eligible(self):
+        people = Person.objects.all()
+        eligible = [person.pk for person in people if person.eligible]
+        not_eligible = [person.pk for person in people if not person.eligible]
+        self.assertCountEqual(Person.objects.eligible().values_list("pk", flat=True), eligible)
+        self.assertCountEqual(
+            Person.objects.not_eligible().values_list("pk", flat=True), not_eligible
+        )
+        self.assertCountEqual(not_eligible, [self.served_recently.pk])
+
+    def test_with_pending_letters(self):
+        self.assertCountEqual(
+            Person.objects.with_pending_letters(), [self.pending, self.served_recently]
+        )
+        self.assertCountEqual(Person.objects.eligible().with_pending_letters(), [self.pending])
+
+
+class TestNextEligibleDate(TestCase):
+    def setUp(self):
+        self.person = baker.make("app.Person")
+        self.letter = baker.make("app.Letter", person=self.person)
+
+    def fulfill(self, days_ago: int):
+        self.letter.workflow_stage = WorkflowStage.FULFILLED
+        self.letter.fulfilled_date = now() - timedelta(days=days_ago)
+        self.letter.save()
+
+    def test_recomputed_on_letter_changes(self):
+        self.assertIsNone(self.person.next_eligible_date)
+        self.fulfill(days_ago=85)
+        self.person.refresh_from_db()
+        self.assertEqual(
+            self.person.next_eligible_date, self.letter.fulfilled_date + timedelta(days=90)
+        )
+
+        self.letter.counts_against_last_served = False
+        self.letter.save()
+        self.person.refresh_from_db()
+        self.assertIsNone(self.person.next_eligible_date)
+
+    def test_eligible_between(self):
+        self.fulfill(days_ago=85)
+        soon = Person.objects.eligible_between(now(), now() + timedelta(days=7))
+        self.assertCountEqual(soon, [self.person])
+        self.assertFalse(Person.objects.eligible_between(now(), now() + timedelta(days=2)))
+
+    def test_unfulfilled_by_admin_action(self):
+        user = baker.make("CustomAuth.User", is_staff=True, is_superuser=True)
+        self.client.force_login(user)
+        self.fulfill(days_ago=10)
+        self.client.post(
+            reverse("admin:app_letter_changelist"),
+            {"action": "move_to_stage1_complete", "_selected_action": [self.letter.id]},
+        )
+        self.person.refresh_from_db()
+        self.assertIsNone(self.person.next_eligible_date)
+
+    def test_changelist_filter_and_sort(self):
+        user = baker.make("CustomAuth.User", is_staff=True, is_superuser=True)
+        self.client.force_login(user)
+        self.fulfill(days_ago=85)
+        changelist = reverse("admin:app_person_changelist")
+        response = self.client.get(changelist, {"next_eligible": "7", "o": "7"})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.person.inmate_number)
@@ -0,0 +1,69 @@
+import json
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+
+from src.app.models.prison import PersonPrison
+from src.auth.models import User
+
+
+class TestEligibilityCheck(TestCase):
+    url = reverse("admin:app_person_eligibility_check")
+
+    def setUp(self):
+        self.user = User.objects.create(email="a@b.com", is_staff=True, is_superuser=True)
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.prison = baker.make("app.Prison", restrictions="No hardcovers")
+        self.person = baker.make("app.Person", inmate_number="AB1234")
+        PersonPrison.objects.create(person=self.person, prison=self.prison)
+        baker.make("app.Letter", person=self.person)
+
+    def check(self, inmate_numbers: str, output: str = "json", **data):
+        return self.client.post(
+            self.url, {"inmate_numbers": inmate_numbers, "output": output, **data}
+        )
+
+    def test_json(self):
+        response = self.check("ab-1234\nZZ999")
+        results = json.loads(response.content)["results"]
+        self.assertEqual([row["inmate_number"] for row in results], ["AB1234", "ZZ999"])
+        self.assertEqual(results[0]["current_prison"], self.prison.name)
+        self.assertEqual(results[0]["restrictions"], "No hardcovers")
+        self.assertEqual(results[0]["pending_letter_count"], 1)
+        self.assertTrue(results[0]["eligible"])
+        self.assertFalse(results[1]["found"])
+
+    def test_csv_upload(self):
+        upload = SimpleUploadedFile("numbers.csv", b"AB1234\r\nZZ999\r\n")
+        response = self.check("", output="csv", upload=upload)
+        lines = response.content.decode().splitlines()
+        self.assertEqual(lines[0].split(",")[0], "inmate_number")
+        self.assertEqual(len(lines), 3)
+
+    def test_html(self):
+        response = self.check("AB1234", output="html")
+        self.assertContains(response, "No hardcovers")
+        self.assertContains(response, "Eligible")
+
+    def test_query_count_does_not_grow(self):
+        def query_count(inmate_numbers):
+            with CaptureQueriesContext(connection) as queries:
+                self.check("\n".join(inmate_numbers))
+            return len(queries)
+
+        people = baker.make("app.Person", _quantity=30)
+        for person in people:
+            PersonPrison.objects.create(person=person, prison=self.prison)
+        self.assertEqual(
+            query_count([people[0].inmate_number]),
+            query_count([person.inmate_number for person in people]),
+        )
+
+    def test_empty(self):
+        response = self.check("", output="html")
+        self.assertContains(response, "Enter or upload at least one inmate number.")
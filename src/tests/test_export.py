@@ -0,0 +1,70 @@
+import csv
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib import admin
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+from openpyxl import load_workbook
+
+from src.app.admin.person import PersonAdmin
+from src.app.models.person import Person
+from src.app.models.prison import PersonPrison
+from src.auth.models import User
+
+
+class TestStreamingExport(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="a@b.com", is_staff=True, is_superuser=True)
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.prison = baker.make("app.Prison", name="SCI Fayette")
+        self.people = baker.make("app.Person", _quantity=5)
+        for person in self.people:
+            PersonPrison.objects.create(person=person, prison=self.prison)
+        baker.make("app.Letter", person=self.people[0], _quantity=2)
+
+    def export(self, format_name: str):
+        # filter counts on the changelist are cached
+        cache.clear()
+        formats = admin.site.get_model_admin(Person).get_export_formats()
+        file_format = [f.__name__ for f in formats].index(format_name)
+        return self.client.post(reverse("admin:app_person_export"), {"file_format": file_format})
+
+    def test_csv(self):
+        response = self.export("CSV")
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual(len(rows), 5)
+        first = next(row for row in rows if row["id"] == str(self.people[0].pk))
+        self.assertEqual(first["current_prison"], "SCI Fayette")
+        self.assertEqual(first["letter_count"], "2")
+        self.assertEqual(first["eligible"], "True")
+
+    def test_xlsx(self):
+        response = self.export("XLSX")
+        sheet = load_workbook(BytesIO(b"".join(response.streaming_content))).active
+        rows = list(sheet.values)
+        self.assertEqual(rows[0][:2], ("id", "last_name"))
+        self.assertEqual(len(rows), 6)
+        self.assertTrue(sheet["A1"].font.bold)
+
+    def test_queries_per_chunk(self):
+        """A fixed number of queries per chunk of rows, however many rows."""
+        with CaptureQueriesContext(connection) as few:
+            b"".join(self.export("CSV").streaming_content)
+        for person in baker.make("app.Person", _quantity=20):
+            PersonPrison.objects.create(person=person, prison=self.prison)
+        with CaptureQueriesContext(connection) as many:
+            b"".join(self.export("CSV").streaming_content)
+        self.assertEqual(len(many), len(few))
+        with mock.patch.object(PersonAdmin, "export_chunk_size", 10):
+            with CaptureQueriesContext(connection) as chunked:
+                b"".join(self.export("CSV").streaming_content)
+        # their prisons for each of the two more chunks
+        self.assertEqual(len(chunked), len(few) + 2)
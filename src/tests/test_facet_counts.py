@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now
+from model_bakery import baker
+
+from src.app.models.person import Person
+from src.app.models.prison import PersonPrison
+from src.app.utils import WorkflowStage
+from src.auth.models import User
+
+
+def filter_choices(response, title: str) -> list[str]:
+    for spec in response.context["cl"].filter_specs:
+        if str(spec.title) == title:
+            return [str(choice["display"]) for choice in spec.choices(response.context["cl"])]
+    raise AssertionError(f"no {title} filter")
+
+
+class TestFacetCounts(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(email="a@b.com", is_staff=True, is_superuser=True)
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.prison = baker.make("app.Prison", name="SCI A")
+        self.people = baker.make("app.Person", _quantity=3)
+        for person in self.people[:2]:
+            PersonPrison.objects.create(person=person, prison=self.prison)
+        baker.make("app.Letter", person=self.people[0], _quantity=2)
+        baker.make(
+            "app.Letter",
+            person=self.people[1],
+            workflow_stage=WorkflowStage.FULFILLED,
+            fulfilled_date=now() - timedelta(days=10),
+            prison_sent_to=self.prison,
+        )
+
+    def test_eligibility_counts(self):
+        self.assertEqual(
+            Person.objects.eligibility_counts(),
+            {"eligible": 2, "not_eligible": 1, "pending": 1},
+        )
+
+    def test_person_filters(self):
+        response = self.client.get(reverse("admin:app_person_changelist"))
+        self.assertEqual(
+            filter_choices(response, "Eligibility"),
+            ["All", "Eligible (2)", "Not eligible (1)", "Eligible, letters pending (1)"],
+        )
+        # Prisons other than the selected one are found by searching
+        self.assertEqual(filter_choices(response, "prisons"), ["All", "Not in custody (1)"])
+        response = self.client.get(
+            reverse("admin:app_person_changelist") + f"?personprison={self.prison.pk}"
+        )
+        self.assertEqual(
+            filter_choices(response, "prisons"), ["All", "SCI A (2)", "Not in custody (1)"]
+        )
+
+    def test_letter_filters(self):
+        response = self.client.get(reverse("admin:app_letter_changelist"))
+        self.assertIn("Stage 1 complete (2)", filter_choices(response, "workflow stage"))
+        self.assertIn("Fulfilled (1)", filter_choices(response, "workflow stage"))
+        self.assertEqual(filter_choices(response, "prison sent to"), ["All", "SCI A (1)", "- (2)"])
+
+    def test_cached_until_change(self):
+        url = reverse("admin:app_letter_changelist")
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(url)
+        with CaptureQueriesContext(connection) as cached:
+            self.client.get(url)
+        # workflow_stage and prison_sent_to
+        self.assertEqual(len(cached), len(first) - 2)
+
+        baker.make("app.Letter", person=self.people[2])
+        response = self.client.get(url)
+        self.assertIn("Stage 1 complete (3)", filter_choices(response, "workflow stage"))
+
+    def test_custody_change(self):
+        url = reverse("admin:app_person_changelist") + f"?personprison={self.prison.pk}"
+        self.client.get(url)
+        self.people[2].move_to_prison(self.prison)
+        response = self.client.get(url)
+        self.assertEqual(
+            filter_choices(response, "prisons"), ["All", "SCI A (3)", "Not in custody (0)"]
+        )
@@ -0,0 +1,97 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+
+from src.app.admin.person import PersonResource
+from src.app.admin.prison import PrisonResource
+from src.app.models.person import Person
+from src.app.models.prison import Prison
+from src.auth.models import User
+
+
+def selects(context: CaptureQueriesContext) -> list[str]:
+    return [query["sql"] for query in context.captured_queries if query["sql"].startswith("SELECT")]
+
+
+class TestRowHash(TestCase):
+    def test_maintained_on_save(self):
+        person = baker.make("app.Person", first_name="MARY", last_name="JONES")
+        self.assertEqual(person.row_hash, person.fingerprint())
+        original = person.row_hash
+
+        person.first_name = "MARIE"
+        person.save(update_fields=["first_name"])
+        person.refresh_from_db()
+        self.assertNotEqual(person.row_hash, original)
+        self.assertEqual(person.row_hash, person.fingerprint())
+
+        prison = baker.make("app.Prison")
+        self.assertEqual(prison.row_hash, prison.fingerprint())
+
+
+class TestFingerprintImport(TestCase):
+    def setUp(self):
+        self.people = baker.make("app.Person", status="", _quantity=5)
+
+    def test_unchanged_rows_skipped_without_loading(self):
+        dataset = PersonResource().export()
+        with CaptureQueriesContext(connection) as context:
+            result = PersonResource().import_data(dataset, raise_errors=True)
+        self.assertEqual(result.totals["skip"], 5)
+        # just the stored hashes
+        self.assertEqual(len(selects(context)), 1)
+
+    def test_changed_rows_imported(self):
+        dataset = PersonResource().export()
+        changed = dataset.dict[0]
+        changed["last_name"] = "BATES"
+        dataset[0] = [changed[header] for header in dataset.headers]
+        new = dict.fromkeys(dataset.headers, "")
+        new.update(inmate_number="ZZ9999", first_name="NORMAN", last_name="BATES")
+        dataset.append([new[header] for header in dataset.headers])
+
+        result = PersonResource().import_data(dataset, raise_errors=True)
+        self.assertEqual(result.totals["update"], 1)
+        self.assertEqual(result.totals["new"], 1)
+        self.assertEqual(result.totals["skip"], 4)
+        person = Person.objects.get(pk=changed["id"])
+        self.assertEqual(person.last_name, "BATES")
+        self.assertEqual(person.row_hash, person.fingerprint())
+        self.assertTrue(Person.objects.get(inmate_number="ZZ9999").row_hash)
+
+    def test_prisons(self):
+        baker.make("app.Prison", _quantity=3)
+        dataset = PrisonResource().export()
+        changed = dataset.dict[1]
+        changed["mailing_zipcode"] = "15213"
+        dataset[1] = [changed[header] for header in dataset.headers]
+
+        result = PrisonResource().import_data(dataset, raise_errors=True)
+        self.assertEqual(result.totals["update"], 1)
+        self.assertEqual(result.totals["skip"], 2)
+        self.assertEqual(Prison.objects.get(pk=changed["id"]).mailing_zipcode, "15213")
+
+    def test_skipped_rows_in_preview(self):
+        person = self.people[0]
+        person.last_name = "O'HARA"
+        person.save()
+        client = Client()
+        client.force_login(User.objects.create(email="a@b.com", is_staff=True, is_superuser=True))
+        upload = SimpleUploadedFile("people.csv", PersonResource().export().csv.encode())
+        # CSV
+        response = client.post(
+            reverse("admin:app_person_import"), {"import_file": upload, "input_format": 0}
+        )
+        result = response.context["result"]
+        self.assertEqual(
+            sorted(row.object_id for row in result.valid_rows()),
+            sorted(person.pk for person in self.people),
+        )
+        skipped = next(row for row in result.valid_rows() if row.object_id == person.pk)
+        self.assertEqual(skipped.object_repr, "O'HARA")
+        self.assertEqual(len(skipped.diff), len(result.diff_headers))
+        self.assertContains(response, "<span>O&#x27;HARA</span>", html=False)
+        self.assertContains(response, '<tr class="skip">', count=5)
@@ -0,0 +1,132 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+from model_bakery import baker
+
+from src.app.models.fulfillment import FulfillmentBatch
+from src.app.models.letter import Letter
+from src.app.models.prison import PersonPrison, Prison
+from src.app.utils import WorkflowStage
+from src.auth.models import User
+
+Statuses = FulfillmentBatch.Statuses
+
+
+class TestFulfillmentBatch(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="a@b.com", is_staff=True, is_superuser=True)
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.restricted = baker.make(
+            "app.Prison", prison_type=Prison.Types.FCI, restrictions="No hardcovers"
+        )
+        self.prison = baker.make("app.Prison", prison_type=Prison.Types.FCI, restrictions="")
+        self.people = baker.make("app.Person", _quantity=3)
+        for person, prison in zip(self.people, (self.restricted, self.prison, self.prison)):
+            PersonPrison.objects.create(person=person, prison=prison)
+        self.letters = [
+            *baker.make("app.Letter", person=self.people[0], _quantity=2),
+            baker.make("app.Letter", person=self.people[1]),
+            baker.make("app.Letter", person=self.people[2]),
+            baker.make("app.Letter", person=None),
+        ]
+
+    def make_batch(self) -> FulfillmentBatch:
+        batch = FulfillmentBatch.objects.create(created_by=self.user)
+        batch.add_letters(Letter.objects.all())
+        return batch
+
+    def test_totals(self):
+        batch = self.make_batch()
+        stored = FulfillmentBatch.objects.get(pk=batch.pk)
+        self.assertEqual(
+            [getattr(stored, field) for field in FulfillmentBatch.TOTAL_FIELDS],
+            # letters, people, prisons, restricted, unaddressed
+            [5, 3, 2, 2, 1],
+        )
+
+    def test_totals_follow_changes(self):
+        batch = self.make_batch()
+
+        def totals():
+            stored = FulfillmentBatch.objects.get(pk=batch.pk)
+            return [getattr(stored, field) for field in FulfillmentBatch.TOTAL_FIELDS]
+
+        Letter.objects.get(pk=self.letters[0].pk).delete()
+        self.assertEqual(totals(), [4, 3, 2, 1, 1])
+        letter = Letter.objects.get(pk=self.letters[2].pk)
+        letter.person = None
+        letter.save()
+        self.assertEqual(totals(), [4, 2, 2, 1, 2])
+        self.people[2].move_to_prison(self.restricted)
+        self.assertEqual(totals(), [4, 2, 1, 2, 2])
+
+    def test_add_letters(self):
+        fulfilled = self.letters[3]
+        Letter.objects.filter(pk=fulfilled.pk).update(workflow_stage=WorkflowStage.FULFILLED)
+        batch = self.make_batch()
+        self.assertEqual(batch.letter_count, 4)
+        # letters stay in their first unshipped batch
+        self.assertEqual(FulfillmentBatch.objects.create().add_letters(Letter.objects.all()), 0)
+
+    def test_transitions(self):
+        batch = self.make_batch()
+        batch.transition(Statuses.CLAIMED, self.user)
+        with self.assertRaisesMessage(ValueError, "is Claimed; it can't be marked Claimed"):
+            FulfillmentBatch.objects.get(pk=batch.pk).transition(Statuses.CLAIMED, self.user)
+        batch.transition(Statuses.PACKED)
+
+        with self.assertNumQueries(12):
+            shipped = batch.transition(Statuses.SHIPPED)
+        self.assertEqual(shipped, 4)
+        person = self.people[0]
+        person.refresh_from_db()
+        self.assertEqual(person.stats.package_count, 2)
+        self.assertEqual(
+            set(Letter.objects.filter(batch=batch).values_list("prison_sent_to", flat=True)),
+            {self.restricted.pk, self.prison.pk, None},
+        )
+        with self.assertRaises(ValueError):
+            batch.add_letters(Letter.objects.all())
+
+        self.assertEqual(batch.transition(Statuses.RETURNED), 4)
+        self.assertEqual(
+            Letter.objects.filter(batch=batch, workflow_stage=WorkflowStage.PROBLEM).count(), 4
+        )
+        stored = FulfillmentBatch.objects.get(pk=batch.pk)
+        self.assertEqual(stored.status, Statuses.RETURNED)
+        self.assertEqual(
+            set(
+                Letter.objects.filter(
+                    batch=batch, workflow_stage=WorkflowStage.PROBLEM
+                ).values_list("modified_date", flat=True)
+            ),
+            {stored.returned_date},
+        )
+        self.assertEqual(stored.claimed_by, self.user)
+        self.assertIsNotNone(stored.shipped_date)
+
+    def test_admin(self):
+        response = self.client.post(
+            reverse("admin:app_letter_changelist"),
+            {"action": "add_to_new_batch", "_selected_action": [self.letters[0].pk]},
+            follow=True,
+        )
+        batch = FulfillmentBatch.objects.get()
+        self.assertContains(response, "1 letter added to")
+        self.assertEqual(batch.letter_count, 1)
+
+        response = self.client.get(reverse("admin:app_fulfillmentbatch_change", args=[batch.pk]))
+        self.assertContains(response, "No hardcovers")
+        self.assertContains(response, f"?batch={batch.pk}")
+
+        self.client.post(
+            reverse("admin:app_fulfillmentbatch_changelist"),
+            {"action": "mark_shipped", "_selected_action": [batch.pk]},
+        )
+        self.letters[0].refresh_from_db()
+        self.assertEqual(self.letters[0].workflow_stage, WorkflowStage.FULFILLED)
+
+        labels = self.client.get(
+            reverse("admin:app_letter_print", args=["labels"]) + f"?batch={batch.pk}"
+        )
+        self.assertEqual(b"".join(labels.streaming_content).decode().count('class="label"'), 1)
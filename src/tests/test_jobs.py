@@ -0,0 +1,239 @@
+from datetime import timedelta
+from io import BytesIO, StringIO
+import socket
+import subprocess
+import sys
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.auth.models import Permission
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils.timezone import now
+from model_bakery import baker
+from openpyxl import load_workbook
+
+from src.app.admin.job import run_admin_action
+from src.app.admin.letter import LetterAdmin
+from src.app.jobs import enqueue, job, run_job
+from src.app.models.job import Job
+from src.app.models.letter import Letter
+from src.app.models.person import PersonStats
+from src.app.utils import WorkflowStage
+from src.auth.models import User
+
+
+@job
+def failing_job(job: Job):
+    raise ValueError("no such prison")
+
+
+@job
+def noop_job(job: Job):
+    pass
+
+
+@override_settings(BACKGROUND_JOBS=True, BACKGROUND_ACTION_THRESHOLD=3)
+class TestJobs(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="a@b.com", is_staff=True, is_superuser=True)
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def run_workers(self):
+        call_command("run_workers", burst=True, stdout=StringIO())
+
+    def test_claim(self):
+        first, second = (enqueue(failing_job, "Fail") for _ in range(2))
+        self.assertEqual(Job.claim("w1"), first)
+        claimed = Job.claim("w2")
+        self.assertEqual(claimed, second)
+        self.assertEqual(claimed.status, Job.Statuses.RUNNING)
+        self.assertEqual(Job.objects.get(pk=second.pk).worker, "w2")
+        self.assertIsNone(Job.claim("w1"))
+
+    def test_requeue_stale(self):
+        # a worker process on this host that has exited
+        exited = subprocess.run(
+            [sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True
+        )
+        host = socket.gethostname()
+        dead, remote_old, remote_new, live = (enqueue(noop_job, "Noop") for _ in range(4))
+        for queued, worker, started in (
+            (dead, f"{host}:{int(exited.stdout)}:0", now()),
+            (remote_old, "elsewhere:1", now() - timedelta(days=1)),
+            (remote_new, "elsewhere:2", now()),
+            (live, f"{host}:1", now() - timedelta(days=1)),
+        ):
+            Job.objects.filter(pk=queued.pk).update(
+                status=Job.Statuses.RUNNING, worker=worker, started_date=started, progress=3
+            )
+
+        self.run_workers()
+        statuses = dict(Job.objects.values_list("pk", "status"))
+        self.assertEqual(statuses[dead.pk], Job.Statuses.DONE)
+        self.assertEqual(statuses[remote_old.pk], Job.Statuses.DONE)
+        self.assertEqual(statuses[remote_new.pk], Job.Statuses.RUNNING)
+        # pid 1 (init) is always running
+        self.assertEqual(statuses[live.pk], Job.Statuses.RUNNING)
+
+    def test_failure_recorded(self):
+        enqueue(failing_job, "Fail")
+        with self.assertLogs("src.app.jobs", "ERROR"):
+            run_job(Job.claim("w1"))
+        failed = Job.objects.get()
+        self.assertEqual(failed.status, Job.Statuses.FAILED)
+        self.assertIn("ValueError: no such prison", failed.error)
+        self.assertIsNotNone(failed.finished_date)
+
+    def test_small_action_runs_inline(self):
+        letters = baker.make("app.Letter", person=baker.make("app.Person"), _quantity=2)
+        self.client.post(
+            reverse("admin:app_letter_changelist"),
+            {"action": "move_to_fulfilled", "_selected_action": [letter.pk for letter in letters]},
+        )
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(Letter.objects.filter(workflow_stage=WorkflowStage.FULFILLED).count(), 2)
+
+    def test_action_queued(self):
+        letters = baker.make("app.Letter", person=baker.make("app.Person"), _quantity=3)
+        response = self.client.post(
+            reverse("admin:app_letter_changelist"),
+            {"action": "move_to_fulfilled", "_selected_action": [letter.pk for letter in letters]},
+            follow=True,
+        )
+        queued = Job.objects.get()
+        self.assertIn(
+            reverse("admin:app_job_change", args=[queued.pk]),
+            str(list(response.context["messages"])[0]),
+        )
+        self.assertEqual(queued.description, "Mark selected letters as Fulfilled (3 letters)")
+        self.assertFalse(Letter.objects.filter(workflow_stage=WorkflowStage.FULFILLED).exists())
+
+        self.run_workers()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Job.Statuses.DONE)
+        self.assertEqual((queued.progress, queued.total), (3, 3))
+        self.assertEqual(queued.messages, [["success", "3 letters marked as Fulfilled."]])
+        self.assertEqual(Letter.objects.filter(workflow_stage=WorkflowStage.FULFILLED).count(), 3)
+        response = self.client.get(reverse("admin:app_job_change", args=[queued.pk]))
+        self.assertContains(response, "3 letters marked as Fulfilled.")
+
+    def test_action_progress(self):
+        letters = baker.make("app.Letter", person=baker.make("app.Person"), _quantity=5)
+        self.client.post(
+            reverse("admin:app_letter_changelist"),
+            {"action": "move_to_fulfilled", "_selected_action": [letter.pk for letter in letters]},
+        )
+        with (
+            mock.patch("src.app.admin.job.ACTION_BATCH_SIZE", 2),
+            mock.patch.object(
+                Job, "set_progress", autospec=True, side_effect=Job.set_progress
+            ) as progress,
+        ):
+            self.run_workers()
+        self.assertEqual([call.args[1] for call in progress.call_args_list], [0, 2, 4, 5])
+        self.assertEqual(Letter.objects.filter(workflow_stage=WorkflowStage.FULFILLED).count(), 5)
+        # one mail day and one message across the batches
+        self.assertEqual(Letter.objects.values("fulfilled_date").distinct().count(), 1)
+        self.assertEqual(
+            Job.objects.get().messages, [["success", "5 letters marked as Fulfilled."]]
+        )
+
+    def test_issue_action_queued(self):
+        person = baker.make("app.Person")
+        issues = baker.make("app.PersonIssue", person=person, _quantity=3)
+        self.client.post(
+            reverse("admin:app_personissue_changelist"),
+            {"action": "mark_issue_resolved", "_selected_action": [issue.pk for issue in issues]},
+        )
+        self.assertEqual(Job.objects.get().description, "Mark issue resolved (3 person issues)")
+        self.run_workers()
+        self.assertEqual(PersonStats.objects.get(person=person).open_issue_count, 0)
+
+    def test_export(self):
+        baker.make("app.Prison", name="SCI Fayette")
+        baker.make("app.Prison", name="SCI Albion")
+        response = self.client.post(
+            reverse("admin:app_prison_export") + "?q=Fayette",
+            # CSV
+            {"file_format": 0},
+        )
+        self.assertRedirects(response, reverse("admin:app_prison_changelist") + "?q=Fayette")
+
+        # stored in several chunks
+        with mock.patch("src.app.models.job.OUTPUT_CHUNK_SIZE", 64):
+            self.run_workers()
+        export = Job.objects.get()
+        self.assertEqual(export.status, Job.Statuses.DONE)
+        self.assertEqual((export.progress, export.total), (1, 1))
+        self.assertGreater(export.output_chunks.count(), 1)
+        response = self.client.get(reverse("admin:app_job_download", args=[export.pk]))
+        self.assertEqual(response["Content-Type"], "text/csv")
+        content = b"".join(response.streaming_content).decode()
+        self.assertIn("SCI Fayette", content)
+        self.assertNotIn("SCI Albion", content)
+
+    def test_xlsx_export(self):
+        letters = baker.make("app.Letter", person=baker.make("app.Person"), _quantity=3)
+        formats = [f.__name__ for f in LetterAdmin(Letter, admin.site).get_export_formats()]
+        self.client.post(reverse("admin:app_letter_export"), {"file_format": formats.index("XLSX")})
+        self.run_workers()
+        export = Job.objects.get()
+        self.assertEqual((export.status, export.progress), (Job.Statuses.DONE, 3))
+        response = self.client.get(reverse("admin:app_job_download", args=[export.pk]))
+        sheet = load_workbook(BytesIO(b"".join(response.streaming_content))).active
+        self.assertEqual(
+            sorted(row[0] for row in sheet.iter_rows(min_row=2, values_only=True)),
+            sorted(letter.pk for letter in letters),
+        )
+
+    def test_permissions(self):
+        self.client.post(reverse("admin:app_prison_export"), {"file_format": 0})
+        self.run_workers()
+        export = Job.objects.get()
+        volunteer = User.objects.create(email="v@b.com", is_staff=True)
+        volunteer.user_permissions.set(Permission.objects.filter(codename="view_job"))
+        self.client.force_login(volunteer)
+
+        download = reverse("admin:app_job_download", args=[export.pk])
+        self.assertEqual(self.client.get(download).status_code, 403)
+        changelist = reverse("admin:app_job_changelist")
+        run_again = {"action": "run_again", "_selected_action": [export.pk]}
+        response = self.client.post(changelist, run_again, follow=True)
+        self.assertContains(response, "1 job not queued")
+        self.assertEqual(Job.objects.count(), 1)
+
+        volunteer.user_permissions.add(Permission.objects.get(codename="view_prison"))
+        self.client.post(changelist, run_again)
+        rerun = Job.objects.get(created_by=volunteer)
+        self.run_workers()
+        self.assertEqual(
+            self.client.get(reverse("admin:app_job_download", args=[rerun.pk])).status_code, 200
+        )
+
+        action = enqueue(
+            run_admin_action,
+            "Mark selected letters as Fulfilled (1 letters)",
+            self.user,
+            model="app.Letter",
+            action="move_to_fulfilled",
+            ids=[baker.make("app.Letter").pk],
+        )
+        run_again["_selected_action"] = [action.pk]
+        self.client.post(changelist, run_again)
+        self.assertFalse(Job.objects.filter(name=action.name, created_by=volunteer).exists())
+        volunteer.user_permissions.add(Permission.objects.get(codename="view_letter"))
+        self.client.post(changelist, run_again)
+        self.assertTrue(Job.objects.filter(name=action.name, created_by=volunteer).exists())
+
+    def test_run_again(self):
+        enqueue(failing_job, "Fail")
+        with self.assertLogs("src.app.jobs", "ERROR"):
+            run_job(Job.claim("w1"))
+        self.client.post(
+            reverse("admin:app_job_changelist"),
+            {"action": "run_again", "_selected_action": [Job.objects.get().pk]},
+        )
+        self.assertEqual(Job.objects.filter(status=Job.Statuses.QUEUED).count(), 1)
@@ -0,0 +1,114 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+
+from src.app.models.letter import Letter
+from src.app.models.prison import PersonPrison, Prison
+from src.app.utils import WorkflowStage
+from src.auth.models import User
+
+
+class TestLabels(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="a@b.com", is_staff=True, is_superuser=True)
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.county = baker.make(
+            "app.Prison",
+            name="Allegheny County Jail",
+            prison_type=Prison.Types.COUNTY,
+            mailing_address="950 2nd Ave",
+            mailing_city="Pittsburgh",
+            mailing_zipcode="15219",
+        )
+        self.fci = baker.make(
+            "app.Prison",
+            name="FCI Loretto",
+            prison_type=Prison.Types.FCI,
+            additional_mailing_headers="Federal Correctional Institution",
+            restrictions="No hardcovers",
+        )
+        self.sci = baker.make("app.Prison", name="SCI Albion", prison_type=Prison.Types.SCI)
+
+    def make_letter(self, prison: Prison, **person) -> Letter:
+        person = baker.make("app.Person", **person)
+        PersonPrison.objects.create(person=person, prison=prison)
+        return baker.make("app.Letter", person=person)
+
+    def print_page(self, document: str, query: str = "") -> str:
+        response = self.client.get(reverse("admin:app_letter_print", args=[document]) + query)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_labels(self):
+        self.make_letter(self.county, first_name="JANE", last_name="DOE", inmate_number="CO1")
+        self.make_letter(self.fci, first_name="JOHN", last_name="SMITH", inmate_number="FC2")
+        sci_letter = self.make_letter(self.sci, inmate_number="SC3")
+
+        page = self.print_page("labels")
+        self.assertIn(
+            '<div class="label">JANE DOE\nAllegheny County Jail\n950 2nd Ave\n'
+            "Pittsburgh, PA 15219</div>",
+            page,
+        )
+        # county/city inmate numbers are left off
+        self.assertNotIn("CO1", page)
+        self.assertIn("JOHN SMITH\nFC2\nFCI Loretto\nFederal Correctional Institution\n", page)
+        self.assertEqual(page.count('class="label"'), 2)
+        self.assertIn("1 letter left out", page)
+        self.assertIn(f"{sci_letter.pk} (SC3)", page)
+
+    def test_packing_slips(self):
+        letter = self.make_letter(self.fci)
+        page = self.print_page("slips")
+        self.assertIn(f"<p>Letter {letter.pk}, postmarked", page)
+        self.assertIn("<dd>No hardcovers</dd>", page)
+
+    def test_filtered(self):
+        self.make_letter(self.fci, last_name="SMITH")
+        fulfilled = self.make_letter(self.fci, last_name="JONES")
+        Letter.objects.filter(pk=fulfilled.pk).update(workflow_stage=WorkflowStage.FULFILLED)
+        page = self.print_page("labels", f"?workflow_stage__exact={WorkflowStage.FULFILLED}")
+        self.assertIn("JONES", page)
+        self.assertNotIn("SMITH", page)
+
+    def test_action(self):
+        letters = [self.make_letter(self.fci) for _ in range(3)]
+        response = self.client.post(
+            reverse("admin:app_letter_changelist"),
+            {"action": "print_labels", "_selected_action": [letters[0].pk, letters[2].pk]},
+        )
+        self.assertEqual(b"".join(response.streaming_content).decode().count('class="label"'), 2)
+
+    def test_ordered_in_chunks(self):
+        for prison, last_name in (
+            (self.fci, "ADAMS"),
+            (self.county, "YOUNG"),
+            (self.fci, "BAKER"),
+            (self.county, "ABBOTT"),
+            (self.county, "MILLER"),
+        ):
+            self.make_letter(prison, first_name="A", last_name=last_name)
+        with mock.patch("src.app.labels.CHUNK_SIZE", 2):
+            page = self.print_page("slips")
+        names = ["ABBOTT", "MILLER", "YOUNG", "ADAMS", "BAKER"]
+        positions = [page.index(f"<dd>A {name}</dd>") for name in names]
+        self.assertEqual(positions, sorted(positions))
+
+    def test_fixed_queries(self):
+        """The same number of queries for 1 letter as for 30."""
+        self.make_letter(self.fci)
+        counts = []
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as context:
+                self.print_page("labels")
+                self.print_page("slips")
+            counts.append(len(context))
+            for prison in (self.county, self.fci) * 15:
+                self.make_letter(prison)
+        self.assertEqual(counts[0], counts[1])
@@ -0,0 +1,97 @@
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+
+from src.app.lookups import PersonLookupBase
+from src.app.utils import lookup_cache_stats
+from src.auth.models import User
+
+
+class TestLookupCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(email="a@b.com", is_staff=True, is_contributor=True)
+        self.client = Client()
+        self.client.force_login(self.user)
+        # fixed first names: random ones could match the searches below
+        self.smith = baker.make(
+            "app.Person", inmate_number="AB1234", last_name="SMITH", first_name="JOHN"
+        )
+        self.smithson = baker.make(
+            "app.Person", inmate_number="CD5678", last_name="SMITHSON", first_name="MARY"
+        )
+        self.smyth = baker.make(
+            "app.Person", inmate_number="EF9012", last_name="SMYTH", first_name="LINDA"
+        )
+
+    def search(self, term: str, channel: str = "person_channel") -> list[int]:
+        response = self.client.get(
+            reverse("ajax_lookup", kwargs={"channel": channel}), {"term": term}
+        )
+        self.assertEqual(response.status_code, 200)
+        return [int(result["pk"]) for result in json.loads(response.content)]
+
+    def stats(self, group: str = "people") -> dict:
+        return lookup_cache_stats()[group]
+
+    def test_hit(self):
+        with CaptureQueriesContext(connection) as miss:
+            first = self.search("smi")
+        with CaptureQueriesContext(connection) as hit:
+            # both person channels share results
+            self.assertEqual(self.search(" SMI", "person_contrib_channel"), first)
+        self.assertLess(len(hit), len(miss))
+        self.assertEqual(self.stats(), {"hit": 1, "refined": 0, "miss": 1, "hit_rate": 0.5})
+
+    def test_refined_in_memory(self):
+        self.search("sm")
+        self.assertEqual(self.search("smith"), [self.smith.pk, self.smithson.pk])
+        self.assertEqual(self.search("smy"), [self.smyth.pk])
+        self.search("ab")
+        self.assertEqual(self.search("ab-12"), [self.smith.pk])
+        self.assertEqual(self.stats()["refined"], 3)
+        # refinements are cached in their own right
+        self.search("smith")
+        self.assertEqual(self.stats()["hit"], 1)
+
+    def test_incomplete_candidates_not_refined(self):
+        with mock.patch.object(PersonLookupBase, "candidate_limit", 2):
+            self.search("sm")
+            self.assertEqual(self.search("smy"), [self.smyth.pk])
+        self.assertEqual(self.stats()["miss"], 2)
+
+    def test_invalidated_by_writes(self):
+        self.search("smi")
+        smitty = baker.make(
+            "app.Person", inmate_number="GH3456", last_name="SMITTY", first_name="JAMES"
+        )
+        self.assertIn(smitty.pk, self.search("smi"))
+        self.search("smi")
+        smitty.move_to_prison(baker.make("app.Prison"))
+        self.search("smi")
+        self.assertEqual(self.stats()["miss"], 3)
+
+    def test_letters(self):
+        letter = baker.make("app.Letter", person=self.smith)
+        self.assertEqual(self.search("smi", "letter_channel"), [letter.pk])
+        other = baker.make("app.Letter", person=self.smyth)
+        self.assertEqual(self.search("smy", "letter_channel"), [other.pk])
+        self.assertEqual(self.stats("letters")["miss"], 2)
+
+    def test_client_cache_headers(self):
+        url = reverse("ajax_lookup", kwargs={"channel": "person_channel"})
+        response = self.client.get(url, {"term": "smi"})
+        self.assertEqual(response["Cache-Control"], "private, max-age=30")
+
+    def test_stats_view(self):
+        self.search("smi")
+        response = self.client.get(reverse("lookup_stats"))
+        self.assertEqual(response.json()["people"]["miss"], 1)
+        self.client.force_login(User.objects.create(email="c@b.com", is_contributor=True))
+        self.assertEqual(self.client.get(reverse("lookup_stats")).status_code, 302)
@@ -0,0 +1,42 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+from model_bakery import baker
+
+from src.app.models.letter import Letter
+from src.app.models.person import Person
+from src.auth.models import User
+
+
+class TestOpenIssueCounts(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="a@b.com", is_staff=True, is_superuser=True)
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.quiet, self.busy = baker.make("app.Person", _quantity=2)
+        self.quiet_letter = baker.make("app.Letter", person=self.quiet)
+        self.busy_letter = baker.make("app.Letter", person=self.busy)
+        baker.make("app.PersonIssue", person=self.busy, _quantity=2)
+        baker.make("app.PersonIssue", person=self.quiet, resolved=True)
+        baker.make("app.LetterIssue", letter=self.busy_letter, _quantity=3)
+        baker.make("app.LetterIssue", letter=self.quiet_letter, resolved=True)
+
+    def test_letter_annotation(self):
+        counts = dict(Letter.objects.with_open_issue_count().values_list("pk", "open_issue_count"))
+        self.assertEqual(counts, {self.quiet_letter.pk: 0, self.busy_letter.pk: 3})
+        letter = Letter.objects.with_open_issue_count().get(pk=self.busy_letter.pk)
+        with self.assertNumQueries(0):
+            self.assertIn(">3<", letter.open_issues)
+
+    def test_person_annotation(self):
+        people = {person.pk: person for person in Person.objects.with_open_issue_count()}
+        with self.assertNumQueries(0):
+            self.assertEqual(people[self.quiet.pk].open_issue_count, 0)
+            self.assertEqual(people[self.busy.pk].open_issue_count, 2)
+
+    def test_admin_columns_sort_most_first(self):
+        for model, first in (("letter", self.busy_letter), ("person", self.busy)):
+            changelist = reverse(f"admin:app_{model}_changelist")
+            column = self.client.get(changelist).context["cl"].list_display.index("open_issues")
+            response = self.client.get(f"{changelist}?o={column}")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context["cl"].result_list[0].pk, first.pk)
@@ -0,0 +1,84 @@
+from html import unescape
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from model_bakery import baker
+
+from src.app.admin.pagination import KeysetChangeList
+from src.app.utils import WorkflowStage
+from src.auth.models import User
+
+
+@override_settings(ADMIN_KEYSET_PAGINATION=True)
+class TestKeysetPagination(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="a@b.com", is_staff=True, is_superuser=True)
+        self.client = Client()
+        self.client.force_login(self.user)
+        person = baker.make("app.Person")
+        for stage in (WorkflowStage.STAGE1_COMPLETE, WorkflowStage.DISCARDED):
+            baker.make("app.Letter", person=person, workflow_stage=stage, _quantity=30)
+        self.url = reverse("admin:app_letter_changelist")
+
+    def get_cl(self, query: str = ""):
+        response = self.client.get(self.url + unescape(query))
+        self.assertEqual(response.status_code, 200)
+        return response.context["cl"]
+
+    def walk(self, query: str = "") -> tuple[list[int], KeysetChangeList]:
+        """Follow the Next links from the given page, collecting row ids."""
+        cl = self.get_cl(query)
+        pks = [letter.pk for letter in cl.result_list]
+        while cl.keyset_next_url:
+            cl = self.get_cl(cl.keyset_next_url)
+            pks += [letter.pk for letter in cl.result_list]
+        return pks, cl
+
+    def test_default_ordering(self):
+        cl = self.get_cl()
+        self.assertIsInstance(cl, KeysetChangeList)
+        self.assertTrue(cl.keyset)
+        self.assertIsNone(cl.full_result_count)
+        self.assertEqual(cl.result_count, 60)
+        self.assertIsNone(cl.keyset_previous_url)
+
+        pks, last = self.walk()
+        self.assertEqual(pks, list(cl.queryset.values_list("pk", flat=True)))
+        self.assertEqual(len(last.result_list), 10)
+        self.assertIsNone(last.keyset_next_url)
+
+        previous = self.get_cl(last.keyset_previous_url)
+        self.assertEqual([letter.pk for letter in previous.result_list], pks[25:50])
+        self.assertIsNotNone(previous.keyset_next_url)
+        first = self.get_cl(previous.keyset_first_url)
+        self.assertEqual([letter.pk for letter in first.result_list], pks[:25])
+
+    def test_sorted_column(self):
+        # workflow_stage, with ties broken by pk
+        cl = self.get_cl("?o=2")
+        self.assertEqual(cl.get_keyset(), [("workflow_stage", False), ("pk", True)])
+        pks, _ = self.walk("?o=2")
+        self.assertEqual(pks, list(cl.queryset.values_list("pk", flat=True)))
+
+    def test_filter_resets_cursor(self):
+        cl = self.get_cl()
+        page2 = self.get_cl(cl.keyset_next_url)
+        query = page2.get_query_string({"workflow_stage__exact": WorkflowStage.DISCARDED})
+        self.assertNotIn("after", query)
+        filtered = self.get_cl(query)
+        self.assertEqual(filtered.result_count, 30)
+        self.assertTrue(
+            all(letter.workflow_stage == WorkflowStage.DISCARDED for letter in filtered.result_list)
+        )
+
+    def test_nullable_ordering_uses_page_numbers(self):
+        # fulfilled_date is nullable, so it can't be a cursor
+        cl = self.get_cl("?o=9&p=2")
+        self.assertFalse(cl.keyset)
+        self.assertEqual(len(cl.result_list), 25)
+
+    @override_settings(ADMIN_KEYSET_PAGINATION=False)
+    def test_off_by_default(self):
+        cl = self.get_cl()
+        self.assertNotIsInstance(cl, KeysetChangeList)
+        self.assertEqual(cl.full_result_count, 60)
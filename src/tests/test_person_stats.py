@@ -0,0 +1,167 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+from model_bakery import baker
+
+from src.app.models.person import Person, PersonStats
+from src.app.models.prison import PersonPrison
+from src.app.utils import WorkflowStage
+from src.auth.models import User
+
+
+class TestPersonStats(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="a@b.com", is_staff=True, is_superuser=True)
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.person = baker.make("app.Person")
+        self.prison = baker.make("app.Prison")
+        PersonPrison.objects.create(person=self.person, prison=self.prison)
+
+    def get_stats(self, person: Person | None = None) -> PersonStats:
+        return PersonStats.objects.get(person=person or self.person)
+
+    def test_created_with_person(self):
+        stats = self.get_stats()
+        self.assertEqual(stats.letter_count, 0)
+        self.assertIsNone(stats.last_served)
+
+    def test_letter_save_and_delete(self):
+        letter = baker.make("app.Letter", person=self.person)
+        stats = self.get_stats()
+        self.assertEqual(stats.letter_count, 1)
+        self.assertEqual(stats.pending_count, 1)
+
+        fulfilled_date = now()
+        letter.workflow_stage = WorkflowStage.FULFILLED
+        letter.fulfilled_date = fulfilled_date
+        letter.save()
+        stats = self.get_stats()
+        self.assertEqual(stats.pending_count, 0)
+        self.assertEqual(stats.package_count, 1)
+        self.assertEqual(stats.last_served, fulfilled_date)
+
+        letter.delete()
+        stats = self.get_stats()
+        self.assertEqual(stats.letter_count, 0)
+        self.assertIsNone(stats.last_served)
+
+    def test_letter_moved_to_other_person(self):
+        other = baker.make("app.Person")
+        letter = baker.make("app.Letter", person=self.person)
+        letter.person = other
+        letter.save()
+        self.assertEqual(self.get_stats().letter_count, 0)
+        self.assertEqual(self.get_stats(other).letter_count, 1)
+
+    def test_person_issue(self):
+        issue = baker.make("app.PersonIssue", person=self.person)
+        self.assertEqual(self.get_stats().open_issue_count, 1)
+        self.client.post(
+            reverse("admin:app_personissue_changelist"),
+            {"action": "mark_issue_resolved", "_selected_action": [issue.id]},
+        )
+        self.assertEqual(self.get_stats().open_issue_count, 0)
+
+    def test_admin_actions(self):
+        letters = baker.make("app.Letter", person=self.person, _quantity=3)
+        changelist = reverse("admin:app_letter_changelist")
+        self.client.post(
+            changelist,
+            {"action": "move_to_fulfilled", "_selected_action": [letters[0].id]},
+        )
+        stats = self.get_stats()
+        self.assertEqual(stats.package_count, 1)
+        self.assertEqual(stats.pending_count, 2)
+        self.assertIsNotNone(stats.last_served)
+
+        self.client.post(
+            changelist,
+            {"action": "move_to_discarded", "_selected_action": [letters[1].id]},
+        )
+        self.assertEqual(self.get_stats().pending_count, 1)
+
+        self.client.post(
+            changelist,
+            {"action": "move_to_stage1_complete", "_selected_action": [letters[0].id]},
+        )
+        stats = self.get_stats()
+        self.assertEqual(stats.package_count, 0)
+        self.assertEqual(stats.pending_count, 2)
+        self.assertIsNone(stats.last_served)
+
+    def test_properties_read_stats(self):
+        baker.make("app.Letter", person=self.person, _quantity=2)
+        person = Person.objects.select_related("stats").get(pk=self.person.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(person.letter_count, 2)
+            self.assertEqual(person.pending_letter_count, 2)
+            self.assertEqual(person.package_count, 0)
+            self.assertTrue(person.eligible)
+            self.assertEqual(person.open_issues, "")
+
+    def test_person_delete(self):
+        baker.make("app.PersonIssue", person=self.person)
+        baker.make("app.Letter", person=self.person)
+        self.person.delete()
+        self.assertFalse(PersonStats.objects.exists())
+
+    def test_rebuild_command(self):
+        baker.make("app.Letter", person=self.person, _quantity=2)
+        PersonStats.objects.all().delete()
+        call_command("rebuild_person_stats", stdout=StringIO())
+        self.assertEqual(self.get_stats().letter_count, 2)
+
+
+class TestPersonWithStats(TestCase):
+    def setUp(self):
+        self.person = baker.make("app.Person")
+        baker.make("app.Letter", person=self.person, _quantity=2)
+        baker.make(
+            "app.Letter",
+            person=self.person,
+            workflow_stage=WorkflowStage.FULFILLED,
+            fulfilled_date=now(),
+        )
+        baker.make("app.PersonIssue", person=self.person)
+        baker.make("app.PersonIssue", person=self.person, resolved=True)
+
+    def test_annotations_match_queries(self):
+        annotated = Person.objects.with_stats().get(pk=self.person.pk)
+        fresh = Person.objects.get(pk=self.person.pk)
+        PersonStats.objects.all().delete()
+        with self.assertNumQueries(0):
+            values = (
+                annotated.last_served,
+                annotated.package_count,
+                annotated.pending_letter_count,
+                annotated.letter_count,
+                annotated.eligible,
+                annotated.open_issue_count,
+            )
+        self.assertEqual(
+            values,
+            (
+                fresh.last_served,
+                fresh.package_count,
+                fresh.pending_letter_count,
+                fresh.letter_count,
+                fresh.eligible,
+                fresh.open_issue_count,
+            ),
+        )
+        self.assertEqual(values[1:4], (1, 2, 3))
+        self.assertFalse(values[4])
+        self.assertEqual(values[5], 1)
+
+    def test_single_query(self):
+        baker.make("app.Person", _quantity=10)
+        with self.assertNumQueries(1):
+            for person in Person.objects.with_stats():
+                person.get_eligibility_str()
+                person.open_issues
+                person.package_count
+                person.letter_count
@@ -0,0 +1,77 @@
+import json
+import time
+from unittest import mock
+
+from django.test import Client, TestCase
+from django.urls import reverse
+from model_bakery import baker
+
+from src.app.models import prison
+from src.app.models.person import Person
+from src.app.models.prison import prison_choices
+from src.app.utils import FACET_CACHE_TIMEOUT
+from src.auth.models import User
+
+
+class TestPrisonChoices(TestCase):
+    def setUp(self):
+        self.prisons = [
+            baker.make("app.Prison", name=name) for name in ("SCI Albion", "Allegheny County")
+        ]
+
+    def test_cached_until_prison_changes(self):
+        self.assertEqual([name for _, name in prison_choices()], ["Allegheny County", "SCI Albion"])
+        with self.assertNumQueries(0):
+            prison_choices()
+
+        self.prisons[0].name = "SCI Benner"
+        self.prisons[0].save()
+        self.assertEqual([name for _, name in prison_choices()], ["Allegheny County", "SCI Benner"])
+        self.prisons[1].delete()
+        self.assertEqual([name for _, name in prison_choices()], ["SCI Benner"])
+
+    def test_expires_in_other_processes(self):
+        prison_choices()
+        # another worker: its list is out of date and nothing bumped its cache
+        version = prison._prison_choices[0]
+        stale = [(0, "Stale")]
+        with mock.patch.object(prison, "_prison_choices", (version, stale)):
+            self.assertEqual(prison_choices(), stale)
+            later = time.time() + FACET_CACHE_TIMEOUT + 1
+            with mock.patch("django.core.cache.backends.locmem.time.time", return_value=later):
+                self.assertEqual(
+                    [name for _, name in prison_choices()], ["Allegheny County", "SCI Albion"]
+                )
+
+
+class TestPrisonLookup(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="a@b.com", is_contributor=True)
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.albion = baker.make("app.Prison", name="SCI Albion")
+        self.allegheny = baker.make("app.Prison", name="Allegheny County")
+        baker.make("app.Prison", name="SCI Benner")
+
+    def search(self, term: str) -> list[int]:
+        url = reverse("ajax_lookup", kwargs={"channel": "prison_channel"})
+        response = self.client.get(url, {"term": term})
+        self.assertEqual(response.status_code, 200)
+        return [int(result["pk"]) for result in json.loads(response.content)]
+
+    def test_prefix_matches_first(self):
+        self.assertEqual(self.search("al"), [self.allegheny.pk, self.albion.pk])
+        self.assertEqual(self.search("ALB"), [self.albion.pk])
+
+    def test_contributor_add_person(self):
+        response = self.client.post(
+            reverse("contrib_person_add"),
+            {
+                "inmate_number": "AB1234",
+                "last_name": "SMITH",
+                "first_name": "JOHN",
+                "prison": self.albion.pk,
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Person.objects.get().current_prison, self.albion)
@@ -0,0 +1,175 @@
+"""
+N+1 guard: every admin changelist and change form, every ajax_select channel and
+the contributor profile must render within a fixed number of queries, however
+many rows there are.
+"""
+
+from ajax_select.registry import registry
+from django.contrib import admin
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now
+from model_bakery import baker
+
+from src.app.models.fulfillment import FulfillmentBatch
+from src.app.models.issue import LetterIssue, PersonIssue
+from src.app.models.job import Job, JobOutputChunk
+from src.app.models.letter import Letter
+from src.app.models.person import Person
+from src.app.models.prison import PersonPrison, Prison
+from src.app.utils import WorkflowStage
+from src.auth.models import User
+
+ROW_COUNTS = (1, 25, 100)
+
+# Queries allowed per page, including the session and user lookups
+CHANGELIST_BUDGETS = {
+    "admin:app_letter_changelist": 9,
+    "admin:app_person_changelist": 10,
+    "admin:app_prison_changelist": 5,
+    "admin:app_personissue_changelist": 5,
+    "admin:app_letterissue_changelist": 5,
+    "admin:CustomAuth_user_changelist": 6,
+    "admin:app_fulfillmentbatch_changelist": 5,
+    "admin:app_job_changelist": 5,
+    "admin:auth_group_changelist": 5,
+}
+CHANGE_FORM_BUDGETS = {
+    Letter: 9,
+    Person: 12,
+    Prison: 3,
+    PersonIssue: 6,
+    LetterIssue: 6,
+    User: 7,
+    FulfillmentBatch: 5,
+    Job: 4,
+    Group: 5,
+}
+LOOKUP_BUDGETS = {
+    # inmate number prefix and name stages of lookup_people
+    ("person_channel", "smi"): 5,
+    ("person_contrib_channel", "smi"): 5,
+    ("letter_channel", "smi"): 3,
+    # the prison name list (cold cache), then the matches
+    ("prison_channel", "all"): 4,
+}
+CONTRIB_PROFILE_BUDGET = 5
+
+
+class TestQueryBudgets(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            email="a@b.com", is_staff=True, is_superuser=True, is_contributor=True
+        )
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def seed(self, count: int):
+        users = baker.make("CustomAuth.User", _quantity=count)
+        for user in users:
+            prison = baker.make(
+                "app.Prison",
+                name="ALLEGHENY COUNTY JAIL",
+                prison_type=Prison.Types.COUNTY,
+                restrictions="No hardcovers",
+                created_by=user,
+                modified_by=user,
+            )
+            person = baker.make("app.Person", last_name="SMITH", created_by=self.user)
+            PersonPrison.objects.create(person=person, prison=prison, created_by=user)
+            letter = baker.make(
+                "app.Letter",
+                person=person,
+                prison_sent_to=prison,
+                created_by=self.user,
+                workflow_stage=WorkflowStage.FULFILLED,
+                fulfilled_date=now(),
+            )
+            pending = baker.make("app.Letter", person=person, created_by=self.user)
+            FulfillmentBatch.objects.get_or_create(pk=1)[0].add_letters(
+                Letter.objects.filter(pk=pending.pk)
+            )
+            baker.make(
+                "app.PersonIssue",
+                person=person,
+                created_by=user,
+                modified_by=user,
+                resolved_by=user,
+            )
+            baker.make(
+                "app.LetterIssue",
+                letter=letter,
+                created_by=user,
+                modified_by=user,
+                resolved_by=user,
+            )
+            job = Job.objects.create(
+                name="export",
+                description="Export people",
+                created_by=user,
+                messages=[["success", "Done."]],
+                output_name="people.csv",
+            )
+            JobOutputChunk.objects.create(job=job, data=b"id\n1\n")
+            group = Group.objects.create(name=f"Volunteers {user.pk}")
+            group.permissions.set(Permission.objects.all()[:3])
+            user.groups.add(group)
+
+    def assertWithinBudget(self, url: str, budget: int, baseline: dict[str, int]):
+        # Budgets are for a cold cache (list filter counts)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        sql = "\n".join(f"  {query['sql']}" for query in queries.captured_queries)
+        self.assertLessEqual(
+            len(queries), budget, f"{url}: {len(queries)} queries over budget of {budget}\n{sql}"
+        )
+        # within budget is not enough if the count still creeps up with rows
+        expected = baseline.setdefault(url, len(queries))
+        self.assertEqual(
+            len(queries), expected, f"{url}: {len(queries)} queries, was {expected}\n{sql}"
+        )
+
+    def pages(self):
+        for url_name, budget in CHANGELIST_BUDGETS.items():
+            yield reverse(url_name), budget
+
+        for model, budget in CHANGE_FORM_BUDGETS.items():
+            obj = model.objects.order_by("pk").first()
+            assert obj
+            opts = model._meta
+            yield reverse(f"admin:{opts.app_label}_{opts.model_name}_change", args=[obj.pk]), budget
+
+        for (channel, term), budget in LOOKUP_BUDGETS.items():
+            yield reverse("ajax_lookup", kwargs={"channel": channel}) + f"?term={term}", budget
+
+        yield reverse("contrib_profile"), CONTRIB_PROFILE_BUDGET
+
+    def test_everything_budgeted(self):
+        # a newly registered admin or lookup channel needs a budget here too
+        registered = set(admin.site._registry)
+        self.assertEqual(registered, set(CHANGE_FORM_BUDGETS))
+        self.assertEqual(
+            {f"admin:{m._meta.app_label}_{m._meta.model_name}_changelist" for m in registered},
+            set(CHANGELIST_BUDGETS),
+        )
+        self.assertEqual(set(registry._registry), {channel for channel, _ in LOOKUP_BUDGETS})
+
+    def test_budgets(self):
+        baseline: dict[str, int] = {}
+        seeded = 0
+        for count in ROW_COUNTS:
+            self.seed(count - seeded)
+            if not seeded:
+                # Content types and the like are cached on first use
+                for url, _ in self.pages():
+                    self.client.get(url)
+            seeded = count
+            with self.subTest(rows=count):
+                for url, budget in self.pages():
+                    self.assertWithinBudget(url, budget, baseline)
@@ -0,0 +1,100 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now
+from model_bakery import baker
+
+from src.app.admin.letter import LetterAdmin
+from src.app.models.person import Person
+from src.app.models.prison import PersonPrison, Prison
+from src.app.utils import WorkflowStage
+from src.auth.models import User
+
+
+class TestCurrentPrisonQueries(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="a@b.com", is_staff=True, is_superuser=True)
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.prison = baker.make(
+            "app.Prison", prison_type=Prison.Types.COUNTY, restrictions="No hardcovers"
+        )
+
+    def make_letters(self, count: int):
+        for person in baker.make("app.Person", last_name="SMITH", _quantity=count):
+            PersonPrison.objects.create(person=person, prison=self.prison)
+            letter = baker.make("app.Letter", person=person)
+            baker.make("app.LetterIssue", letter=letter)
+
+    def count_queries(self, url: str) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_letter_changelist(self):
+        url = reverse("admin:app_letter_changelist")
+        self.make_letters(1)
+        one_row = self.count_queries(url)
+        self.make_letters(10)
+        self.assertEqual(self.count_queries(url), one_row)
+
+    def test_person_changelist(self):
+        url = reverse("admin:app_person_changelist")
+        self.make_letters(1)
+        one_row = self.count_queries(url)
+        self.make_letters(10)
+        self.assertEqual(self.count_queries(url), one_row)
+
+    def test_current_prison_memoized(self):
+        self.make_letters(1)
+        person = Person.objects.get()
+        with self.assertNumQueries(1):
+            for _ in range(3):
+                self.assertEqual(person.current_prison, self.prison)
+
+    def test_lookup_channels(self):
+        for channel in ("person_channel", "person_contrib_channel"):
+            url = reverse("ajax_lookup", kwargs={"channel": channel}) + "?term=smi"
+            Person.objects.all().delete()
+            self.make_letters(1)
+            one_row = self.count_queries(url)
+            self.make_letters(9)
+            self.assertEqual(self.count_queries(url), one_row)
+
+
+class TestLetterChangelistQueries(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="a@b.com", is_staff=True, is_superuser=True)
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.url = reverse("admin:app_letter_changelist")
+
+    def make_letters(self, count: int):
+        prison = baker.make("app.Prison", prison_type=Prison.Types.FCI)
+        for person in baker.make("app.Person", _quantity=count):
+            PersonPrison.objects.create(person=person, prison=prison)
+            letter = baker.make(
+                "app.Letter",
+                person=person,
+                prison_sent_to=prison,
+                created_by=self.user,
+                workflow_stage=WorkflowStage.FULFILLED,
+                fulfilled_date=now(),
+            )
+            baker.make("app.LetterIssue", letter=letter)
+            baker.make("app.Letter", person=person, created_by=self.user)
+
+    def test_mail_day_page_size(self):
+        self.make_letters(1)
+        with patch.object(LetterAdmin, "list_per_page", 200):
+            with CaptureQueriesContext(connection) as one_row:
+                self.client.get(self.url)
+            self.make_letters(120)
+            with CaptureQueriesContext(connection) as full_page:
+                response = self.client.get(self.url)
+        self.assertEqual(len(response.context["cl"].result_list), 200)
+        self.assertEqual(len(full_page), len(one_row))
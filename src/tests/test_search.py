@@ -0,0 +1,188 @@
+from datetime import date
+import json
+from unittest import skipUnless
+
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+from model_bakery import baker
+
+from src.app.models.letter import Letter
+from src.app.models.person import Person
+from src.app.search import lookup_people, parse_letter_query, search_people
+from src.auth.models import User
+
+
+class TestSearchPeople(TestCase):
+    def setUp(self):
+        self.smith = baker.make(
+            "app.Person", inmate_number="AB1234", last_name="SMITH", first_name="JOHN"
+        )
+        self.smithson = baker.make(
+            "app.Person", inmate_number="AB12345", last_name="SMITHSON", first_name="MARY"
+        )
+        self.jones = baker.make(
+            "app.Person",
+            inmate_number="CD5678",
+            last_name="JONES",
+            first_name="ANNA",
+            middle_name="JOHNSON",
+        )
+
+    def search(self, term: str, queryset=None, prefix: str = "") -> tuple[list[int], bool]:
+        queryset, indexed = search_people(
+            Person.objects.all() if queryset is None else queryset, term, prefix
+        )
+        return sorted(queryset.values_list("pk", flat=True)), indexed
+
+    def test_exact_inmate_number(self):
+        with self.assertNumQueries(2):
+            pks, indexed = self.search("ab-1234")
+        self.assertEqual(pks, [self.smith.pk])
+        self.assertTrue(indexed)
+
+    def test_every_word_matches_some_field(self):
+        self.assertEqual(self.search("smith")[0], [self.smith.pk, self.smithson.pk])
+        self.assertEqual(self.search("john smith")[0], [self.smith.pk])
+        self.assertEqual(self.search("johnson")[0], [self.jones.pk])
+        self.assertEqual(self.search("cd56")[0], [self.jones.pk])
+        self.assertEqual(self.search("nobody")[0], [])
+
+    def test_through_person(self):
+        letter = baker.make("app.Letter", person=self.jones)
+        baker.make("app.Letter", person=self.smith)
+        pks, _ = self.search("anna", Letter.objects.all(), "person__")
+        self.assertEqual(pks, [letter.pk])
+
+    def test_short_words_are_substring_search(self):
+        pks, indexed = self.search("ab")
+        self.assertEqual(pks, [self.smith.pk, self.smithson.pk])
+        self.assertFalse(indexed)
+
+    @skipUnless(connection.vendor == "postgresql", "trigram search needs PostgreSQL")
+    def test_ranked(self):
+        queryset, indexed = search_people(Person.objects.all(), "smith")
+        self.assertTrue(indexed)
+        self.assertEqual(list(queryset), [self.smith, self.smithson])
+
+    @skipUnless(connection.vendor == "postgresql", "trigram search needs PostgreSQL")
+    def test_sorted_column_overrides_rank(self):
+        client = Client()
+        client.force_login(User.objects.create(email="a@b.com", is_staff=True, is_superuser=True))
+        changelist = reverse("admin:app_person_changelist")
+        ranked = client.get(changelist, {"q": "smith"})
+        self.assertEqual(list(ranked.context["cl"].result_list), [self.smith, self.smithson])
+        # inmate number, descending
+        by_number = client.get(changelist, {"q": "smith", "o": "-1"})
+        self.assertEqual(list(by_number.context["cl"].result_list), [self.smithson, self.smith])
+
+
+class TestLookupPeople(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="a@b.com", is_contributor=True)
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.longer = baker.make(
+            "app.Person", inmate_number="AB12345", last_name="SMITH", first_name="JOHN"
+        )
+        self.exact = baker.make(
+            "app.Person", inmate_number="AB1234", last_name="JONES", first_name="MARY"
+        )
+        # inmate number in the name stage, after every inmate number prefix
+        self.named = baker.make(
+            "app.Person", inmate_number="CD9999", last_name="AB1234", first_name="ANNA"
+        )
+
+    def test_stages_in_order(self):
+        people = lookup_people(Person.objects.all(), "ab1234", 10)
+        self.assertEqual(people, [self.exact, self.longer, self.named])
+        # normalized like stored inmate numbers for the inmate number stages
+        self.assertEqual(lookup_people(Person.objects.all(), "ab-1234", 1), [self.exact])
+        self.assertEqual(lookup_people(Person.objects.all(), "mary jones", 10), [self.exact])
+        self.assertEqual(lookup_people(Person.objects.all(), "  ", 10), [])
+
+    def test_channels(self):
+        for channel in ("person_channel", "person_contrib_channel"):
+            self.client.force_login(
+                User.objects.create(email=f"{channel}@b.com", is_staff=True, is_contributor=True)
+            )
+            url = reverse("ajax_lookup", kwargs={"channel": channel})
+            response = self.client.get(url, {"term": "AB1234"})
+            self.assertEqual(
+                [int(result["pk"]) for result in json.loads(response.content)],
+                [self.exact.pk, self.longer.pk, self.named.pk],
+            )
+
+
+class TestLetterLookup(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(User.objects.create(email="a@b.com", is_staff=True))
+        smith = baker.make("app.Person", last_name="SMITH", inmate_number="AB1234")
+        jones = baker.make("app.Person", last_name="JONES", inmate_number="CD5678")
+        self.march = baker.make("app.Letter", person=smith, postmark_date=date(2024, 3, 15))
+        self.april = baker.make("app.Letter", person=smith, postmark_date=date(2024, 4, 1))
+        self.jones = baker.make("app.Letter", person=jones, postmark_date=date(2024, 3, 1))
+        baker.make("app.Letter", person=None, postmark_date=date(2024, 3, 2))
+
+    def search(self, term: str) -> list[int]:
+        url = reverse("ajax_lookup", kwargs={"channel": "letter_channel"})
+        return [
+            int(result["pk"]) for result in json.loads(self.client.get(url, {"term": term}).content)
+        ]
+
+    def test_parse(self):
+        self.assertEqual(
+            parse_letter_query("smith 2024-03"), (["SMITH"], (date(2024, 3, 1), date(2024, 4, 1)))
+        )
+        self.assertEqual(
+            parse_letter_query("3/15/24"), ([], (date(2024, 3, 15), date(2024, 3, 16)))
+        )
+        self.assertEqual(parse_letter_query("12/2024")[1], (date(2024, 12, 1), date(2025, 1, 1)))
+        self.assertEqual(parse_letter_query("2024-13"), (["2024-13"], None))
+
+    def test_name_and_date(self):
+        self.assertEqual(self.search("smith"), [self.april.pk, self.march.pk])
+        self.assertEqual(self.search("03/2024"), [self.march.pk, self.jones.pk])
+        self.assertEqual(self.search("smith 2024-03"), [self.march.pk])
+        self.assertEqual(self.search("2024-03-01"), [self.jones.pk])
+        self.assertEqual(self.search("cd5678 2024"), [self.jones.pk])
+
+    def test_refining_a_date(self):
+        self.assertEqual(self.search("smith 2024"), [self.april.pk, self.march.pk])
+        self.assertEqual(self.search("smith 2024-0"), [])
+        # "2024-0" was a name word, so its (empty) results don't answer this
+        self.assertEqual(self.search("smith 2024-04"), [self.april.pk])
+
+    def test_one_query(self):
+        # session, user, and the letters with their people
+        with self.assertNumQueries(3):
+            self.client.get(
+                reverse("ajax_lookup", kwargs={"channel": "letter_channel"}), {"term": "smith"}
+            )
+
+
+class TestAdminSearch(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="a@b.com", is_staff=True, is_superuser=True)
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.person = baker.make(
+            "app.Person", inmate_number="AB1234", last_name="SMITH", first_name="JOHN"
+        )
+        baker.make("app.Person", inmate_number="CD5678", last_name="JONES", first_name="MARY")
+        self.letter = baker.make("app.Letter", person=self.person)
+
+    def test_changelists(self):
+        for model, obj in (("person", self.person), ("letter", self.letter)):
+            response = self.client.get(reverse(f"admin:app_{model}_changelist"), {"q": "AB1234"})
+            self.assertEqual(list(response.context["cl"].result_list), [obj])
+            self.assertEqual(list(get_messages(response.wsgi_request)), [])
+
+    def test_substring_search_is_marked(self):
+        response = self.client.get(reverse("admin:app_person_changelist"), {"q": "sm"})
+        self.assertEqual(list(response.context["cl"].result_list), [self.person])
+        self.assertContains(response, "Substring search")